@@ -0,0 +1,188 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Rendering of A2UI responses to userActions without an LLM.
+
+Many userActions (e.g. opening a form, or confirming its submission) always
+render the same UI example, filled with values from the action's context. An
+`A2uiActionRenderer` binds the context into the example's data model
+declaratively, so only unregistered actions need an LLM round-trip.
+"""
+
+import copy
+import json
+import logging
+import re
+from typing import Any, Callable, Optional
+
+from a2ui.a2ui_extension import A2UI_JSON_DELIMITER, DATA_MODEL_UPDATE_KEY
+
+logger = logging.getLogger(__name__)
+
+# Matches a format string that is a single field, e.g. "{partySize}".
+_SINGLE_FIELD = re.compile(r"^\{(\w+)\}$")
+
+
+def load_a2ui_example(examples: str, name: str, unescape_braces: bool = False) -> list[dict[str, Any]]:
+    """Parses a named example from an agent's UI examples.
+
+    Args:
+        examples: The examples, with each one between `---BEGIN <name>---` and
+            `---END <name>---`.
+        name: The name of the example, e.g. "BOOKING_FORM_EXAMPLE".
+        unescape_braces: Whether the examples are a format string, with
+            braces escaped as `{{` and `}}`.
+
+    Returns:
+        The example's A2UI messages.
+
+    Raises:
+        ValueError: If the example is missing or isn't valid JSON.
+    """
+    begin, end = f"---BEGIN {name}---", f"---END {name}---"
+    start = examples.find(begin)
+    stop = examples.find(end, start)
+    if start == -1 or stop == -1:
+        raise ValueError(f"Example {name} not found.")
+    example = examples[start + len(begin) : stop]
+    if unescape_braces:
+        example = example.replace("{{", "{").replace("}}", "}")
+    return json.loads(example)
+
+
+def _to_data_entry(key: str, value: Any) -> dict[str, Any]:
+    # bool is checked first because it's a subclass of int.
+    if isinstance(value, bool):
+        return {"key": key, "valueBoolean": value}
+    if isinstance(value, (int, float)):
+        return {"key": key, "valueNumber": value}
+    return {"key": key, "valueString": "" if value is None else str(value)}
+
+
+class A2uiRenderedAction:
+    """The text and A2UI messages rendered for a userAction."""
+
+    __slots__ = ("text", "messages")
+
+    def __init__(self, text: str, messages: list[dict[str, Any]]):
+        self.text = text
+        self.messages = messages
+
+    def to_response(self, delimiter: str = A2UI_JSON_DELIMITER) -> str:
+        """Returns the response in the same form as an LLM's: text, delimiter, JSON list."""
+        return f"{self.text}\n{delimiter}\n{json.dumps(self.messages)}"
+
+
+class A2uiActionTemplate:
+    """A UI example whose data model is bound from a userAction's context.
+
+    Bindings map the keys of the example's top-level `dataModelUpdate`
+    contents to format strings over the action context, e.g.
+    `{"title": "Book a Table at {restaurantName}"}`. A binding that is a
+    single field, e.g. `"{partySize}"`, keeps the context value's type.
+    Optional fields are given defaults, used when the context lacks them.
+    """
+
+    def __init__(
+        self,
+        messages: list[dict[str, Any]],
+        data: Optional[dict[str, str]] = None,
+        text: str = "",
+        defaults: Optional[dict[str, Any]] = None,
+    ):
+        """
+        Args:
+            messages: The example's A2UI messages.
+            data: The data model bindings.
+            text: A format string for the conversational text.
+            defaults: Values for optional context fields.
+
+        Raises:
+            ValueError: If a bound key isn't in the example's data model.
+        """
+        self._messages = messages
+        self._data = data or {}
+        self._text = text
+        self._defaults = defaults or {}
+
+        keys = {
+            entry["key"]
+            for message in messages
+            for entry in message.get(DATA_MODEL_UPDATE_KEY, {}).get("contents", [])
+        }
+        if unknown := set(self._data) - keys:
+            raise ValueError(f"Data model keys not in the example: {', '.join(sorted(unknown))}")
+
+    def render(self, context: dict[str, Any]) -> A2uiRenderedAction:
+        """Renders the example for an action context.
+
+        Raises:
+            KeyError: If a binding refers to a field that isn't in the context
+                or the defaults.
+        """
+        context = {**self._defaults, **context}
+        values = {}
+        for key, template in self._data.items():
+            if match := _SINGLE_FIELD.match(template):
+                values[key] = context[match.group(1)]
+            else:
+                values[key] = template.format_map(context)
+
+        messages = copy.deepcopy(self._messages)
+        for message in messages:
+            for i, entry in enumerate(message.get(DATA_MODEL_UPDATE_KEY, {}).get("contents", [])):
+                if entry["key"] in values:
+                    message[DATA_MODEL_UPDATE_KEY]["contents"][i] = _to_data_entry(entry["key"], values[entry["key"]])
+        return A2uiRenderedAction(self._text.format_map(context), messages)
+
+
+class A2uiActionRenderer:
+    """Renders the responses to registered userActions from their templates."""
+
+    def __init__(self, validate: Optional[Callable[[list[Any]], None]] = None):
+        """
+        Args:
+            validate: Called with the rendered messages; raises if they are
+                invalid, e.g. a wrapper around `validate_a2ui_messages`.
+        """
+        self._validate = validate
+        self._templates: dict[str, A2uiActionTemplate] = {}
+
+    def register(self, action_name: str, template: A2uiActionTemplate) -> None:
+        self._templates[action_name] = template
+
+    def render(self, action_name: Optional[str], context: Optional[dict[str, Any]]) -> Optional[A2uiRenderedAction]:
+        """Renders the response to a userAction.
+
+        Args:
+            action_name: The name of the userAction.
+            context: The userAction's resolved context.
+
+        Returns:
+            The rendered response, or None if the action isn't registered or
+            can't be rendered (e.g. the context is missing a field), in which
+            case the caller should fall back to the LLM.
+        """
+        template = self._templates.get(action_name)
+        if template is None:
+            return None
+        try:
+            rendered = template.render(context or {})
+            if self._validate is not None:
+                self._validate(rendered.messages)
+        except Exception as e:
+            logger.warning(f"Failed to render userAction {action_name} from its template: {e}")
+            return None
+        logger.info(f"Rendered userAction {action_name} from its template")
+        return rendered
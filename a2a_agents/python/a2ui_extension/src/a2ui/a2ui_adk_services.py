@@ -0,0 +1,266 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Bounded drop-in replacements for ADK's in-memory services.
+
+Requires the `adk` extra. The services evict sessions, artifacts and memories
+as configured by a `BoundedStoreConfig`; see `a2ui_bounded_store`.
+"""
+
+import datetime
+import json
+import logging
+import re
+from typing import Any, Optional
+
+from a2ui.a2ui_bounded_store import BoundedStore, BoundedStoreConfig, Eviction, create_bounded_store, create_shared_store
+from google.adk.artifacts import InMemoryArtifactService
+from google.adk.events.event import Event
+from google.adk.memory.base_memory_service import BaseMemoryService, SearchMemoryResponse
+from google.adk.memory.memory_entry import MemoryEntry
+from google.adk.sessions import InMemorySessionService, Session
+from google.genai import types
+from pydantic import PrivateAttr
+
+logger = logging.getLogger(__name__)
+
+
+def _key(*parts: Optional[str]) -> str:
+    return json.dumps(parts)
+
+
+class BoundedSessionService(InMemorySessionService):
+    """An `InMemorySessionService` that evicts idle and least recently used sessions.
+
+    With a `sqlite_path` or `redis_url`, sessions and app/user state are also
+    written to that store on every change, and sessions that aren't in memory
+    (e.g. after a restart or eviction) are loaded from there. If the store is
+    `shared` with other workers, sessions are reloaded on every access, and
+    concurrent turns of the same session in different workers overwrite each
+    other's changes. `list_sessions` only lists the sessions in memory.
+    """
+
+    def __init__(self, config: Optional[BoundedStoreConfig] = None):
+        super().__init__()
+        config = config or BoundedStoreConfig()
+        # Tracks the sessions in memory; the values are empty and the sizes
+        # are those of the serialized sessions.
+        self._loaded = BoundedStore(config)
+        self._shared = config.shared
+        self._persisted = create_shared_store(config, "adk_sessions")
+        self._persisted_state = create_shared_store(config, "adk_session_state")
+
+    async def create_session(self, *, app_name: str, user_id: str, **kwargs: Any) -> Session:
+        self._evict(self._loaded.expire())
+        session = await super().create_session(app_name=app_name, user_id=user_id, **kwargs)
+        self._track(app_name, user_id, session.id)
+        self._persist(app_name, user_id, session.id)
+        return session
+
+    async def get_session(self, *, app_name: str, user_id: str, session_id: str, **kwargs: Any) -> Optional[Session]:
+        self._evict(self._loaded.expire())
+        if self._shared or self._get_stored_session(app_name, user_id, session_id) is None:
+            self._load(app_name, user_id, session_id)
+        session = await super().get_session(app_name=app_name, user_id=user_id, session_id=session_id, **kwargs)
+        if session is not None:
+            self._track(app_name, user_id, session_id)
+        return session
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        event = await super().append_event(session, event)
+        if not event.partial:
+            key = _key(session.app_name, session.user_id, session.id)
+            size = self._loaded.get_size(key)
+            if size is None:
+                self._track(session.app_name, session.user_id, session.id)
+            else:
+                # Serializing only the new event keeps appends O(event size).
+                self._evict(self._loaded.put(key, "", size=size + len(event.model_dump_json(exclude_none=True))))
+            self._persist(session.app_name, session.user_id, session.id)
+        return event
+
+    async def delete_session(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        await super().delete_session(app_name=app_name, user_id=user_id, session_id=session_id)
+        self._loaded.delete(_key(app_name, user_id, session_id))
+        if self._persisted is not None:
+            self._persisted.delete(_key(app_name, user_id, session_id))
+
+    def get_stats(self) -> dict[str, Optional[float]]:
+        """Returns the number of sessions in memory, their total bytes and eviction counts."""
+        return self._loaded.get_stats()
+
+    def _get_stored_session(self, app_name: str, user_id: str, session_id: str) -> Optional[Session]:
+        return self.sessions.get(app_name, {}).get(user_id, {}).get(session_id)
+
+    def _track(self, app_name: str, user_id: str, session_id: str) -> None:
+        stored = self._get_stored_session(app_name, user_id, session_id)
+        if stored is None:
+            return
+        key = _key(app_name, user_id, session_id)
+        size = self._loaded.get_size(key)
+        if size is None:
+            size = len(stored.model_dump_json(exclude_none=True))
+        self._evict(self._loaded.put(key, "", size=size))
+
+    def _evict(self, evictions: list[Eviction]) -> None:
+        # Removes the sessions from memory only; persisted sessions are
+        # bounded by their own store.
+        for key, _ in evictions:
+            app_name, user_id, session_id = json.loads(key)
+            self.sessions.get(app_name, {}).get(user_id, {}).pop(session_id, None)
+            logger.info(f"Evicted session {session_id} from memory")
+
+    def _persist(self, app_name: str, user_id: str, session_id: str) -> None:
+        if self._persisted is None:
+            return
+        stored = self._get_stored_session(app_name, user_id, session_id)
+        if stored is None:
+            return
+        self._persisted.put(_key(app_name, user_id, session_id), stored.model_dump_json(exclude_none=True))
+        if app_name in self.app_state:
+            self._persisted_state.put(_key(app_name), json.dumps(self.app_state[app_name]))
+        if user_id in self.user_state.get(app_name, {}):
+            self._persisted_state.put(_key(app_name, user_id), json.dumps(self.user_state[app_name][user_id]))
+
+    def _load(self, app_name: str, user_id: str, session_id: str) -> None:
+        if self._persisted is None:
+            return
+        value = self._persisted.get(_key(app_name, user_id, session_id))
+        if value is None:
+            if self._shared:
+                # Deleted or expired by another worker.
+                self.sessions.get(app_name, {}).get(user_id, {}).pop(session_id, None)
+            return
+        self.sessions.setdefault(app_name, {}).setdefault(user_id, {})[session_id] = Session.model_validate_json(value)
+        if (self._shared or app_name not in self.app_state) and (
+            state := self._persisted_state.get(_key(app_name))
+        ) is not None:
+            self.app_state[app_name] = json.loads(state)
+        user_states = self.user_state.setdefault(app_name, {})
+        if (self._shared or user_id not in user_states) and (
+            state := self._persisted_state.get(_key(app_name, user_id))
+        ) is not None:
+            user_states[user_id] = json.loads(state)
+        logger.debug(f"Loaded session {session_id} from the shared store")
+
+
+def _get_part_size(part: types.Part) -> int:
+    if part.inline_data is not None and part.inline_data.data is not None:
+        return len(part.inline_data.data)
+    return len(part.text or "")
+
+
+class BoundedArtifactService(InMemoryArtifactService):
+    """An `InMemoryArtifactService` that evicts idle and least recently used artifacts.
+
+    All versions of an artifact are evicted together. Artifacts are always
+    kept in memory, even if the config has a shared store.
+    """
+
+    _artifacts: BoundedStore = PrivateAttr()
+
+    def __init__(self, config: Optional[BoundedStoreConfig] = None, **kwargs: Any):
+        super().__init__(**kwargs)
+        self._artifacts = BoundedStore(config)
+
+    async def save_artifact(
+        self, *, app_name: str, user_id: str, session_id: Optional[str], filename: str, artifact: types.Part, **kwargs: Any
+    ) -> int:
+        await self._evict(self._artifacts.expire())
+        version = await super().save_artifact(
+            app_name=app_name, user_id=user_id, session_id=session_id, filename=filename, artifact=artifact, **kwargs
+        )
+        key = _key(app_name, user_id, session_id, filename)
+        size = (self._artifacts.get_size(key) or 0) + _get_part_size(artifact)
+        await self._evict(self._artifacts.put(key, "", size=size))
+        return version
+
+    async def load_artifact(
+        self, *, app_name: str, user_id: str, session_id: Optional[str], filename: str, **kwargs: Any
+    ) -> Optional[types.Part]:
+        await self._evict(self._artifacts.expire())
+        self._artifacts.get(_key(app_name, user_id, session_id, filename))
+        return await super().load_artifact(
+            app_name=app_name, user_id=user_id, session_id=session_id, filename=filename, **kwargs
+        )
+
+    async def delete_artifact(self, *, app_name: str, user_id: str, session_id: Optional[str], filename: str) -> None:
+        await super().delete_artifact(app_name=app_name, user_id=user_id, session_id=session_id, filename=filename)
+        self._artifacts.delete(_key(app_name, user_id, session_id, filename))
+
+    def get_stats(self) -> dict[str, Optional[float]]:
+        """Returns the number of artifacts, their total bytes and eviction counts."""
+        return self._artifacts.get_stats()
+
+    async def _evict(self, evictions: list[Eviction]) -> None:
+        for key, _ in evictions:
+            app_name, user_id, session_id, filename = json.loads(key)
+            await super().delete_artifact(app_name=app_name, user_id=user_id, session_id=session_id, filename=filename)
+            logger.info(f"Evicted artifact {filename} of session {session_id}")
+
+
+def _extract_words_lower(text: str) -> set[str]:
+    return {word.lower() for word in re.findall(r"[A-Za-z]+", text)}
+
+
+class BoundedMemoryService(BaseMemoryService):
+    """A keyword-matching memory service, like `InMemoryMemoryService`, with bounded size.
+
+    Memories are kept per user, so a user's memories are evicted together.
+    With a `sqlite_path` or `redis_url`, they are kept in that store.
+    """
+
+    def __init__(self, config: Optional[BoundedStoreConfig] = None):
+        self._memories = create_bounded_store(config, "adk_memories")
+
+    async def add_session_to_memory(self, session: Session) -> None:
+        key = _key(session.app_name, session.user_id)
+        value = self._memories.get(key)
+        memories = json.loads(value) if value is not None else {}
+        memories[session.id] = [
+            {
+                "author": event.author,
+                "timestamp": event.timestamp,
+                "content": event.content.model_dump(mode="json", exclude_none=True),
+            }
+            for event in session.events
+            if event.content and event.content.parts
+        ]
+        for evicted_key, _ in self._memories.put(key, json.dumps(memories)):
+            logger.info(f"Evicted the memories of user {json.loads(evicted_key)[1]}")
+
+    async def search_memory(self, *, app_name: str, user_id: str, query: str) -> SearchMemoryResponse:
+        value = self._memories.get(_key(app_name, user_id))
+        response = SearchMemoryResponse()
+        if value is None:
+            return response
+
+        words_in_query = _extract_words_lower(query)
+        for events in json.loads(value).values():
+            for event in events:
+                content = types.Content.model_validate(event["content"])
+                text = " ".join(part.text for part in content.parts if part.text)
+                if words_in_query & _extract_words_lower(text):
+                    response.memories.append(
+                        MemoryEntry(
+                            content=content,
+                            author=event["author"],
+                            timestamp=datetime.datetime.fromtimestamp(event["timestamp"]).isoformat(),
+                        )
+                    )
+        return response
+
+    def get_stats(self) -> dict[str, Optional[float]]:
+        """Returns the number of users with memories, their total bytes and eviction counts."""
+        return self._memories.get_stats()
@@ -0,0 +1,150 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""A caching wrapper for ADK toolsets of connector entity operations.
+
+Requires the `adk` extra. `CachingConnectorToolset` wraps a toolset such as
+an `ApplicationIntegrationToolset` and serves LIST and GET calls from a
+`ToolResultCache` per (entity, arguments, user). CREATE, UPDATE and DELETE
+calls go to the connector and invalidate the entity's cached results.
+"""
+
+import json
+import logging
+import re
+from typing import Any, Callable, Optional
+
+from a2ui.a2ui_tool_cache import ToolResultCache
+from google.adk.agents.readonly_context import ReadonlyContext
+from google.adk.tools.base_tool import BaseTool
+from google.adk.tools.base_toolset import BaseToolset
+from google.adk.tools.tool_context import ToolContext
+from google.genai import types
+
+logger = logging.getLogger(__name__)
+
+READ_OPERATIONS = frozenset({"LIST", "GET"})
+WRITE_OPERATIONS = frozenset({"CREATE", "UPDATE", "DELETE"})
+
+# Returns the (entity, operation) a tool performs, e.g. ("Issues", "LIST"),
+# or None for tools that aren't entity operations.
+EntityOperationGetter = Callable[[BaseTool], Optional[tuple[str, str]]]
+
+_OPERATION_NAME = re.compile(r"(?:^|_)(list|get|create|update|delete)_(\w+)$", re.IGNORECASE)
+
+
+def get_connector_entity_operation(tool: BaseTool) -> Optional[tuple[str, str]]:
+    """Returns the (entity, operation) of an Integration Connectors tool.
+
+    Reads the entity and operation (e.g. "LIST_ENTITIES") the tool was built
+    with, or else parses tool names such as "jira_tool_list_issues".
+    """
+    entity = getattr(tool, "_entity", None)
+    operation = getattr(tool, "_operation", None)
+    if entity and operation:
+        return entity, operation.split("_")[0].upper()
+    match = _OPERATION_NAME.search(tool.name)
+    if match is None:
+        return None
+    return match.group(2).lower(), match.group(1).upper()
+
+
+def _is_success(result: Any) -> bool:
+    # Connector tools report failures as {"error": ...} rather than raising.
+    return not (isinstance(result, dict) and result.get("error"))
+
+
+def _get_user_id(tool_context: ToolContext) -> Optional[str]:
+    user_id = getattr(tool_context, "user_id", None)
+    if user_id is None:
+        invocation_context = getattr(tool_context, "_invocation_context", None)
+        user_id = getattr(invocation_context, "user_id", None)
+    return user_id
+
+
+class CachingConnectorTool(BaseTool):
+    """Serves a connector tool's reads from a cache and invalidates it on writes."""
+
+    def __init__(self, tool: BaseTool, entity: str, operation: str, cache: ToolResultCache):
+        super().__init__(name=tool.name, description=tool.description, is_long_running=tool.is_long_running)
+        self._tool = tool
+        self._entity = entity
+        self._operation = operation
+        self._cache = cache
+
+    def _get_declaration(self) -> Optional[types.FunctionDeclaration]:
+        return self._tool._get_declaration()
+
+    async def run_async(self, *, args: dict[str, Any], tool_context: ToolContext) -> Any:
+        if self._operation in WRITE_OPERATIONS:
+            try:
+                return await self._tool.run_async(args=args, tool_context=tool_context)
+            finally:
+                # Also after a failure, which may have been partly applied.
+                self._cache.invalidate(self._entity)
+        if self._operation not in READ_OPERATIONS:
+            return await self._tool.run_async(args=args, tool_context=tool_context)
+
+        # The filter, page and sort arguments and the user identify the read.
+        key = (self.name, json.dumps(args, sort_keys=True, default=str), _get_user_id(tool_context))
+        return await self._cache.get_or_call(
+            self._entity,
+            key,
+            lambda: self._tool.run_async(args=dict(args), tool_context=tool_context),
+            cache_if=_is_success,
+        )
+
+
+class CachingConnectorToolset(BaseToolset):
+    """Wraps a toolset's entity operation tools with a shared `ToolResultCache`.
+
+    Args:
+        toolset: The toolset to wrap, e.g. an `ApplicationIntegrationToolset`.
+        cache: The cache for the reads; a new one by default.
+        get_entity_operation: Returns the (entity, operation) of a tool; tools
+            it returns None for are passed through.
+    """
+
+    def __init__(
+        self,
+        toolset: BaseToolset,
+        cache: Optional[ToolResultCache] = None,
+        get_entity_operation: EntityOperationGetter = get_connector_entity_operation,
+    ):
+        super().__init__()
+        self._toolset = toolset
+        self.cache = cache or ToolResultCache()
+        self._get_entity_operation = get_entity_operation
+        # Wrapped tools by the identity of the tool they wrap.
+        self._wrapped: dict[int, tuple[BaseTool, BaseTool]] = {}
+
+    async def get_tools(self, readonly_context: Optional[ReadonlyContext] = None) -> list[BaseTool]:
+        tools = await self._toolset.get_tools(readonly_context)
+        return [self._wrap(tool) for tool in tools]
+
+    async def close(self) -> None:
+        await self._toolset.close()
+
+    def _wrap(self, tool: BaseTool) -> BaseTool:
+        wrapped = self._wrapped.get(id(tool))
+        if wrapped is not None and wrapped[0] is tool:
+            return wrapped[1]
+        entity_operation = self._get_entity_operation(tool)
+        if entity_operation is None:
+            logger.info(f"Not caching {tool.name}: not an entity operation")
+            wrapper = tool
+        else:
+            wrapper = CachingConnectorTool(tool, *entity_operation, self.cache)
+        self._wrapped[id(tool)] = (tool, wrapper)
+        return wrapper
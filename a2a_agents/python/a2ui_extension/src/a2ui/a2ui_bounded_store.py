@@ -0,0 +1,458 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Bounded key-value stores for agent server state.
+
+The in-memory stores the samples start with (tasks, sessions, artifacts,
+memory) grow for as long as the server runs. The stores here evict entries
+that haven't been accessed for `ttl_seconds`, and the least recently used
+entries once `max_entries` or `max_bytes` is exceeded. `BoundedStore` keeps
+entries in memory; `SqliteStore` keeps them in a SQLite file so they survive
+restarts. Both hold serialized values, so their sizes are exact.
+
+To run several worker processes, the stores must be shared: either a SQLite
+file, or a Redis-protocol server (`RedisStore`, requires the `redis` extra).
+"""
+
+import dataclasses
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+from a2a.server.context import ServerCallContext
+from a2a.server.tasks import TaskStore
+from a2a.types import Task
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL_SECONDS = 60 * 60
+DEFAULT_MAX_ENTRIES = 1000
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# A store evicted (key, value) pair.
+Eviction = tuple[str, str]
+
+
+@dataclasses.dataclass(frozen=True)
+class BoundedStoreConfig:
+    """Bounds shared by the stores of an agent server.
+
+    Attributes:
+        ttl_seconds: How long an entry is kept after it was last accessed, or
+            None to keep entries until they are evicted for space.
+        max_entries: The maximum number of entries per store, or None.
+        max_bytes: The maximum total size of a store's values, or None.
+        sqlite_path: A SQLite file to persist stores in, or None to keep them
+            in memory.
+        redis_url: A Redis-protocol server to keep stores in instead, e.g.
+            "redis://localhost:6379/0".
+        shared: Whether other processes write to the same stores, so state
+            cached in memory must be re-read on every access. Requires
+            `sqlite_path` or `redis_url`.
+    """
+
+    ttl_seconds: Optional[float] = DEFAULT_TTL_SECONDS
+    max_entries: Optional[int] = DEFAULT_MAX_ENTRIES
+    max_bytes: Optional[int] = DEFAULT_MAX_BYTES
+    sqlite_path: Optional[str] = None
+    redis_url: Optional[str] = None
+    shared: bool = False
+
+    def __post_init__(self):
+        if self.shared and not (self.sqlite_path or self.redis_url):
+            raise ValueError("Shared stores require a SQLite path or a Redis URL")
+
+    @classmethod
+    def from_env(cls, prefix: str = "A2UI_STORE_") -> "BoundedStoreConfig":
+        """Reads the config from `<prefix>TTL_SECONDS`, `<prefix>MAX_ENTRIES`,
+        `<prefix>MAX_BYTES`, `<prefix>SQLITE_PATH`, `<prefix>REDIS_URL` and
+        `<prefix>SHARED`. A bound of 0 disables that bound."""
+
+        def get(name: str, default, parse):
+            value = os.getenv(f"{prefix}{name}")
+            if value is None or value == "":
+                return default
+            return parse(value) or None
+
+        return cls(
+            ttl_seconds=get("TTL_SECONDS", DEFAULT_TTL_SECONDS, float),
+            max_entries=get("MAX_ENTRIES", DEFAULT_MAX_ENTRIES, int),
+            max_bytes=get("MAX_BYTES", DEFAULT_MAX_BYTES, int),
+            sqlite_path=get("SQLITE_PATH", None, str),
+            redis_url=get("REDIS_URL", None, str),
+            shared=get("SHARED", False, lambda value: value.lower() == "true") or False,
+        )
+
+
+class _StoreStats:
+    """Eviction counters shared by the store implementations."""
+
+    def __init__(self, config: BoundedStoreConfig):
+        if config.max_entries is not None and config.max_entries < 1:
+            raise ValueError(f"max_entries must be at least 1, got {config.max_entries}")
+        if config.max_bytes is not None and config.max_bytes < 1:
+            raise ValueError(f"max_bytes must be at least 1, got {config.max_bytes}")
+        self.config = config
+        self.evictions = 0
+        self.expirations = 0
+
+    def to_dict(self, entries: int, size: int) -> dict[str, Optional[float]]:
+        return {
+            "entries": entries,
+            "bytes": size,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "max_entries": self.config.max_entries,
+            "max_bytes": self.config.max_bytes,
+            "ttl_seconds": self.config.ttl_seconds,
+        }
+
+
+class BoundedStore:
+    """A thread-safe in-memory store with TTL and LRU eviction."""
+
+    def __init__(
+        self,
+        config: Optional[BoundedStoreConfig] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            config: The store's bounds. `sqlite_path` is ignored.
+            clock: Returns the current time in seconds.
+        """
+        self._stats = _StoreStats(config or BoundedStoreConfig())
+        self._config = self._stats.config
+        self._clock = clock
+        # Least recently accessed first; values are (value, size, accessed_at).
+        self._entries: OrderedDict[str, tuple[str, int, float]] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        """Returns the value for `key` and marks it as recently used."""
+        now = self._clock()
+        with self._lock:
+            self._expire(now)
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries[key] = (entry[0], entry[1], now)
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key: str, value: str, size: Optional[int] = None) -> list[Eviction]:
+        """Stores `value` for `key`.
+
+        Args:
+            key: The key.
+            value: The value.
+            size: The size to account for the value, if it stands in for
+                state kept elsewhere. Defaults to its length.
+
+        Returns:
+            The entries evicted to make room for it, oldest first. A value
+            larger than `max_bytes` is evicted itself.
+        """
+        now = self._clock()
+        with self._lock:
+            evicted = self._expire(now)
+            self._remove(key)
+            size = len(value) if size is None else size
+            self._entries[key] = (value, size, now)
+            self._bytes += size
+            while self._entries and self._over_capacity():
+                evicted.append(self._pop_oldest())
+                self._stats.evictions += 1
+            return evicted
+
+    def get_size(self, key: str) -> Optional[int]:
+        """Returns the accounted size of `key`'s value, without marking it as used."""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry[1] if entry is not None else None
+
+    def delete(self, key: str) -> Optional[str]:
+        """Removes `key`, returning its value if it was present."""
+        with self._lock:
+            return self._remove(key)
+
+    def expire(self) -> list[Eviction]:
+        """Removes the entries whose TTL has passed, oldest first."""
+        now = self._clock()
+        with self._lock:
+            return self._expire(now)
+
+    def get_stats(self) -> dict[str, Optional[float]]:
+        """Returns the number of entries, their total bytes and eviction counts."""
+        with self._lock:
+            return self._stats.to_dict(len(self._entries), self._bytes)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def _over_capacity(self) -> bool:
+        return (self._config.max_entries is not None and len(self._entries) > self._config.max_entries) or (
+            self._config.max_bytes is not None and self._bytes > self._config.max_bytes
+        )
+
+    def _remove(self, key: str) -> Optional[str]:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return None
+        self._bytes -= entry[1]
+        return entry[0]
+
+    def _pop_oldest(self) -> Eviction:
+        key, (value, size, _) = self._entries.popitem(last=False)
+        self._bytes -= size
+        return key, value
+
+    def _expire(self, now: float) -> list[Eviction]:
+        expired = []
+        if self._config.ttl_seconds is None:
+            return expired
+        deadline = now - self._config.ttl_seconds
+        # Entries are in access order, so only the front can have expired.
+        while self._entries and next(iter(self._entries.values()))[2] <= deadline:
+            expired.append(self._pop_oldest())
+            self._stats.expirations += 1
+        return expired
+
+
+class SqliteStore:
+    """A store with the same interface as `BoundedStore`, kept in a SQLite file.
+
+    TTLs are measured in wall-clock time so they carry over across restarts.
+    Several stores can share a file by using different tables.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        table: str,
+        config: Optional[BoundedStoreConfig] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        Args:
+            path: The SQLite file, created if it doesn't exist.
+            table: The table to keep the entries in.
+            config: The store's bounds. `sqlite_path` is ignored.
+            clock: Returns the current wall-clock time in seconds.
+        """
+        if not table.isidentifier():
+            raise ValueError(f"Invalid table name: {table}")
+        self._stats = _StoreStats(config or BoundedStoreConfig())
+        self._config = self._stats.config
+        self._clock = clock
+        self._table = table
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} (key TEXT PRIMARY KEY, value TEXT NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._db.execute(f"CREATE INDEX IF NOT EXISTS {table}_accessed_at ON {table} (accessed_at)")
+        self._db.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        now = self._clock()
+        with self._lock, self._db:
+            self._expire(now)
+            row = self._db.execute(f"SELECT value FROM {self._table} WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._db.execute(f"UPDATE {self._table} SET accessed_at = ? WHERE key = ?", (now, key))
+            return row[0]
+
+    def put(self, key: str, value: str) -> list[Eviction]:
+        now = self._clock()
+        with self._lock, self._db:
+            evicted = self._expire(now)
+            self._db.execute(
+                f"INSERT OR REPLACE INTO {self._table} (key, value, accessed_at) VALUES (?, ?, ?)",
+                (key, value, now),
+            )
+            entries, size = self._get_totals()
+            while entries and (
+                (self._config.max_entries is not None and entries > self._config.max_entries)
+                or (self._config.max_bytes is not None and size > self._config.max_bytes)
+            ):
+                oldest_key, oldest_value = self._db.execute(
+                    f"SELECT key, value FROM {self._table} ORDER BY accessed_at, rowid LIMIT 1"
+                ).fetchone()
+                self._db.execute(f"DELETE FROM {self._table} WHERE key = ?", (oldest_key,))
+                evicted.append((oldest_key, oldest_value))
+                self._stats.evictions += 1
+                entries, size = entries - 1, size - len(oldest_value)
+            return evicted
+
+    def delete(self, key: str) -> Optional[str]:
+        with self._lock, self._db:
+            row = self._db.execute(f"DELETE FROM {self._table} WHERE key = ? RETURNING value", (key,)).fetchone()
+            return row[0] if row else None
+
+    def expire(self) -> list[Eviction]:
+        now = self._clock()
+        with self._lock, self._db:
+            return self._expire(now)
+
+    def get_stats(self) -> dict[str, Optional[float]]:
+        with self._lock:
+            return self._stats.to_dict(*self._get_totals())
+
+    def close(self) -> None:
+        self._db.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._get_totals()[0]
+
+    def _get_totals(self) -> tuple[int, int]:
+        entries, size = self._db.execute(f"SELECT COUNT(*), COALESCE(SUM(LENGTH(value)), 0) FROM {self._table}").fetchone()
+        return entries, size
+
+    def _expire(self, now: float) -> list[Eviction]:
+        if self._config.ttl_seconds is None:
+            return []
+        expired = self._db.execute(
+            f"DELETE FROM {self._table} WHERE accessed_at <= ? RETURNING key, value",
+            (now - self._config.ttl_seconds,),
+        ).fetchall()
+        self._stats.expirations += len(expired)
+        return [tuple(row) for row in expired]
+
+
+class RedisStore:
+    """A store with the same interface as `BoundedStore`, kept in a Redis-protocol server.
+
+    The server expires entries `ttl_seconds` after they were last accessed.
+    `max_entries` and `max_bytes` aren't enforced per store: configure the
+    server's `maxmemory` with an LRU eviction policy instead. Since the
+    server evicts entries itself, `put` and `expire` never return evictions,
+    and the eviction counts in `get_stats` are the server's.
+    """
+
+    def __init__(self, url: str, table: str, config: Optional[BoundedStoreConfig] = None, client: Any = None):
+        """
+        Args:
+            url: The server's URL, e.g. "redis://localhost:6379/0".
+            table: The key prefix to keep the entries under.
+            config: The store's TTL. The other bounds are ignored.
+            client: A Redis client to use instead of connecting to `url`. It
+                must decode responses to `str`.
+        """
+        if client is None:
+            if redis is None:
+                raise ImportError("RedisStore requires the redis package. Install a2ui[redis].")
+            client = redis.Redis.from_url(url, decode_responses=True)
+        self._client = client
+        self._config = config or BoundedStoreConfig()
+        self._prefix = f"a2ui:{table}:"
+        self._ttl_ms = int(self._config.ttl_seconds * 1000) if self._config.ttl_seconds is not None else None
+
+    def get(self, key: str) -> Optional[str]:
+        if self._ttl_ms is None:
+            return self._client.get(self._prefix + key)
+        # Refreshes the TTL, like an access to the other stores.
+        return self._client.getex(self._prefix + key, px=self._ttl_ms)
+
+    def put(self, key: str, value: str) -> list[Eviction]:
+        self._client.set(self._prefix + key, value, px=self._ttl_ms)
+        return []
+
+    def delete(self, key: str) -> Optional[str]:
+        return self._client.getdel(self._prefix + key)
+
+    def expire(self) -> list[Eviction]:
+        return []
+
+    def get_stats(self) -> dict[str, Optional[float]]:
+        keys = list(self._client.scan_iter(match=self._prefix + "*"))
+        size = sum(self._client.strlen(key) for key in keys)
+        server_stats = self._client.info("stats")
+        return {
+            "entries": len(keys),
+            "bytes": size,
+            "evictions": server_stats.get("evicted_keys", 0),
+            "expirations": server_stats.get("expired_keys", 0),
+            "max_entries": None,
+            "max_bytes": None,
+            "ttl_seconds": self._config.ttl_seconds,
+        }
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self._client.scan_iter(match=self._prefix + "*"))
+
+
+def create_shared_store(config: Optional[BoundedStoreConfig], table: str) -> "SqliteStore | RedisStore | None":
+    """Returns a `RedisStore` or `SqliteStore` for the config, or None if it keeps stores in memory."""
+    config = config or BoundedStoreConfig()
+    if config.redis_url:
+        return RedisStore(config.redis_url, table, config)
+    if config.sqlite_path:
+        return SqliteStore(config.sqlite_path, table, config)
+    return None
+
+
+def create_bounded_store(config: Optional[BoundedStoreConfig], table: str) -> "BoundedStore | SqliteStore | RedisStore":
+    """Returns the shared store for the config if it has one, else a `BoundedStore`."""
+    store = create_shared_store(config, table)
+    return store if store is not None else BoundedStore(config)
+
+
+class BoundedTaskStore(TaskStore):
+    """A drop-in replacement for `InMemoryTaskStore` with bounded size.
+
+    Tasks are stored as JSON, so callers always get their own copy.
+    """
+
+    def __init__(
+        self, config: Optional[BoundedStoreConfig] = None, store: "BoundedStore | SqliteStore | RedisStore | None" = None
+    ):
+        """
+        Args:
+            config: The store's bounds, and where to keep tasks.
+            store: The store to keep tasks in. Defaults to one created from
+                `config`.
+        """
+        self._store = store or create_bounded_store(config, "a2a_tasks")
+
+    async def save(self, task: Task, context: Optional[ServerCallContext] = None) -> None:
+        for task_id, _ in self._store.put(task.id, task.model_dump_json(exclude_none=True)):
+            logger.info(f"Evicted task {task_id} from the task store")
+
+    async def get(self, task_id: str, context: Optional[ServerCallContext] = None) -> Optional[Task]:
+        value = self._store.get(task_id)
+        return Task.model_validate_json(value) if value is not None else None
+
+    async def delete(self, task_id: str, context: Optional[ServerCallContext] = None) -> None:
+        if self._store.delete(task_id) is None:
+            logger.warning(f"Attempted to delete nonexistent task with id: {task_id}")
+
+    def get_stats(self) -> dict[str, Optional[float]]:
+        """Returns the number of tasks, their total bytes and eviction counts."""
+        return self._store.get_stats()
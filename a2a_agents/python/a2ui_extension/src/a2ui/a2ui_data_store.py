@@ -0,0 +1,308 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Indexed, preloaded JSON records for agent tools.
+
+Sample tools look records up in JSON files. `IndexedDataStore` loads a file,
+or a directory of files, once and keeps inverted indexes over the fields the
+tools filter by, so a lookup touches the index vocabulary and the matching
+records rather than every record. The files are reloaded in the background
+when they change; lookups keep using the previous snapshot until the new one
+is ready.
+
+Records may embed a placeholder URL (e.g. for their images) that is replaced
+by the agent's base URL; the rewritten records are built once per base URL.
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Iterable
+from typing import Any, Callable, Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHECK_INTERVAL_SECONDS = 1.0
+DEFAULT_MAX_BASE_URLS = 8
+
+# Returns the terms a record is indexed under.
+RecordIndexer = Callable[[dict[str, Any]], Iterable[str]]
+
+_WORD = re.compile(r"\w+")
+
+
+def index_fields(*fields: str) -> RecordIndexer:
+    """Indexes records under the lowercased values of the fields.
+
+    A list value indexes the record under each of its items.
+    """
+
+    def get_terms(record: dict[str, Any]) -> Iterable[str]:
+        for field in fields:
+            value = record.get(field)
+            for item in value if isinstance(value, list) else [value]:
+                if isinstance(item, str) and item:
+                    yield item.lower()
+
+    return get_terms
+
+
+def index_words(*fields: str) -> RecordIndexer:
+    """Indexes records under the lowercased words of the fields."""
+    get_values = index_fields(*fields)
+
+    def get_terms(record: dict[str, Any]) -> Iterable[str]:
+        for value in get_values(record):
+            yield from _WORD.findall(value)
+
+    return get_terms
+
+
+def _contains(value: Any, text: str) -> bool:
+    if isinstance(value, str):
+        return text in value
+    if isinstance(value, dict):
+        return any(_contains(v, text) for v in value.values())
+    if isinstance(value, list):
+        return any(_contains(v, text) for v in value)
+    return False
+
+
+def _replace(value: Any, old: str, new: str) -> Any:
+    if isinstance(value, str):
+        return value.replace(old, new)
+    if isinstance(value, dict):
+        return {k: _replace(v, old, new) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_replace(v, old, new) for v in value]
+    return value
+
+
+class DataSnapshot:
+    """The records and indexes loaded from the files at one point in time."""
+
+    def __init__(
+        self,
+        records: list[dict[str, Any]],
+        indexes: dict[str, RecordIndexer],
+        url_placeholder: Optional[str] = None,
+        max_base_urls: int = DEFAULT_MAX_BASE_URLS,
+    ):
+        self.records = records
+        self._postings: dict[str, dict[str, list[int]]] = {name: {} for name in indexes}
+        for record_id, record in enumerate(records):
+            for name, get_terms in indexes.items():
+                postings = self._postings[name]
+                for term in set(get_terms(record)):
+                    postings.setdefault(term, []).append(record_id)
+
+        self._url_placeholder = url_placeholder
+        # Only the records that embed the placeholder are rewritten per base URL.
+        self._templated_ids = (
+            [record_id for record_id, record in enumerate(records) if _contains(record, url_placeholder)]
+            if url_placeholder
+            else []
+        )
+        self._rewritten: OrderedDict[str, list[dict[str, Any]]] = OrderedDict()
+        self._max_base_urls = max_base_urls
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def get_terms(self, index: str) -> Iterable[str]:
+        """Returns the distinct terms of an index."""
+        return self._postings[index].keys()
+
+    def lookup(self, index: str, term: str) -> list[int]:
+        """Returns the ids of the records indexed under the term, in file order."""
+        return self._postings[index].get(term, [])
+
+    def find(self, index: str, predicate: Callable[[str], bool]) -> set[int]:
+        """Returns the ids of the records indexed under any term matching the predicate.
+
+        Only the index vocabulary is scanned, not the records.
+        """
+        record_ids: set[int] = set()
+        for term, postings in self._postings[index].items():
+            if predicate(term):
+                record_ids.update(postings)
+        return record_ids
+
+    def get_records(
+        self,
+        record_ids: Iterable[int],
+        base_url: Optional[str] = None,
+        limit: Optional[int] = None,
+        keep_order: bool = False,
+    ) -> list[dict[str, Any]]:
+        """Returns the records in file order, with the URL placeholder replaced by `base_url`.
+
+        If `keep_order` is set, the records are returned in the order of
+        `record_ids` instead, e.g. for ranked results. The returned records
+        are shared; callers must not modify them.
+        """
+        record_ids = (list(record_ids) if keep_order else sorted(record_ids))[:limit]
+        records = self._get_rewritten(base_url) if base_url else self.records
+        return [records[record_id] for record_id in record_ids]
+
+    def _get_rewritten(self, base_url: str) -> list[dict[str, Any]]:
+        if not self._url_placeholder or base_url == self._url_placeholder:
+            return self.records
+        with self._lock:
+            rewritten = self._rewritten.get(base_url)
+            if rewritten is not None:
+                self._rewritten.move_to_end(base_url)
+                return rewritten
+            rewritten = list(self.records)
+            for record_id in self._templated_ids:
+                rewritten[record_id] = _replace(self.records[record_id], self._url_placeholder, base_url)
+            self._rewritten[base_url] = rewritten
+            if len(self._rewritten) > self._max_base_urls:
+                self._rewritten.popitem(last=False)
+            return rewritten
+
+
+class IndexedDataStore:
+    """JSON records loaded once, indexed, and reloaded when their files change.
+
+    Args:
+        path: A JSON file holding a list of records, or a directory of such
+            files, which are read in name order.
+        indexes: The indexes to keep, by name, e.g.
+            `{"department": index_fields("department")}`.
+        url_placeholder: A URL in the records to replace with the base URL
+            passed to `DataSnapshot.get_records`.
+        check_interval_seconds: How often to check the files for changes.
+        max_base_urls: The number of base URLs to keep rewritten records for.
+        on_load: Called with each new snapshot before it is served, e.g. to
+            update other indexes incrementally.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        indexes: dict[str, RecordIndexer],
+        url_placeholder: Optional[str] = None,
+        check_interval_seconds: float = DEFAULT_CHECK_INTERVAL_SECONDS,
+        max_base_urls: int = DEFAULT_MAX_BASE_URLS,
+        on_load: Optional[Callable[[DataSnapshot], None]] = None,
+    ):
+        self._path = path
+        self._indexes = indexes
+        self._url_placeholder = url_placeholder
+        self._check_interval_seconds = check_interval_seconds
+        self._max_base_urls = max_base_urls
+        self._on_load = on_load
+        self._lock = threading.Lock()
+        self._reloading = False
+        self._checked_at = 0.0
+        self._signature = None
+        self._snapshot = DataSnapshot([], indexes)
+        self.refresh()
+
+    def get_snapshot(self) -> DataSnapshot:
+        """Returns the loaded records without blocking.
+
+        The files are checked with `os.stat` at most once per check interval.
+        Only if they changed are they reloaded, in a background thread, and
+        later calls return the new snapshot.
+        """
+        now = time.monotonic()
+        with self._lock:
+            check = not self._reloading and now - self._checked_at >= self._check_interval_seconds
+            if check:
+                self._checked_at = now
+        if not check:
+            return self._snapshot
+
+        signature = self._get_signature()
+        with self._lock:
+            reload = not self._reloading and signature != self._signature
+            if reload:
+                self._reloading = True
+        if reload:
+            threading.Thread(target=self._reload_in_background, args=(signature,), daemon=True).start()
+        return self._snapshot
+
+    def refresh(self, signature: Optional[tuple[tuple[str, int, int], ...]] = None) -> bool:
+        """Reloads the files if they changed since they were loaded.
+
+        Args:
+            signature: The files' signature, if it was just checked.
+
+        Returns:
+            Whether the files were reloaded.
+        """
+        if signature is None:
+            signature = self._get_signature()
+        if signature == self._signature:
+            return False
+
+        records: list[dict[str, Any]] = []
+        for file_path in self._get_files():
+            try:
+                with open(file_path, "rb") as f:
+                    data = f.read()
+                loaded = orjson.loads(data) if orjson is not None else json.loads(data)
+            except (OSError, ValueError) as e:
+                # Keep serving the last good snapshot, e.g. while a file is being written.
+                logger.error(f"Failed to load {file_path}: {e}")
+                return False
+            records.extend(loaded if isinstance(loaded, list) else [loaded])
+
+        snapshot = DataSnapshot(records, self._indexes, self._url_placeholder, self._max_base_urls)
+        if self._on_load is not None:
+            self._on_load(snapshot)
+        with self._lock:
+            self._snapshot = snapshot
+            self._signature = signature
+        logger.info(f"Loaded {len(records)} records from {self._path}")
+        return True
+
+    def _reload_in_background(self, signature: Optional[tuple[tuple[str, int, int], ...]]) -> None:
+        try:
+            self.refresh(signature)
+        except Exception:
+            logger.exception(f"Failed to reload {self._path}")
+        finally:
+            with self._lock:
+                self._reloading = False
+
+    def _get_files(self) -> list[str]:
+        if not os.path.isdir(self._path):
+            return [self._path]
+        return [
+            os.path.join(self._path, name) for name in sorted(os.listdir(self._path)) if name.endswith(".json")
+        ]
+
+    def _get_signature(self) -> Optional[tuple[tuple[str, int, int], ...]]:
+        try:
+            return tuple(
+                (file_path, stat.st_mtime_ns, stat.st_size)
+                for file_path in self._get_files()
+                for stat in [os.stat(file_path)]
+            )
+        except OSError as e:
+            logger.error(f"Failed to check {self._path}: {e}")
+            return self._signature
@@ -12,39 +12,85 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import base64
+import hashlib
+import json
 import logging
-from typing import Any, Optional
+import threading
+import zlib
+from collections import OrderedDict
+from collections.abc import Iterable
+from typing import Any, Callable, Optional
 
+import jsonschema
 from a2a.server.agent_execution import RequestContext
 from a2a.types import AgentExtension, Part, DataPart
+from a2ui.a2ui_bounded_store import BoundedStoreConfig, create_shared_store
+from a2ui.a2ui_instrumentation import STAGE_SCHEMA_VALIDATION, a2ui_span
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
 
 logger = logging.getLogger(__name__)
 
 A2UI_EXTENSION_URI = "https://a2ui.org/a2a-extension/a2ui/v0.8"
+A2UI_SPEC_VERSION = "0.8"
+
+A2UI_JSON_DELIMITER = "---a2ui_JSON---"
+
+BEGIN_RENDERING_KEY = "beginRendering"
+SURFACE_UPDATE_KEY = "surfaceUpdate"
+DATA_MODEL_UPDATE_KEY = "dataModelUpdate"
+DELETE_SURFACE_KEY = "deleteSurface"
+USER_ACTION_KEY = "userAction"
 
 MIME_TYPE_KEY = "mimeType"
 A2UI_MIME_TYPE = "application/json+a2ui"
+# Compact encodings a client can opt into with `supportedEncodings`.
+A2UI_COMPACT_MIME_TYPE = "application/json+a2ui-compact"
+A2UI_DEFLATE_MIME_TYPE = "application/json+a2ui-deflate"
+A2UI_MSGPACK_MIME_TYPE = "application/msgpack+a2ui"
+ENCODED_DATA_KEY = "encoded"
+COMPACT_VALUES_KEY = "values"
 
 A2UI_CLIENT_CAPABILITIES_KEY = "a2uiClientCapabilities"
 SUPPORTED_CATALOG_IDS_KEY = "supportedCatalogIds"
 INLINE_CATALOGS_KEY = "inlineCatalogs"
+SUPPORTED_ENCODINGS_KEY = "supportedEncodings"
+SURFACE_DELTAS_KEY = "surfaceDeltas"
 
 STANDARD_CATALOG_ID = "https://raw.githubusercontent.com/google/A2UI/refs/heads/main/specification/0.8/json/standard_catalog_definition.json"
 
-def create_a2ui_part(a2ui_data: dict[str, Any]) -> Part:
+DEFAULT_VALIDATOR_CACHE_SIZE = 32
+DEFAULT_CAPABILITY_CACHE_SIZE = 128
+DEFAULT_SURFACE_STATE_MAX_SESSIONS = 1024
+
+def create_a2ui_part(a2ui_data: dict[str, Any], encoding: str = A2UI_MIME_TYPE) -> Part:
     """Creates an A2A Part containing A2UI data.
 
     Args:
         a2ui_data: The A2UI data dictionary.
+        encoding: The mime type to encode the data with, usually picked with
+          `select_a2ui_encoding`. Falls back to plain JSON if the data can't be
+          encoded.
 
     Returns:
         An A2A Part with a DataPart containing the A2UI data.
     """
+    if encoding != A2UI_MIME_TYPE:
+        try:
+            a2ui_data = encode_a2ui_data(a2ui_data, encoding)
+        except ValueError as e:
+            logger.warning(f"Sending A2UI data as {A2UI_MIME_TYPE}: {e}")
+            encoding = A2UI_MIME_TYPE
+
     return Part(
         root=DataPart(
             data=a2ui_data,
             metadata={
-                MIME_TYPE_KEY: A2UI_MIME_TYPE,
+                MIME_TYPE_KEY: encoding,
             },
         )
     )
@@ -57,29 +103,265 @@ def is_a2ui_part(part: Part) -> bool:
         part: The A2A Part to check.
 
     Returns:
-        True if the part contains A2UI data, False otherwise.
+        True if the part contains A2UI data in any encoding, False otherwise.
     """
     return (
         isinstance(part.root, DataPart)
         and part.root.metadata
-        and part.root.metadata.get(MIME_TYPE_KEY) == A2UI_MIME_TYPE
+        and part.root.metadata.get(MIME_TYPE_KEY) in _A2UI_MIME_TYPES
     )
 
 
 def get_a2ui_datapart(part: Part) -> Optional[DataPart]:
     """Extracts the DataPart containing A2UI data from an A2A Part, if present.
 
+    Compact encodings are decoded, so the returned DataPart always contains
+    plain A2UI JSON.
+
     Args:
         part: The A2A Part to extract A2UI data from.
 
     Returns:
         The DataPart containing A2UI data if present, None otherwise.
     """
-    if is_a2ui_part(part):
+    if not is_a2ui_part(part):
+        return None
+
+    encoding = part.root.metadata[MIME_TYPE_KEY]
+    if encoding == A2UI_MIME_TYPE:
         return part.root
+    return DataPart(
+        data=decode_a2ui_data(part.root.data, encoding),
+        metadata={**part.root.metadata, MIME_TYPE_KEY: A2UI_MIME_TYPE},
+    )
+
+
+def encode_a2ui_part(part: Part, encoding: str) -> Part:
+    """Re-encodes an A2UI part with the given encoding.
+
+    Args:
+        part: The A2A Part. Parts without A2UI data are returned unchanged.
+        encoding: The mime type to encode the data with.
+
+    Returns:
+        The part with its A2UI data in `encoding`.
+    """
+    if not is_a2ui_part(part) or part.root.metadata[MIME_TYPE_KEY] == encoding:
+        return part
+    return create_a2ui_part(get_a2ui_datapart(part).data, encoding)
+
+
+def get_a2ui_encodings() -> list[str]:
+    """Returns the A2UI encodings this package can produce, plain JSON first."""
+    encodings = [A2UI_MIME_TYPE, A2UI_COMPACT_MIME_TYPE, A2UI_DEFLATE_MIME_TYPE]
+    if msgpack is not None:
+        encodings.append(A2UI_MSGPACK_MIME_TYPE)
+    return encodings
+
+
+def select_a2ui_encoding(client_capabilities: Optional[dict[str, Any]]) -> str:
+    """Picks the encoding for A2UI parts sent to a client.
+
+    Args:
+        client_capabilities: The client's `a2uiClientCapabilities`, whose
+          optional `supportedEncodings` lists mime types in preference order.
+
+    Returns:
+        The client's most preferred encoding that is available, or plain JSON.
+    """
+    if client_capabilities:
+        available = get_a2ui_encodings()
+        for encoding in client_capabilities.get(SUPPORTED_ENCODINGS_KEY) or []:
+            if encoding in available:
+                return encoding
+    return A2UI_MIME_TYPE
+
+
+def supports_a2ui_surface_deltas(client_capabilities: Optional[dict[str, Any]]) -> bool:
+    """Returns whether a client accepts responses with only the surface changes.
+
+    Clients opt in with `surfaceDeltas: true` in their capabilities. Others may
+    clear their surfaces before applying a response, so they must be sent
+    whole surfaces.
+
+    Args:
+        client_capabilities: The client's `a2uiClientCapabilities`, or None.
+    """
+    return bool(client_capabilities and client_capabilities.get(SURFACE_DELTAS_KEY) is True)
+
+
+def get_a2ui_client_capabilities(context: RequestContext) -> Optional[dict[str, Any]]:
+    """Returns the `a2uiClientCapabilities` sent in the request's message metadata.
+
+    Args:
+        context: The request context.
+
+    Returns:
+        The client capabilities, or None if the client didn't send any.
+    """
+    if context.message and context.message.metadata:
+        return context.message.metadata.get(A2UI_CLIENT_CAPABILITIES_KEY)
+    return None
+
+
+def get_a2ui_user_action(context: RequestContext) -> Optional[dict[str, Any]]:
+    """Returns the `userAction` sent in the request's message, if any.
+
+    Args:
+        context: The request context.
+
+    Returns:
+        The userAction, e.g. `{"name": ..., "surfaceId": ..., "context": ...}`,
+        or None if the message isn't a userAction.
+    """
+    if context.message:
+        for part in context.message.parts:
+            if isinstance(part.root, DataPart) and USER_ACTION_KEY in part.root.data:
+                return part.root.data[USER_ACTION_KEY]
     return None
 
 
+def encode_a2ui_data(a2ui_data: dict[str, Any], encoding: str) -> dict[str, Any]:
+    """Encodes an A2UI message for a DataPart with the given mime type.
+
+    The compact encoding replaces dataModelUpdate `contents` adjacency lists
+    with a nested `values` object. The deflate and msgpack encodings compress
+    the compact form and send it base64 encoded in an `encoded` field.
+
+    Args:
+        a2ui_data: The A2UI message.
+        encoding: One of the mime types from `get_a2ui_encodings`.
+
+    Returns:
+        The data for the DataPart.
+
+    Raises:
+        ValueError: If the encoding is unavailable or the message can't be
+          encoded without loss.
+    """
+    if encoding == A2UI_MIME_TYPE:
+        return a2ui_data
+    if encoding not in get_a2ui_encodings():
+        raise ValueError(f"Unsupported A2UI encoding: {encoding}")
+
+    compact = _compact_a2ui_data(a2ui_data)
+    if encoding == A2UI_COMPACT_MIME_TYPE:
+        return compact
+    if encoding == A2UI_DEFLATE_MIME_TYPE:
+        payload = zlib.compress(
+            json.dumps(compact, separators=(",", ":")).encode("utf-8"), 9
+        )
+    else:
+        payload = msgpack.packb(compact)
+    return {ENCODED_DATA_KEY: base64.b64encode(payload).decode("ascii")}
+
+
+def decode_a2ui_data(data: dict[str, Any], encoding: str) -> dict[str, Any]:
+    """Decodes the data of an A2UI DataPart back into a plain A2UI message.
+
+    Args:
+        data: The DataPart data.
+        encoding: The DataPart's mime type.
+
+    Returns:
+        The A2UI message.
+
+    Raises:
+        ValueError: If the encoding is unknown or unavailable.
+    """
+    if encoding == A2UI_MIME_TYPE:
+        return data
+    if encoding == A2UI_COMPACT_MIME_TYPE:
+        return _expand_a2ui_data(data)
+    if encoding == A2UI_DEFLATE_MIME_TYPE:
+        payload = zlib.decompress(base64.b64decode(data[ENCODED_DATA_KEY]))
+        return _expand_a2ui_data(json.loads(payload))
+    if encoding == A2UI_MSGPACK_MIME_TYPE:
+        if msgpack is None:
+            raise ValueError("msgpack is required to decode msgpack A2UI data.")
+        return _expand_a2ui_data(msgpack.unpackb(base64.b64decode(data[ENCODED_DATA_KEY])))
+    raise ValueError(f"Unsupported A2UI encoding: {encoding}")
+
+
+_A2UI_MIME_TYPES = frozenset(
+    (A2UI_MIME_TYPE, A2UI_COMPACT_MIME_TYPE, A2UI_DEFLATE_MIME_TYPE, A2UI_MSGPACK_MIME_TYPE)
+)
+
+_SCALAR_VALUE_TYPES = (
+    ("valueString", str),
+    ("valueBoolean", bool),
+    ("valueNumber", (int, float)),
+)
+
+
+def _compact_contents(contents: list[dict[str, Any]]) -> dict[str, Any]:
+    values = {}
+    for entry in contents:
+        key = entry["key"]
+        if key in values:
+            raise ValueError(f"Duplicate data model key: {key}")
+        if "valueMap" in entry:
+            values[key] = _compact_contents(entry["valueMap"])
+            continue
+        for value_key, value_type in _SCALAR_VALUE_TYPES:
+            if value_key in entry:
+                value = entry[value_key]
+                # Types are inferred again when expanding, so they must match.
+                if not isinstance(value, value_type) or (
+                    value_key == "valueNumber" and isinstance(value, bool)
+                ):
+                    raise ValueError(f"Data model key {key} has a mistyped {value_key}")
+                values[key] = value
+                break
+        else:
+            raise ValueError(f"Data model key {key} has no value")
+    return values
+
+
+def _expand_values(values: dict[str, Any]) -> list[dict[str, Any]]:
+    contents = []
+    for key, value in values.items():
+        if isinstance(value, dict):
+            contents.append({"key": key, "valueMap": _expand_values(value)})
+        elif isinstance(value, str):
+            contents.append({"key": key, "valueString": value})
+        elif isinstance(value, bool):
+            contents.append({"key": key, "valueBoolean": value})
+        else:
+            contents.append({"key": key, "valueNumber": value})
+    return contents
+
+
+def _compact_a2ui_data(a2ui_data: dict[str, Any]) -> dict[str, Any]:
+    update = a2ui_data.get(DATA_MODEL_UPDATE_KEY)
+    if not update or "contents" not in update:
+        return a2ui_data
+    compact_update = {k: v for k, v in update.items() if k != "contents"}
+    compact_update[COMPACT_VALUES_KEY] = _compact_contents(update["contents"])
+    return {**a2ui_data, DATA_MODEL_UPDATE_KEY: compact_update}
+
+
+def _expand_a2ui_data(a2ui_data: dict[str, Any]) -> dict[str, Any]:
+    update = a2ui_data.get(DATA_MODEL_UPDATE_KEY)
+    if not update or COMPACT_VALUES_KEY not in update:
+        return a2ui_data
+    expanded_update = {k: v for k, v in update.items() if k != COMPACT_VALUES_KEY}
+    expanded_update["contents"] = _expand_values(update[COMPACT_VALUES_KEY])
+    return {**a2ui_data, DATA_MODEL_UPDATE_KEY: expanded_update}
+
+
+def get_a2ui_dataparts(parts: Iterable[Part]) -> list[DataPart]:
+    """Extracts the A2UI DataParts from a list of parts.
+
+    Args:
+        parts: The A2A Parts to scan.
+
+    Returns:
+        The DataParts containing A2UI data, decoded and in order.
+    """
+    return [datapart for part in parts if (datapart := get_a2ui_datapart(part))]
+
+
 def get_a2ui_agent_extension(
     accepts_inline_custom_catalog: bool = False,
 ) -> AgentExtension:
@@ -115,3 +397,526 @@ def try_activate_a2ui_extension(context: RequestContext) -> bool:
         context.add_activated_extension(A2UI_EXTENSION_URI)
         return True
     return False
+
+
+def get_a2ui_catalog_hash(catalog: Any) -> str:
+    """Computes a stable hash for an A2UI catalog or schema.
+
+    Used to key inline catalogs, which have no catalog id of their own.
+
+    Args:
+        catalog: The catalog as a JSON string or a JSON-compatible object.
+
+    Returns:
+        A hex digest identifying the catalog contents.
+    """
+    if not isinstance(catalog, str):
+        catalog = json.dumps(catalog, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(catalog.encode("utf-8")).hexdigest()
+
+
+class A2uiValidatorRegistry:
+    """Compiles A2UI schema validators once and reuses them across requests.
+
+    Validators are keyed by (spec version, catalog id) and validate a *list* of
+    A2UI messages, which is what agents send per turn. The meta-schema check and
+    validator construction happen only when a key is first seen. The least
+    recently used validators are evicted once `max_size` is reached.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_VALIDATOR_CACHE_SIZE):
+        if max_size < 1:
+            raise ValueError(f"max_size must be at least 1, got {max_size}")
+        self._max_size = max_size
+        self._validators: OrderedDict[tuple[str, str], jsonschema.protocols.Validator] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_validator(
+        self,
+        a2ui_schema: dict[str, Any],
+        catalog_id: Optional[str] = None,
+        spec_version: str = A2UI_SPEC_VERSION,
+    ) -> jsonschema.protocols.Validator:
+        """Returns a compiled validator for a list of A2UI messages.
+
+        Args:
+            a2ui_schema: The schema for a single A2UI message, with the catalog
+                components already merged in.
+            catalog_id: The id of the catalog merged into `a2ui_schema`. If not
+                provided (e.g. for inline catalogs), the schema contents are hashed.
+            spec_version: The A2UI spec version of `a2ui_schema`.
+
+        Returns:
+            A validator that checks an array of A2UI messages.
+
+        Raises:
+            jsonschema.exceptions.SchemaError: If the schema itself is invalid.
+        """
+        key = (spec_version, catalog_id or get_a2ui_catalog_hash(a2ui_schema))
+        with self._lock:
+            validator = self._validators.get(key)
+            if validator is not None:
+                self._validators.move_to_end(key)
+                return validator
+
+        list_schema = {"type": "array", "items": a2ui_schema}
+        validator_cls = jsonschema.validators.validator_for(list_schema)
+        validator_cls.check_schema(list_schema)
+        validator = validator_cls(list_schema)
+        logger.info(f"Compiled A2UI validator for spec version {key[0]} and catalog {key[1]}")
+
+        with self._lock:
+            self._validators[key] = validator
+            self._validators.move_to_end(key)
+            while len(self._validators) > self._max_size:
+                evicted_key, _ = self._validators.popitem(last=False)
+                logger.info(f"Evicted A2UI validator for spec version {evicted_key[0]} and catalog {evicted_key[1]}")
+        return validator
+
+    def clear(self) -> None:
+        """Removes all cached validators."""
+        with self._lock:
+            self._validators.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._validators)
+
+
+_default_validator_registry = A2uiValidatorRegistry()
+
+
+def get_a2ui_validator(
+    a2ui_schema: dict[str, Any],
+    catalog_id: Optional[str] = None,
+    spec_version: str = A2UI_SPEC_VERSION,
+) -> jsonschema.protocols.Validator:
+    """Returns a cached validator for a list of A2UI messages.
+
+    Args:
+        a2ui_schema: The schema for a single A2UI message.
+        catalog_id: The id of the catalog merged into `a2ui_schema`, if any.
+        spec_version: The A2UI spec version of `a2ui_schema`.
+
+    Returns:
+        A validator from the shared registry.
+    """
+    return _default_validator_registry.get_validator(
+        a2ui_schema, catalog_id=catalog_id, spec_version=spec_version
+    )
+
+
+def validate_a2ui_messages(
+    messages: Any,
+    a2ui_schema: dict[str, Any],
+    catalog_id: Optional[str] = None,
+    spec_version: str = A2UI_SPEC_VERSION,
+) -> None:
+    """Validates a list of A2UI messages using a cached validator.
+
+    Args:
+        messages: The parsed A2UI JSON, expected to be a list of messages.
+        a2ui_schema: The schema for a single A2UI message.
+        catalog_id: The id of the catalog merged into `a2ui_schema`, if any.
+        spec_version: The A2UI spec version of `a2ui_schema`.
+
+    Raises:
+        jsonschema.exceptions.ValidationError: If the messages are invalid.
+    """
+    validator = get_a2ui_validator(
+        a2ui_schema, catalog_id=catalog_id, spec_version=spec_version
+    )
+    with a2ui_span(STAGE_SCHEMA_VALIDATION):
+        error = jsonschema.exceptions.best_match(validator.iter_errors(messages))
+    if error is not None:
+        raise error
+
+
+def get_a2ui_client_capabilities_hash(client_capabilities: Optional[dict[str, Any]]) -> str:
+    """Computes a stable hash for an `a2uiClientCapabilities` payload.
+
+    Args:
+        client_capabilities: The client capabilities, or None if not sent.
+
+    Returns:
+        A hex digest identifying the capabilities.
+    """
+    return get_a2ui_catalog_hash(client_capabilities)
+
+
+class ResolvedA2uiCapabilities:
+    """The catalog, merged schema and validator for a client's capabilities.
+
+    Instances are shared between sessions, so `a2ui_schema` must not be mutated.
+    """
+
+    __slots__ = ("capabilities_hash", "catalog_id", "a2ui_schema", "validator")
+
+    def __init__(
+        self,
+        capabilities_hash: str,
+        catalog_id: Optional[str],
+        a2ui_schema: dict[str, Any],
+        validator: jsonschema.protocols.Validator,
+    ):
+        self.capabilities_hash = capabilities_hash
+        self.catalog_id = catalog_id
+        self.a2ui_schema = a2ui_schema
+        self.validator = validator
+
+
+class A2uiCapabilityResolver:
+    """Resolves client capabilities once per distinct capabilities payload.
+
+    Clients resend `a2uiClientCapabilities` with every message, and it rarely
+    changes within a conversation. The resolver hashes the payload and caches
+    the selected catalog, the merged schema and its compiled validator per hash,
+    evicting the least recently used entries once `max_size` is reached. Agents
+    can compare `capabilities_hash` against the hash stored in their session to
+    skip rewriting unchanged session state.
+    """
+
+    def __init__(
+        self,
+        load_a2ui_schema: Callable[[Optional[dict[str, Any]]], tuple[dict[str, Any], Optional[str]]],
+        max_size: int = DEFAULT_CAPABILITY_CACHE_SIZE,
+        validator_registry: Optional[A2uiValidatorRegistry] = None,
+    ):
+        """Initializes the resolver.
+
+        Args:
+            load_a2ui_schema: Selects the catalog for the client capabilities and
+                returns the merged A2UI schema and the catalog id (None for inline
+                catalogs).
+            max_size: The maximum number of distinct capabilities to cache.
+            validator_registry: The registry to compile validators with. Defaults
+                to the shared registry used by `validate_a2ui_messages`.
+        """
+        if max_size < 1:
+            raise ValueError(f"max_size must be at least 1, got {max_size}")
+        self._load_a2ui_schema = load_a2ui_schema
+        self._max_size = max_size
+        self._validator_registry = validator_registry or _default_validator_registry
+        self._resolved: OrderedDict[str, ResolvedA2uiCapabilities] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def resolve(self, client_capabilities: Optional[dict[str, Any]]) -> ResolvedA2uiCapabilities:
+        """Returns the resolved catalog, schema and validator for the capabilities.
+
+        Args:
+            client_capabilities: The client's `a2uiClientCapabilities`, or None.
+
+        Returns:
+            The cached resolution for these capabilities.
+
+        Raises:
+            Any error raised by `load_a2ui_schema`. Failures are not cached.
+        """
+        capabilities_hash = get_a2ui_client_capabilities_hash(client_capabilities)
+        with self._lock:
+            resolved = self._resolved.get(capabilities_hash)
+            if resolved is not None:
+                self._resolved.move_to_end(capabilities_hash)
+                return resolved
+
+        a2ui_schema, catalog_id = self._load_a2ui_schema(client_capabilities)
+        validator = self._validator_registry.get_validator(a2ui_schema, catalog_id=catalog_id)
+        resolved = ResolvedA2uiCapabilities(capabilities_hash, catalog_id, a2ui_schema, validator)
+        logger.info(f"Resolved A2UI client capabilities {capabilities_hash} to catalog {catalog_id}")
+
+        with self._lock:
+            self._resolved[capabilities_hash] = resolved
+            self._resolved.move_to_end(capabilities_hash)
+            while len(self._resolved) > self._max_size:
+                self._resolved.popitem(last=False)
+        return resolved
+
+    def clear(self) -> None:
+        """Removes all cached resolutions."""
+        with self._lock:
+            self._resolved.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._resolved)
+
+
+class _SurfaceState:
+    """The last rendered state of a single A2UI surface."""
+
+    __slots__ = ("begin_rendering", "components", "data_model")
+
+    def __init__(self):
+        self.begin_rendering: Optional[dict[str, Any]] = None
+        self.components: dict[str, dict[str, Any]] = {}
+        # Maps are dicts of key to value, leaves are (value key, value) tuples.
+        self.data_model: dict[str, Any] = {}
+
+
+def _split_data_path(path: Optional[str]) -> tuple[str, ...]:
+    return tuple(segment for segment in (path or "/").split("/") if segment)
+
+
+def _join_data_path(segments: tuple[str, ...]) -> str:
+    return "/" + "/".join(segments)
+
+
+def _data_contents_to_tree(contents: list[dict[str, Any]]) -> dict[str, Any]:
+    tree = {}
+    for entry in contents:
+        key = entry.get("key")
+        if key is None:
+            continue
+        if isinstance(entry.get("valueMap"), list):
+            tree[key] = _data_contents_to_tree(entry["valueMap"])
+        else:
+            value_key = next((k for k in entry if k.startswith("value")), None)
+            tree[key] = (value_key, entry.get(value_key))
+    return tree
+
+
+def _data_tree_to_contents(tree: dict[str, Any]) -> list[dict[str, Any]]:
+    contents = []
+    for key, value in tree.items():
+        if isinstance(value, dict):
+            contents.append({"key": key, "valueMap": _data_tree_to_contents(value)})
+        else:
+            contents.append({"key": key, value[0]: value[1]})
+    return contents
+
+
+def _diff_data_tree(
+    old: Any, new: dict[str, Any], path: tuple[str, ...]
+) -> list[tuple[tuple[str, ...], list[dict[str, Any]]]]:
+    """Returns the (path, contents) updates that turn `old` into `new`."""
+    replace = [(path, _data_tree_to_contents(new))]
+    if not isinstance(old, dict) or old.keys() - new.keys():
+        # Entries can't be removed individually, so the whole map is replaced.
+        return replace
+
+    changed_keys = [key for key, value in new.items() if old.get(key) != value]
+    if not changed_keys:
+        return []
+    if len(changed_keys) * 2 > len(new) or any("/" in key for key in changed_keys):
+        return replace
+
+    updates = []
+    for key in changed_keys:
+        value = new[key]
+        if isinstance(value, dict):
+            updates.extend(_diff_data_tree(old.get(key), value, path + (key,)))
+        else:
+            # Renderers treat a single "." entry as setting the value at the path.
+            updates.append((path + (key,), [{"key": ".", value[0]: value[1]}]))
+    return updates
+
+
+def _set_data_tree(root: dict[str, Any], path: tuple[str, ...], value: dict[str, Any]) -> dict[str, Any]:
+    """Mirrors how clients apply a dataModelUpdate, without mutating `root`."""
+    if not path:
+        return value
+    child = root.get(path[0])
+    return {
+        **root,
+        path[0]: _set_data_tree(child if isinstance(child, dict) else {}, path[1:], value),
+    }
+
+
+def _data_tree_from_json(tree: dict[str, Any]) -> dict[str, Any]:
+    """Restores the (value key, value) leaves that JSON turned into lists."""
+    return {
+        key: _data_tree_from_json(value) if isinstance(value, dict) else tuple(value)
+        for key, value in tree.items()
+    }
+
+
+def _get_data_tree(root: dict[str, Any], path: tuple[str, ...]) -> Any:
+    node = root
+    for segment in path:
+        if not isinstance(node, dict):
+            return None
+        node = node.get(segment)
+    return node
+
+
+class SurfaceStateStore:
+    """Tracks the A2UI surfaces sent to each session and emits minimal deltas.
+
+    Agents regenerate full surfaces every turn. `diff` compares each generated
+    message with what the session's client has already received for the same
+    `surfaceId` and returns only the messages, components and data model
+    entries that changed. Sessions are evicted least recently used first once
+    `max_sessions` is reached.
+
+    With a `sqlite_path` or `redis_url` in `config`, each session's surfaces
+    are also written to that store, and sessions that aren't in memory are
+    loaded from there. If the store is `shared` with other workers, sessions
+    are reloaded on every diff, so whichever worker handles a turn diffs
+    against what the client last received.
+
+    Only use it for clients that keep their surfaces between responses (see
+    `supports_a2ui_surface_deltas`).
+    """
+
+    def __init__(
+        self,
+        max_sessions: int = DEFAULT_SURFACE_STATE_MAX_SESSIONS,
+        config: Optional[BoundedStoreConfig] = None,
+    ):
+        if max_sessions < 1:
+            raise ValueError(f"max_sessions must be at least 1, got {max_sessions}")
+        self._max_sessions = max_sessions
+        self._sessions: OrderedDict[str, dict[str, _SurfaceState]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._shared = config is not None and config.shared
+        self._persisted = create_shared_store(config, "a2ui_surfaces")
+
+    def diff(
+        self, session_id: str, messages: list[dict[str, Any]], record: bool = True
+    ) -> list[dict[str, Any]]:
+        """Computes the minimal A2UI messages for a newly generated surface.
+
+        Args:
+            session_id: The session (A2A context id) the messages are sent to.
+            messages: The full A2UI messages generated for this turn.
+            record: Whether to record the messages as sent to the client.
+
+        Returns:
+            The A2UI messages to send. Messages for surfaces the session hasn't
+            seen are returned unchanged.
+        """
+        with self._lock:
+            surfaces = self._get_surfaces(session_id)
+            if surfaces is None:
+                surfaces = {}
+            if record:
+                self._sessions[session_id] = surfaces
+                self._sessions.move_to_end(session_id)
+                while len(self._sessions) > self._max_sessions:
+                    self._sessions.popitem(last=False)
+            else:
+                surfaces = {
+                    surface_id: self._copy_surface(surface)
+                    for surface_id, surface in surfaces.items()
+                }
+
+            result = []
+            for message in messages:
+                result.extend(self._diff_message(surfaces, message))
+            if record:
+                self._persist(session_id, surfaces)
+            return result
+
+    def clear(self, session_id: str, surface_id: Optional[str] = None) -> None:
+        """Forgets what was sent to a session, e.g. when its client reconnects.
+
+        Args:
+            session_id: The session to clear.
+            surface_id: The surface to clear. Clears all surfaces if not provided.
+        """
+        with self._lock:
+            if surface_id is None:
+                self._sessions.pop(session_id, None)
+                if self._persisted is not None:
+                    self._persisted.delete(session_id)
+            elif surfaces := self._get_surfaces(session_id):
+                surfaces.pop(surface_id, None)
+                self._persist(session_id, surfaces)
+
+    def _get_surfaces(self, session_id: str) -> Optional[dict[str, _SurfaceState]]:
+        surfaces = self._sessions.get(session_id)
+        if self._persisted is not None and (self._shared or surfaces is None):
+            # Deleted or expired by another worker if it isn't persisted.
+            value = self._persisted.get(session_id)
+            surfaces = self._load_surfaces(value) if value is not None else None
+            if surfaces is None:
+                self._sessions.pop(session_id, None)
+        return surfaces
+
+    def _persist(self, session_id: str, surfaces: dict[str, _SurfaceState]) -> None:
+        if self._persisted is None:
+            return
+        value = {
+            surface_id: {
+                BEGIN_RENDERING_KEY: surface.begin_rendering,
+                "components": surface.components,
+                "dataModel": surface.data_model,
+            }
+            for surface_id, surface in surfaces.items()
+        }
+        self._persisted.put(session_id, json.dumps(value))
+
+    @staticmethod
+    def _load_surfaces(value: str) -> dict[str, _SurfaceState]:
+        surfaces = {}
+        for surface_id, stored in json.loads(value).items():
+            surface = surfaces[surface_id] = _SurfaceState()
+            surface.begin_rendering = stored[BEGIN_RENDERING_KEY]
+            surface.components = stored["components"]
+            surface.data_model = _data_tree_from_json(stored["dataModel"])
+        return surfaces
+
+    @staticmethod
+    def _copy_surface(surface: _SurfaceState) -> _SurfaceState:
+        copy = _SurfaceState()
+        copy.begin_rendering = surface.begin_rendering
+        copy.components = dict(surface.components)
+        # Data models are never mutated in place, so they can be shared.
+        copy.data_model = surface.data_model
+        return copy
+
+    def _diff_message(
+        self, surfaces: dict[str, _SurfaceState], message: dict[str, Any]
+    ) -> list[dict[str, Any]]:
+        if delete_surface := message.get(DELETE_SURFACE_KEY):
+            surfaces.pop(delete_surface.get("surfaceId"), None)
+            return [message]
+
+        if begin_rendering := message.get(BEGIN_RENDERING_KEY):
+            surface = surfaces.setdefault(begin_rendering.get("surfaceId"), _SurfaceState())
+            if surface.begin_rendering == begin_rendering:
+                return []
+            surface.begin_rendering = begin_rendering
+            return [message]
+
+        if surface_update := message.get(SURFACE_UPDATE_KEY):
+            surface_id = surface_update.get("surfaceId")
+            surface = surfaces.setdefault(surface_id, _SurfaceState())
+            changed = []
+            for component in surface_update.get("components", []):
+                component_id = component.get("id")
+                if surface.components.get(component_id) != component:
+                    surface.components[component_id] = component
+                    changed.append(component)
+            if not changed:
+                return []
+            if len(changed) == len(surface_update.get("components", [])):
+                return [message]
+            return [{SURFACE_UPDATE_KEY: {**surface_update, "components": changed}}]
+
+        if data_model_update := message.get(DATA_MODEL_UPDATE_KEY):
+            surface_id = data_model_update.get("surfaceId")
+            is_new_surface = surface_id not in surfaces
+            surface = surfaces.setdefault(surface_id, _SurfaceState())
+            path = _split_data_path(data_model_update.get("path"))
+            new_tree = _data_contents_to_tree(data_model_update.get("contents", []))
+            old_tree = None if is_new_surface else _get_data_tree(surface.data_model, path)
+            surface.data_model = _set_data_tree(surface.data_model, path, new_tree)
+            if old_tree is None:
+                return [message]
+
+            updates = _diff_data_tree(old_tree, new_tree, path)
+            if len(updates) == 1 and updates[0][0] == path:
+                return [message]
+            return [
+                {
+                    DATA_MODEL_UPDATE_KEY: {
+                        "surfaceId": surface_id,
+                        "path": _join_data_path(update_path),
+                        "contents": contents,
+                    }
+                }
+                for update_path, contents in updates
+            ]
+
+        return [message]
@@ -0,0 +1,209 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Ranked fuzzy search over short texts, such as people's names.
+
+`FuzzyIndex` indexes the words of a few fields per document by their
+trigrams, so a query word finds the indexed words it shares trigrams with
+("jordon" finds "jordan") without scanning the documents. Words the query
+word is a prefix of ("jon" for "jonathan") are found in a sorted vocabulary.
+
+A query word scores 1.0 against the same word, `PREFIX_SCORE` against a
+word it is a prefix of, and the Dice coefficient of their trigrams
+otherwise. A document field scores the mean of the best score of each query
+word, and a document its best field score times the field's weight.
+"""
+
+import bisect
+import heapq
+import re
+import threading
+from collections import Counter
+from collections.abc import Mapping
+from typing import Callable, Optional
+
+DEFAULT_MIN_SCORE = 0.4
+PREFIX_SCORE = 0.9
+# Shorter query words would match too many words as prefixes.
+MIN_PREFIX_LENGTH = 2
+
+_WORD = re.compile(r"\w+")
+
+
+def _get_words(text: str) -> list[str]:
+    return _WORD.findall(text.lower())
+
+
+def _get_trigrams(word: str) -> set[str]:
+    # Padded like pg_trgm, so short words and word starts have trigrams too.
+    padded = f"  {word} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+class FuzzyIndex:
+    """A trigram and prefix index over the fields of documents.
+
+    Documents are added, updated and removed one at a time, or synced with
+    the current set of documents, so only changed documents are reindexed.
+
+    Args:
+        fields: The fields to index, with the weight of their scores, e.g.
+            `{"name": 1.0, "title": 0.8}`.
+        min_score: The default score a result needs.
+    """
+
+    def __init__(self, fields: Mapping[str, float], min_score: float = DEFAULT_MIN_SCORE):
+        self._weights = dict(fields)
+        self._min_score = min_score
+        self._documents: dict[str, dict[str, str]] = {}
+        # Which fields of which documents each word is in.
+        self._word_postings: dict[str, dict[str, set[str]]] = {}
+        self._trigram_words: dict[str, set[str]] = {}
+        # Rebuilt on the next search after words were added or removed.
+        self._sorted_words: Optional[list[str]] = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._documents
+
+    def update(self, key: str, document: Mapping[str, Optional[str]]) -> bool:
+        """Adds or reindexes a document.
+
+        Args:
+            key: The document's key.
+            document: The document, of which the indexed fields are read.
+
+        Returns:
+            Whether the document was new or changed.
+        """
+        fields = {field: document.get(field) or "" for field in self._weights}
+        with self._lock:
+            if self._documents.get(key) == fields:
+                return False
+            self._remove(key)
+            self._documents[key] = fields
+            for field, text in fields.items():
+                for word in set(_get_words(text)):
+                    postings = self._word_postings.get(word)
+                    if postings is None:
+                        postings = self._word_postings[word] = {}
+                        for trigram in _get_trigrams(word):
+                            self._trigram_words.setdefault(trigram, set()).add(word)
+                        self._sorted_words = None
+                    postings.setdefault(key, set()).add(field)
+            return True
+
+    def remove(self, key: str) -> bool:
+        """Removes a document, returning whether it was indexed."""
+        with self._lock:
+            return self._remove(key)
+
+    def sync(self, documents: Mapping[str, Mapping[str, Optional[str]]]) -> tuple[int, int]:
+        """Makes the index hold exactly `documents`, reindexing only what changed.
+
+        Returns:
+            The number of documents added or changed, and removed.
+        """
+        removed = [key for key in list(self._documents) if key not in documents]
+        for key in removed:
+            self.remove(key)
+        changed = sum(self.update(key, document) for key, document in documents.items())
+        return changed, len(removed)
+
+    def search(
+        self,
+        query: str,
+        limit: Optional[int] = 10,
+        min_score: Optional[float] = None,
+        accept: Optional[Callable[[str], bool]] = None,
+    ) -> list[tuple[str, float]]:
+        """Returns the best matching documents.
+
+        Args:
+            query: The text to search for.
+            limit: The maximum number of results, or None for all.
+            min_score: The score a result needs, instead of the index's.
+            accept: If given, only documents whose key it accepts are returned.
+
+        Returns:
+            (key, score) pairs, best first.
+        """
+        min_score = self._min_score if min_score is None else min_score
+        query_words = list(dict.fromkeys(_get_words(query)))
+        if not query_words:
+            return []
+
+        with self._lock:
+            # The best score of each query word per (key, field).
+            field_scores: dict[tuple[str, str], float] = {}
+            for query_word in query_words:
+                best: dict[tuple[str, str], float] = {}
+                for word, score in self._score_words(query_word).items():
+                    for key, fields in self._word_postings[word].items():
+                        for field in fields:
+                            if score > best.get((key, field), 0.0):
+                                best[(key, field)] = score
+                for key_field, score in best.items():
+                    field_scores[key_field] = field_scores.get(key_field, 0.0) + score
+
+        scores: dict[str, float] = {}
+        for (key, field), total in field_scores.items():
+            score = self._weights[field] * total / len(query_words)
+            if score >= min_score and score > scores.get(key, 0.0) and (accept is None or accept(key)):
+                scores[key] = score
+        # Ties are broken by key, so results are stable.
+        ranked = ((-score, key) for key, score in scores.items())
+        best = sorted(ranked) if limit is None else heapq.nsmallest(limit, ranked)
+        return [(key, -negated_score) for negated_score, key in best]
+
+    def _score_words(self, query_word: str) -> dict[str, float]:
+        query_trigrams = _get_trigrams(query_word)
+        shared = Counter(
+            word for trigram in query_trigrams for word in self._trigram_words.get(trigram, ())
+        )
+        scores = {
+            word: 2 * count / (len(query_trigrams) + len(_get_trigrams(word))) for word, count in shared.items()
+        }
+        if len(query_word) >= MIN_PREFIX_LENGTH:
+            if self._sorted_words is None:
+                self._sorted_words = sorted(self._word_postings)
+            i = bisect.bisect_left(self._sorted_words, query_word)
+            while i < len(self._sorted_words) and self._sorted_words[i].startswith(query_word):
+                word = self._sorted_words[i]
+                scores[word] = max(scores.get(word, 0.0), PREFIX_SCORE)
+                i += 1
+        if query_word in self._word_postings:
+            scores[query_word] = 1.0
+        return scores
+
+    def _remove(self, key: str) -> bool:
+        fields = self._documents.pop(key, None)
+        if fields is None:
+            return False
+        for text in fields.values():
+            for word in set(_get_words(text)):
+                postings = self._word_postings.get(word)
+                if postings is None or postings.pop(key, None) is None or postings:
+                    continue
+                del self._word_postings[word]
+                for trigram in _get_trigrams(word):
+                    words = self._trigram_words[trigram]
+                    words.discard(word)
+                    if not words:
+                        del self._trigram_words[trigram]
+                self._sorted_words = None
+        return True
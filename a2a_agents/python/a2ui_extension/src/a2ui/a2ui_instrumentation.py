@@ -0,0 +1,350 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Per-stage latency instrumentation for A2UI agents.
+
+Each stage of a turn (LLM calls, tool calls, delimiter split, JSON parse,
+schema validation, retries, part creation, event enqueue) is recorded as an
+OpenTelemetry span, if opentelemetry is installed, and as an observation in a
+Prometheus-style histogram labelled with the agent, the userAction and the
+stage. `A2uiMetricsApp` serves the histograms from a `/metrics` route; note
+that each worker process has its own.
+
+Stages are usually timed with `a2ui_span`. The agent and action labels are
+set once per request with `a2ui_request_labels`, and inherited by every span
+recorded while handling it.
+"""
+
+import bisect
+import contextlib
+import contextvars
+import logging
+import os
+import threading
+import time
+from collections.abc import Iterator
+from typing import Any, Callable, Optional
+
+try:
+    from opentelemetry import trace
+except ImportError:
+    trace = None
+
+logger = logging.getLogger(__name__)
+
+STAGE_TURN = "turn"
+STAGE_LLM_CALL = "llm_call"
+STAGE_TOOL_CALL = "tool_call"
+STAGE_DELIMITER_SPLIT = "delimiter_split"
+STAGE_JSON_PARSE = "json_parse"
+STAGE_SCHEMA_VALIDATION = "schema_validation"
+STAGE_RETRY = "retry"
+STAGE_PART_CREATION = "part_creation"
+STAGE_EVENT_ENQUEUE = "event_enqueue"
+
+# From sub-millisecond parsing to multi-second LLM calls.
+DEFAULT_LATENCY_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+
+_TRACER_NAME = "a2ui"
+
+# The (agent, action) labels of the request being handled.
+_request_labels: contextvars.ContextVar[tuple[str, str]] = contextvars.ContextVar(
+    "a2ui_request_labels", default=("", "")
+)
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class _Histogram:
+    __slots__ = ("bucket_counts", "sum", "count")
+
+    def __init__(self, num_buckets: int):
+        self.bucket_counts = [0] * num_buckets
+        self.sum = 0.0
+        self.count = 0
+
+
+class LatencyHistograms:
+    """Thread-safe latency histograms per (agent, action, stage)."""
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_LATENCY_BUCKETS):
+        if not buckets or list(buckets) != sorted(buckets):
+            raise ValueError("buckets must be a non-empty, increasing sequence")
+        self._buckets = tuple(buckets)
+        self._histograms: dict[tuple[str, str, str], _Histogram] = {}
+        self._gauge_sources: dict[str, Callable[[], dict[str, Optional[float]]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, agent: str, action: str, stage: str, seconds: float) -> None:
+        with self._lock:
+            histogram = self._histograms.get((agent, action, stage))
+            if histogram is None:
+                histogram = self._histograms[(agent, action, stage)] = _Histogram(len(self._buckets))
+            # Counts are stored per bucket and made cumulative when rendered.
+            index = bisect.bisect_left(self._buckets, seconds)
+            if index < len(self._buckets):
+                histogram.bucket_counts[index] += 1
+            histogram.sum += seconds
+            histogram.count += 1
+
+    def get_stats(self, agent: str, action: str, stage: str) -> dict[str, float]:
+        """Returns the count and sum of the observations for the labels."""
+        with self._lock:
+            histogram = self._histograms.get((agent, action, stage))
+            if histogram is None:
+                return {"count": 0, "sum": 0.0}
+            return {"count": histogram.count, "sum": histogram.sum}
+
+    def add_gauge_source(self, name: str, get_stats: Callable[[], dict[str, Optional[float]]]) -> None:
+        """Exports the numeric values returned by `get_stats` as gauges.
+
+        E.g. a store's `get_stats` is exported as `a2ui_store_entries{store="<name>"}`,
+        `a2ui_store_bytes{store="<name>"}` and so on.
+        """
+        with self._lock:
+            self._gauge_sources[name] = get_stats
+
+    def render_prometheus(self) -> str:
+        """Returns the histograms and gauges in the Prometheus text format."""
+        with self._lock:
+            histograms = {
+                labels: (list(h.bucket_counts), h.sum, h.count) for labels, h in sorted(self._histograms.items())
+            }
+            gauge_sources = dict(self._gauge_sources)
+
+        lines = [
+            "# HELP a2ui_stage_latency_seconds Latency of each stage of an A2UI agent turn.",
+            "# TYPE a2ui_stage_latency_seconds histogram",
+        ]
+        for (agent, action, stage), (bucket_counts, total, count) in histograms.items():
+            labels = f'agent="{_escape_label(agent)}",action="{_escape_label(action)}",stage="{_escape_label(stage)}"'
+            cumulative = 0
+            for bound, bucket_count in zip(self._buckets, bucket_counts):
+                cumulative += bucket_count
+                lines.append(f'a2ui_stage_latency_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'a2ui_stage_latency_seconds_bucket{{{labels},le="+Inf"}} {count}')
+            lines.append(f"a2ui_stage_latency_seconds_sum{{{labels}}} {total}")
+            lines.append(f"a2ui_stage_latency_seconds_count{{{labels}}} {count}")
+
+        gauges: dict[str, list[str]] = {}
+        for name, get_stats in gauge_sources.items():
+            try:
+                stats = get_stats()
+            except Exception as e:
+                logger.warning(f"Failed to get stats for {name}: {e}")
+                continue
+            for key, value in stats.items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    gauges.setdefault(key, []).append(f'a2ui_store_{key}{{store="{_escape_label(name)}"}} {value}')
+        for key, samples in gauges.items():
+            lines.append(f"# TYPE a2ui_store_{key} gauge")
+            lines.extend(samples)
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+
+
+_default_histograms = LatencyHistograms()
+
+
+def get_latency_histograms() -> LatencyHistograms:
+    """Returns the histograms that `a2ui_span` records into."""
+    return _default_histograms
+
+
+def _get_tracer():
+    return trace.get_tracer(_TRACER_NAME) if trace is not None else None
+
+
+@contextlib.contextmanager
+def a2ui_request_labels(agent: str, action: Optional[str] = None) -> Iterator[None]:
+    """Labels the stages recorded while handling a request.
+
+    Args:
+        agent: The agent handling the request.
+        action: The userAction being handled, if any.
+    """
+    token = _request_labels.set((agent, action or ""))
+    try:
+        yield
+    finally:
+        _request_labels.reset(token)
+
+
+def set_a2ui_request_action(action: Optional[str]) -> None:
+    """Sets the action label once the request's userAction is known.
+
+    Spans that are still open, e.g. the whole turn, are labelled with it too.
+    """
+    agent, _ = _request_labels.get()
+    _request_labels.set((agent, action or ""))
+
+
+@contextlib.contextmanager
+def a2ui_span(stage: str, **attributes: Any) -> Iterator[None]:
+    """Times a stage of the current request.
+
+    Args:
+        stage: The stage, e.g. `STAGE_SCHEMA_VALIDATION`.
+        **attributes: Further span attributes, e.g. the attempt number.
+    """
+    tracer = _get_tracer()
+    start = time.perf_counter()
+    with (
+        tracer.start_as_current_span(f"a2ui.{stage}", attributes=attributes)
+        if tracer is not None
+        else contextlib.nullcontext()
+    ) as span:
+        try:
+            yield
+        finally:
+            agent, action = _request_labels.get()
+            if span is not None:
+                span.set_attributes({"a2ui.agent": agent, "a2ui.action": action})
+            _default_histograms.observe(agent, action, stage, time.perf_counter() - start)
+
+
+def record_a2ui_stage(stage: str, seconds: float, **attributes: Any) -> None:
+    """Records a stage of the current request that has already ended.
+
+    For stages that don't fit in a `with` block, e.g. an attempt that is
+    retried from several places of a loop.
+    """
+    agent, action = _request_labels.get()
+    tracer = _get_tracer()
+    if tracer is not None:
+        span = tracer.start_span(
+            f"a2ui.{stage}",
+            attributes={"a2ui.agent": agent, "a2ui.action": action, **attributes},
+            start_time=time.time_ns() - int(seconds * 1e9),
+        )
+        span.end()
+    _default_histograms.observe(agent, action, stage, seconds)
+
+
+class A2uiLatencyCallbacks:
+    """ADK agent callbacks that time LLM and tool calls.
+
+    Pass the methods as the `before_model_callback`, `after_model_callback`,
+    `before_tool_callback` and `after_tool_callback` of an `LlmAgent` (or add
+    them to its lists of callbacks, after any that may short-circuit).
+    """
+
+    def __init__(self):
+        # Started calls, keyed by invocation id or function call id.
+        self._started: dict[str, tuple[float, Any]] = {}
+
+    def _start(self, key: str, stage: str, **attributes: Any) -> None:
+        tracer = _get_tracer()
+        span = tracer.start_span(f"a2ui.{stage}", attributes=attributes) if tracer is not None else None
+        self._started[key] = (time.perf_counter(), span)
+
+    def _end(self, key: str, stage: str, agent: str) -> None:
+        started = self._started.pop(key, None)
+        if started is None:
+            return
+        start, span = started
+        if span is not None:
+            span.end()
+        request_agent, action = _request_labels.get()
+        _default_histograms.observe(request_agent or agent, action, stage, time.perf_counter() - start)
+
+    def before_model(self, callback_context: Any, llm_request: Any) -> None:
+        self._start(
+            f"llm:{callback_context.invocation_id}", STAGE_LLM_CALL, **{"a2ui.agent": callback_context.agent_name}
+        )
+        return None
+
+    def after_model(self, callback_context: Any, llm_response: Any) -> None:
+        # Streamed responses call this for every chunk; the call ends with the last.
+        if not getattr(llm_response, "partial", False):
+            self._end(f"llm:{callback_context.invocation_id}", STAGE_LLM_CALL, callback_context.agent_name)
+        return None
+
+    def before_tool(self, tool: Any, args: dict[str, Any], tool_context: Any) -> None:
+        self._start(f"tool:{tool_context.function_call_id}", STAGE_TOOL_CALL, **{"a2ui.tool": tool.name})
+        return None
+
+    def after_tool(self, tool: Any, args: dict[str, Any], tool_context: Any, tool_response: Any) -> None:
+        self._end(f"tool:{tool_context.function_call_id}", STAGE_TOOL_CALL, tool_context.agent_name)
+        return None
+
+
+class A2uiMetricsApp:
+    """An ASGI app serving `render_prometheus()`, e.g. `app.add_route("/metrics", A2uiMetricsApp())`."""
+
+    def __init__(self, histograms: Optional[LatencyHistograms] = None):
+        self._histograms = histograms or _default_histograms
+
+    async def __call__(self, scope: dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            return
+        body = self._histograms.render_prometheus().encode()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [(b"content-type", b"text/plain; version=0.0.4; charset=utf-8")],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+
+def configure_a2ui_tracing(service_name: str) -> bool:
+    """Exports spans over OTLP/HTTP if `OTEL_EXPORTER_OTLP_ENDPOINT` or
+    `OTEL_EXPORTER_OTLP_TRACES_ENDPOINT` is set, e.g. to a local Phoenix at
+    "http://localhost:6006/v1/traces".
+
+    Requires the `otel` extra. Call it in every worker process.
+
+    Returns:
+        Whether spans are exported.
+    """
+    if not (os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT") or os.getenv("OTEL_EXPORTER_OTLP_TRACES_ENDPOINT")):
+        return False
+    try:
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    except ImportError:
+        logger.warning("An OTLP endpoint is set, but opentelemetry-sdk isn't installed. Install a2ui[otel].")
+        return False
+
+    provider = TracerProvider(resource=Resource.create({"service.name": service_name}))
+    provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+    trace.set_tracer_provider(provider)
+    logger.info(f"Exporting {service_name} spans over OTLP")
+    return True
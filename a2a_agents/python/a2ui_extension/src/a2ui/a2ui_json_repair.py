@@ -0,0 +1,231 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Deterministic repair of mechanically malformed A2UI LLM responses.
+
+Agents ask the LLM for conversational text, `A2UI_JSON_DELIMITER` and a JSON
+list of A2UI messages. Many invalid responses only have mechanical problems,
+which are cheaper to fix locally than with another LLM round-trip.
+"""
+
+import json
+import logging
+import re
+import threading
+from typing import Any, Callable, Optional
+
+from a2ui.a2ui_extension import A2UI_JSON_DELIMITER
+from a2ui.a2ui_instrumentation import STAGE_DELIMITER_SPLIT, STAGE_JSON_PARSE, a2ui_span
+
+logger = logging.getLogger(__name__)
+
+INSERT_DELIMITER = "insert_delimiter"
+REMOVE_TRAILING_COMMAS = "remove_trailing_commas"
+WRAP_SINGLE_OBJECT = "wrap_single_object"
+REPAIRS = (INSERT_DELIMITER, REMOVE_TRAILING_COMMAS, WRAP_SINGLE_OBJECT)
+
+# A markdown code fence around the JSON, with any or no language tag.
+_CODE_FENCE = re.compile(r"^```[\w+-]*[ \t]*\n?(.*?)\n?[ \t]*(?:```)?$", re.DOTALL)
+# JSON strings are matched first so commas inside them are left alone.
+_TRAILING_COMMA = re.compile(r'"(?:\\.|[^"\\])*"|,(\s*[\]}])')
+# Where JSON might start when the delimiter is missing.
+_JSON_START = re.compile(r"^[ \t]*(?:```[\w+-]*\s*)?[\[{]", re.MULTILINE)
+# Limits the parse attempts when searching for JSON without a delimiter.
+_MAX_JSON_START_CANDIDATES = 5
+
+
+class A2uiRepairResult:
+    """A parsed A2UI response and the repairs it needed."""
+
+    __slots__ = ("text", "messages", "repairs")
+
+    def __init__(self, text: str, messages: list[Any], repairs: list[str]):
+        self.text = text
+        self.messages = messages
+        self.repairs = repairs
+
+    def to_response(self, delimiter: str = A2UI_JSON_DELIMITER) -> str:
+        """Returns the response in canonical form: text, delimiter, JSON list."""
+        return f"{self.text}\n{delimiter}\n{json.dumps(self.messages)}"
+
+
+def _strip_code_fence(json_string: str) -> str:
+    json_string = json_string.strip()
+    if match := _CODE_FENCE.match(json_string):
+        return match.group(1).strip()
+    return json_string
+
+
+def _remove_trailing_commas(json_string: str) -> str:
+    return _TRAILING_COMMA.sub(lambda m: m.group(1) if m.group(1) is not None else m.group(0), json_string)
+
+
+class A2uiJsonRepairer:
+    """Parses A2UI LLM responses, repairing mechanical problems.
+
+    The repairs are applied only when needed, in order:
+    - `insert_delimiter`: The delimiter is missing in front of otherwise valid
+      JSON (optionally in a code fence) that starts on its own line.
+    - `remove_trailing_commas`: The JSON doesn't parse, but does once commas
+      before a closing bracket or brace are removed.
+    - `wrap_single_object`: A single message object instead of a list.
+
+    Markdown code fences are always stripped and aren't counted as repairs.
+    Counters record how many responses were parsed, how many were only valid
+    thanks to a repair (each saving an LLM retry), and how often each repair
+    was applied.
+    """
+
+    def __init__(self, delimiter: str = A2UI_JSON_DELIMITER):
+        self._delimiter = delimiter
+        self._lock = threading.Lock()
+        self._counters = self._new_counters()
+
+    @staticmethod
+    def _new_counters() -> dict[str, int]:
+        counters = {"responses": 0, "repaired_responses": 0, "failed_responses": 0}
+        counters.update({repair: 0 for repair in REPAIRS})
+        return counters
+
+    def repair(
+        self,
+        response: str,
+        validate: Optional[Callable[[list[Any]], None]] = None,
+        allow_empty: bool = False,
+    ) -> A2uiRepairResult:
+        """Parses an LLM response into text and A2UI messages.
+
+        Args:
+            response: The full LLM response.
+            validate: Called with the parsed messages; raises if they are invalid,
+                e.g. a wrapper around `validate_a2ui_messages`.
+            allow_empty: Whether an empty JSON part is valid (e.g. for "no results").
+
+        Returns:
+            The text, the list of messages and the repairs that were applied.
+
+        Raises:
+            ValueError: If the response can't be repaired. json.JSONDecodeError is
+                a ValueError.
+            Any error raised by `validate`.
+        """
+        repairs = []
+        try:
+            text, messages = self._parse_response(response, allow_empty, repairs)
+            if validate is not None:
+                validate(messages)
+        except Exception:
+            self._count(repairs, failed=True)
+            raise
+
+        self._count(repairs, failed=False)
+        if repairs:
+            logger.info(f"Repaired A2UI response locally with: {', '.join(repairs)}")
+        return A2uiRepairResult(text, messages, repairs)
+
+    def parse(self, response: str, allow_empty: bool = False) -> A2uiRepairResult:
+        """Like `repair`, but without validation and without updating the counters.
+
+        Raises:
+            ValueError: If the response can't be repaired.
+        """
+        repairs = []
+        text, messages = self._parse_response(response, allow_empty, repairs)
+        return A2uiRepairResult(text, messages, repairs)
+
+    def get_counters(self) -> dict[str, int]:
+        """Returns a snapshot of the repair counters."""
+        with self._lock:
+            return dict(self._counters)
+
+    def reset_counters(self) -> None:
+        with self._lock:
+            self._counters = self._new_counters()
+
+    def _parse_response(
+        self, response: str, allow_empty: bool, repairs: list[str]
+    ) -> tuple[str, list[Any]]:
+        with a2ui_span(STAGE_DELIMITER_SPLIT):
+            text, json_string = self._split(response, repairs)
+            json_string = _strip_code_fence(json_string)
+        if not json_string:
+            if not allow_empty:
+                raise ValueError("JSON part is empty.")
+            return text, []
+        with a2ui_span(STAGE_JSON_PARSE):
+            return text, self._parse(json_string, repairs)
+
+    def _split(self, response: str, repairs: list[str]) -> tuple[str, str]:
+        if self._delimiter in response:
+            text, json_string = response.split(self._delimiter, 1)
+            return text.strip(), json_string
+
+        for i, match in enumerate(_JSON_START.finditer(response)):
+            if i >= _MAX_JSON_START_CANDIDATES:
+                break
+            json_string = response[match.start():]
+            try:
+                self._parse(_strip_code_fence(json_string), [])
+            except ValueError:
+                continue
+            repairs.append(INSERT_DELIMITER)
+            return response[: match.start()].strip(), json_string
+        raise ValueError(f"Delimiter '{self._delimiter}' not found.")
+
+    @staticmethod
+    def _parse(json_string: str, repairs: list[str]) -> list[Any]:
+        try:
+            parsed = json.loads(json_string)
+        except json.JSONDecodeError:
+            fixed = _remove_trailing_commas(json_string)
+            if fixed == json_string:
+                raise
+            parsed = json.loads(fixed)
+            repairs.append(REMOVE_TRAILING_COMMAS)
+
+        if isinstance(parsed, dict):
+            repairs.append(WRAP_SINGLE_OBJECT)
+            parsed = [parsed]
+        return parsed
+
+    def _count(self, repairs: list[str], failed: bool) -> None:
+        with self._lock:
+            self._counters["responses"] += 1
+            if failed:
+                self._counters["failed_responses"] += 1
+                return
+            if repairs:
+                self._counters["repaired_responses"] += 1
+            for repair in repairs:
+                self._counters[repair] += 1
+
+
+_default_repairer = A2uiJsonRepairer()
+
+
+def repair_a2ui_response(
+    response: str,
+    validate: Optional[Callable[[list[Any]], None]] = None,
+    allow_empty: bool = False,
+) -> A2uiRepairResult:
+    """Parses and repairs an LLM response with the shared repairer.
+
+    See `A2uiJsonRepairer.repair`.
+    """
+    return _default_repairer.repair(response, validate=validate, allow_empty=allow_empty)
+
+
+def get_a2ui_repair_counters() -> dict[str, int]:
+    """Returns the shared repairer's counters."""
+    return _default_repairer.get_counters()
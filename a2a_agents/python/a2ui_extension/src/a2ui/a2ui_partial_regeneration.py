@@ -0,0 +1,190 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Regeneration of the invalid messages in an A2UI LLM response.
+
+When messages of a response fail schema validation, the valid messages are
+kept and the LLM is only asked to regenerate the failing ones, in a single
+request, and they are then spliced back into the response. This is much
+cheaper than regenerating the whole response, including its data model.
+"""
+
+import json
+import logging
+from typing import Any, Iterable, Optional
+
+import jsonschema
+from a2ui.a2ui_extension import A2UI_JSON_DELIMITER
+from a2ui.a2ui_json_repair import A2uiJsonRepairer, A2uiRepairResult
+
+logger = logging.getLogger(__name__)
+
+
+def _escape_json_pointer_token(token: Any) -> str:
+    return str(token).replace("~", "~0").replace("/", "~1")
+
+
+class A2uiInvalidMessage:
+    """Where a list of A2UI messages failed validation."""
+
+    __slots__ = ("message_index", "json_pointer", "error_message")
+
+    def __init__(self, message_index: int, json_pointer: str, error_message: str):
+        self.message_index = message_index
+        # Relative to the message, e.g. "/surfaceUpdate/components/3".
+        self.json_pointer = json_pointer
+        self.error_message = error_message
+
+
+def locate_invalid_a2ui_message(
+    error: jsonschema.exceptions.ValidationError,
+) -> Optional[A2uiInvalidMessage]:
+    """Finds the message a list validation error belongs to.
+
+    Args:
+        error: An error raised by `validate_a2ui_messages`.
+
+    Returns:
+        The index of the invalid message and the JSON pointer of the error
+        within it, or None if the error isn't inside a single message (e.g. the
+        JSON isn't a list).
+    """
+    path = list(error.absolute_path)
+    if not path or not isinstance(path[0], int):
+        return None
+    json_pointer = "".join("/" + _escape_json_pointer_token(p) for p in path[1:])
+    return A2uiInvalidMessage(path[0], json_pointer, error.message)
+
+
+def locate_invalid_a2ui_messages(
+    errors: Iterable[jsonschema.exceptions.ValidationError],
+) -> Optional[list[A2uiInvalidMessage]]:
+    """Finds every message that list validation errors belong to.
+
+    Args:
+        errors: The errors of a validator's `iter_errors` for a list of messages.
+
+    Returns:
+        One invalid message per failing message index, in index order, each
+        with the best matching of its errors. None if there are no errors, or
+        one of them isn't inside a single message.
+    """
+    errors_by_index: dict[int, list[jsonschema.exceptions.ValidationError]] = {}
+    for error in errors:
+        invalid_message = locate_invalid_a2ui_message(error)
+        if invalid_message is None:
+            return None
+        errors_by_index.setdefault(invalid_message.message_index, []).append(error)
+    return [
+        locate_invalid_a2ui_message(jsonschema.exceptions.best_match(errors_by_index[index]))
+        for index in sorted(errors_by_index)
+    ] or None
+
+
+class A2uiPartialRegeneration:
+    """A parsed response with invalid messages to regenerate and splice in."""
+
+    __slots__ = ("result", "invalid_messages", "_repairer")
+
+    def __init__(
+        self,
+        result: A2uiRepairResult,
+        invalid_messages: list[A2uiInvalidMessage],
+        delimiter: str = A2UI_JSON_DELIMITER,
+    ):
+        self.result = result
+        self.invalid_messages = invalid_messages
+        self._repairer = A2uiJsonRepairer(delimiter)
+
+    def get_prompt(self) -> str:
+        """Returns the instruction asking the LLM to regenerate only the invalid messages."""
+        problems = " ".join(
+            f"Message {m.message_index} (0-based) is invalid at JSON pointer "
+            f"'{m.json_pointer or '/'}': {m.error_message}. "
+            f"It was: {json.dumps(self.result.messages[m.message_index])}"
+            for m in self.invalid_messages
+        )
+        indexes = ", ".join(str(m.message_index) for m in self.invalid_messages)
+        return (
+            f"{len(self.invalid_messages)} message(s) of the A2UI JSON list in your previous "
+            f"response are invalid. {problems} "
+            "The other messages are valid and will be kept as they are. "
+            f"Respond ONLY with a JSON list of the corrected messages {indexes}, in this order, "
+            "strictly following the A2UI JSON SCHEMA, with no other text and no delimiter."
+        )
+
+    def splice(self, response: str) -> A2uiRepairResult:
+        """Replaces the invalid messages with the ones in the LLM's response.
+
+        Args:
+            response: The LLM's response to `get_prompt()`.
+
+        Returns:
+            The original text and messages, with the regenerated messages
+            spliced in. The caller still has to validate the messages.
+
+        Raises:
+            ValueError: If the response doesn't contain one message per
+                invalid message.
+        """
+        regenerated = self._repairer.parse(response).messages
+        if len(regenerated) != len(self.invalid_messages):
+            raise ValueError(
+                f"Expected {len(self.invalid_messages)} regenerated A2UI messages, "
+                f"got {len(regenerated)}."
+            )
+        messages = list(self.result.messages)
+        for invalid_message, message in zip(self.invalid_messages, regenerated):
+            messages[invalid_message.message_index] = message
+        logger.info(
+            f"Spliced {len(regenerated)} regenerated A2UI messages "
+            f"into a response of {len(messages)} messages"
+        )
+        return A2uiRepairResult(self.result.text, messages, self.result.repairs)
+
+
+def get_a2ui_partial_regeneration(
+    response: str,
+    error: Exception,
+    delimiter: str = A2UI_JSON_DELIMITER,
+    validator: Optional[jsonschema.protocols.Validator] = None,
+) -> Optional[A2uiPartialRegeneration]:
+    """Plans the regeneration of the invalid messages of a response, if possible.
+
+    Args:
+        response: The LLM response that failed validation.
+        error: The error raised while repairing or validating the response.
+        delimiter: The delimiter between the text and the JSON.
+        validator: The validator the response failed, from `get_a2ui_validator`.
+            It finds every invalid message, so they are all regenerated in one
+            request. Without it, only the message of `error` is.
+
+    Returns:
+        The partial regeneration, or None if the whole response has to be
+        regenerated because it doesn't parse, or an error isn't specific to a
+        single message.
+    """
+    if not isinstance(error, jsonschema.exceptions.ValidationError):
+        return None
+    try:
+        result = A2uiJsonRepairer(delimiter).parse(response)
+    except ValueError:
+        return None
+    errors = validator.iter_errors(result.messages) if validator is not None else [error]
+    invalid_messages = locate_invalid_a2ui_messages(errors)
+    if invalid_messages is None:
+        return None
+    if invalid_messages[-1].message_index >= len(result.messages):
+        return None
+    return A2uiPartialRegeneration(result, invalid_messages, delimiter)
@@ -0,0 +1,140 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Cache-friendly assembly of A2UI system prompts.
+
+Model providers cache the longest prompt prefix shared between requests. The
+A2UI schema makes up most of a UI agent's input tokens, so it is put first,
+followed by the static examples, with the agent's instruction last.
+"""
+
+import hashlib
+import logging
+import threading
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+A2UI_SCHEMA_BEGIN_MARKER = "---BEGIN A2UI JSON SCHEMA---"
+A2UI_SCHEMA_END_MARKER = "---END A2UI JSON SCHEMA---"
+
+
+class CacheablePrompt:
+    """A prompt split into a static, cacheable prefix and a dynamic suffix."""
+
+    __slots__ = ("static_prefix", "dynamic_suffix", "prefix_hash")
+
+    def __init__(self, static_prefix: str, dynamic_suffix: str):
+        self.static_prefix = static_prefix
+        self.dynamic_suffix = dynamic_suffix
+        self.prefix_hash = hashlib.sha256(static_prefix.encode("utf-8")).hexdigest()
+
+    @property
+    def text(self) -> str:
+        """The full prompt."""
+        return f"{self.static_prefix}\n\n{self.dynamic_suffix}"
+
+
+def build_cacheable_a2ui_prompt(
+    a2ui_schema: str, examples: str, instruction: str
+) -> CacheablePrompt:
+    """Orders a UI prompt as schema, then examples, then instruction.
+
+    Args:
+        a2ui_schema: The A2UI schema, including the catalog.
+        examples: The UI examples. They must not contain per-deployment or
+            per-request values.
+        instruction: The agent's instruction and rules.
+
+    Returns:
+        The prompt, with the schema and examples as its static prefix.
+    """
+    static_prefix = (
+        f"{A2UI_SCHEMA_BEGIN_MARKER}\n{a2ui_schema.strip()}\n{A2UI_SCHEMA_END_MARKER}"
+        f"\n\n{examples.strip()}"
+    )
+    return CacheablePrompt(static_prefix, instruction.strip())
+
+
+class A2uiPromptCache:
+    """Registers static prompt prefixes as cached contexts and reports hit rates.
+
+    `create_cached_context` registers a prefix with the model backend and
+    returns the cached context's name. Without it, the cache relies on the
+    provider's implicit prefix caching and only reports hit rates.
+    """
+
+    def __init__(self, create_cached_context: Optional[Callable[[str], str]] = None):
+        self._create_cached_context = create_cached_context
+        self._lock = threading.Lock()
+        self._cached_contexts: dict[str, Optional[str]] = {}
+        self._stats = self._new_stats()
+
+    @staticmethod
+    def _new_stats() -> dict[str, int]:
+        return {"requests": 0, "cache_hits": 0, "prompt_tokens": 0, "cached_tokens": 0}
+
+    def register(self, prompt: CacheablePrompt) -> Optional[str]:
+        """Registers the prompt's static prefix once per distinct prefix.
+
+        Args:
+            prompt: The prompt to register.
+
+        Returns:
+            The name of the cached context, or None if there is no backend or
+            registration failed. Failures aren't cached, so they are retried.
+        """
+        with self._lock:
+            if prompt.prefix_hash in self._cached_contexts:
+                return self._cached_contexts[prompt.prefix_hash]
+
+        name = None
+        if self._create_cached_context is not None:
+            try:
+                name = self._create_cached_context(prompt.static_prefix)
+            except Exception as e:
+                logger.warning(f"Failed to register cached prompt prefix {prompt.prefix_hash[:12]}: {e}")
+                return None
+            logger.info(f"Registered cached prompt prefix {prompt.prefix_hash[:12]} as {name}")
+
+        with self._lock:
+            self._cached_contexts[prompt.prefix_hash] = name
+        return name
+
+    def record_usage(
+        self, prompt_token_count: Optional[int], cached_token_count: Optional[int]
+    ) -> None:
+        """Records the token usage reported for one model request."""
+        cached_token_count = cached_token_count or 0
+        with self._lock:
+            self._stats["requests"] += 1
+            self._stats["prompt_tokens"] += prompt_token_count or 0
+            self._stats["cached_tokens"] += cached_token_count
+            if cached_token_count > 0:
+                self._stats["cache_hits"] += 1
+
+    def get_stats(self) -> dict[str, Any]:
+        """Returns the usage counters with the request and token hit rates."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["registered_prefixes"] = len(self._cached_contexts)
+        stats["hit_rate"] = stats["cache_hits"] / stats["requests"] if stats["requests"] else 0.0
+        stats["cached_token_ratio"] = (
+            stats["cached_tokens"] / stats["prompt_tokens"] if stats["prompt_tokens"] else 0.0
+        )
+        return stats
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._stats = self._new_stats()
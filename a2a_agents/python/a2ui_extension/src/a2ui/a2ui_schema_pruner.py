@@ -0,0 +1,148 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Pruning of A2UI schemas for prompts.
+
+Agents only use a few of the catalog's components, but the full schema is put
+in every prompt. A pruned schema keeps only the components an agent's examples
+use (or an explicit allow-list), optionally without descriptions. It's meant
+for prompts only; responses should still be validated against the full schema.
+"""
+
+import json
+import logging
+import re
+from collections.abc import Iterable
+from typing import Any, Optional, Union
+
+from a2ui.a2ui_extension import SURFACE_UPDATE_KEY
+
+logger = logging.getLogger(__name__)
+
+# Matches the component type in `"component": { "Text": ...`, including the
+# `{{ ... }}` escaping used by examples that are Python format strings.
+_COMPONENT_TYPE = re.compile(r'"component"\s*:\s*\{+\s*"(\w+)"')
+# Schema keywords whose values map names to schemas, rather than being schemas.
+_SCHEMA_MAP_KEYWORDS = ("properties", "patternProperties", "$defs", "definitions")
+
+
+def get_a2ui_example_components(examples: Union[str, Any]) -> set[str]:
+    """Returns the component types used in UI examples.
+
+    Args:
+        examples: Example text containing A2UI JSON (which doesn't need to
+            parse, e.g. a prompt section), or parsed A2UI messages.
+
+    Returns:
+        The names of the components the examples use.
+    """
+    if not isinstance(examples, str):
+        examples = json.dumps(examples)
+    return set(_COMPONENT_TYPE.findall(examples))
+
+
+_CATALOG_PATH = ("properties", SURFACE_UPDATE_KEY, "properties", "components", "items", "properties", "component", "properties")
+# Keys of a whole catalog definition file, which some agents merge into the
+# schema as is instead of only its components.
+_CATALOG_DEFINITION_KEYS = {"components", "styles"}
+
+
+def _get_catalog_path(a2ui_schema: dict[str, Any]) -> tuple[str, ...]:
+    node = a2ui_schema
+    try:
+        for key in _CATALOG_PATH:
+            node = node[key]
+    except (KeyError, TypeError) as e:
+        raise ValueError(f"A2UI schema has no component catalog: missing {e}") from e
+    if set(node) <= _CATALOG_DEFINITION_KEYS and isinstance(node.get("components"), dict):
+        return _CATALOG_PATH + ("components",)
+    return _CATALOG_PATH
+
+
+def _strip_descriptions(schema: Any) -> Any:
+    if isinstance(schema, list):
+        return [_strip_descriptions(item) for item in schema]
+    if not isinstance(schema, dict):
+        return schema
+
+    stripped = {}
+    for key, value in schema.items():
+        if key == "description" and isinstance(value, str):
+            continue
+        if key in _SCHEMA_MAP_KEYWORDS and isinstance(value, dict):
+            # Keep the names, which may themselves be "description".
+            stripped[key] = {name: _strip_descriptions(s) for name, s in value.items()}
+        else:
+            stripped[key] = _strip_descriptions(value)
+    return stripped
+
+
+def prune_a2ui_schema(
+    a2ui_schema: dict[str, Any],
+    components: Optional[Iterable[str]] = None,
+    examples: Optional[Union[str, Any, Iterable[Union[str, Any]]]] = None,
+    strip_descriptions: bool = False,
+) -> dict[str, Any]:
+    """Returns a copy of an A2UI schema with only the given components.
+
+    Args:
+        a2ui_schema: The schema for a single A2UI message, with the catalog
+            components merged in. It isn't modified.
+        components: The component types to keep.
+        examples: UI examples whose components are kept as well, as accepted by
+            `get_a2ui_example_components`, or a list of them.
+        strip_descriptions: Whether to remove all descriptions.
+
+    Returns:
+        The pruned schema. If neither `components` nor `examples` is given,
+        all components are kept. Components that aren't in the catalog are
+        ignored.
+
+    Raises:
+        ValueError: If the schema has no component catalog.
+    """
+    catalog_path = _get_catalog_path(a2ui_schema)
+    catalog = a2ui_schema
+    for key in catalog_path:
+        catalog = catalog[key]
+
+    if components is None and examples is None:
+        keep = set(catalog)
+    else:
+        keep = set(components or ())
+        if examples is not None:
+            if isinstance(examples, (str, dict)):
+                examples = [examples]
+            for example in examples:
+                keep |= get_a2ui_example_components(example)
+        if unknown := keep - set(catalog):
+            # E.g. standard components used alongside a custom catalog.
+            logger.warning(f"Components not in the A2UI schema's catalog: {', '.join(sorted(unknown))}")
+
+    # Copy only the path down to the catalog; everything else is shared
+    # until descriptions are stripped below.
+    pruned = dict(a2ui_schema)
+    node = pruned
+    for key in catalog_path[:-1]:
+        node[key] = dict(node[key])
+        node = node[key]
+    node[catalog_path[-1]] = kept = {name: schema for name, schema in catalog.items() if name in keep}
+
+    if strip_descriptions:
+        pruned = _strip_descriptions(pruned)
+    logger.info(
+        f"Pruned A2UI schema to {len(kept)} of {len(catalog)} components"
+        f"{' without descriptions' if strip_descriptions else ''}"
+    )
+    return pruned
@@ -0,0 +1,104 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Serving A2A agent apps with several worker processes.
+
+A userAction for a surface must be handled with the session and task of the
+turn that rendered the surface, and surface deltas are computed against what
+that turn sent, so workers can only share the load if their stores are shared
+(see `BoundedStoreConfig.shared`). Requires uvicorn.
+"""
+
+import logging
+import os
+import signal
+import socket
+from typing import Any, Callable
+
+from a2ui.a2ui_bounded_store import BoundedStoreConfig
+
+logger = logging.getLogger(__name__)
+
+SHARED_STORE_ENV = "A2UI_STORE_SHARED"
+
+
+def run_a2a_server(build_app: Callable[[], Any], host: str, port: int, workers: int = 1, **uvicorn_kwargs: Any) -> None:
+    """Serves the app built by `build_app` with uvicorn.
+
+    With several workers, the socket is bound once and each worker is forked
+    before it builds its own app, so no connections (e.g. to SQLite) are
+    shared across processes. The workers' stores are marked as shared via the
+    `A2UI_STORE_SHARED` environment variable.
+
+    Args:
+        build_app: Builds the ASGI app, reading its store config from the
+            environment.
+        host: The host to bind to.
+        port: The port to bind to.
+        workers: The number of worker processes.
+        **uvicorn_kwargs: Further `uvicorn.Config` arguments.
+
+    Raises:
+        ValueError: If there are several workers but the stores configured
+            in the environment aren't shared, or the platform can't fork.
+    """
+    if workers < 1:
+        raise ValueError(f"workers must be at least 1, got {workers}")
+    if workers == 1:
+        import uvicorn
+
+        uvicorn.run(build_app(), host=host, port=port, **uvicorn_kwargs)
+        return
+    if not hasattr(os, "fork"):
+        raise ValueError("Running several workers requires os.fork")
+
+    os.environ[SHARED_STORE_ENV] = "true"
+    try:
+        BoundedStoreConfig.from_env()
+    except ValueError as e:
+        del os.environ[SHARED_STORE_ENV]
+        raise ValueError(f"{e}: set A2UI_STORE_SQLITE_PATH or A2UI_STORE_REDIS_URL to run {workers} workers") from e
+
+    import uvicorn
+
+    sock = socket.create_server((host, port))
+    sock.set_inheritable(True)
+    pids = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            status = 0
+            try:
+                config = uvicorn.Config(build_app(), host=host, port=port, **uvicorn_kwargs)
+                uvicorn.Server(config).run(sockets=[sock])
+            except BaseException:
+                logger.exception("Worker failed")
+                status = 1
+            finally:
+                os._exit(status)
+        pids.append(pid)
+    sock.close()
+    logger.info(f"Started {workers} workers on {host}:{port}")
+
+    def stop_workers(signum, frame):
+        for pid in pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, stop_workers)
+    signal.signal(signal.SIGTERM, stop_workers)
+    for pid in pids:
+        os.waitpid(pid, 0)
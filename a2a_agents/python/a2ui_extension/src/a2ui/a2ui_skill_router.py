@@ -0,0 +1,200 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Routing requests to subagents by their skills, without an LLM call.
+
+An orchestrator that asks an LLM which subagent to route each request to
+pays for a full LLM call even when the request obviously belongs to one
+subagent. `SkillRouter` indexes each subagent's agent card (its description,
+and its skills' names, descriptions, tags and examples) with BM25, and
+routes a request when one subagent scores clearly higher than the others.
+
+Confidence is how far the best subagent's score is ahead of the second
+best: 1 - second / best. Requests below the threshold are left to the LLM.
+Every decision is logged as a JSON object, and optionally appended to a
+JSON Lines file, for offline evaluation of the threshold.
+"""
+
+import dataclasses
+import json
+import logging
+import math
+import re
+import threading
+import time
+from collections import Counter
+from collections.abc import Mapping
+from typing import Optional
+
+from a2a.types import AgentCard
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MIN_CONFIDENCE = 0.5
+# The score the best subagent needs, so that requests matching only common
+# words aren't routed.
+DEFAULT_MIN_SCORE = 1.0
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# How much a word counts in each part of an agent card.
+TAG_WEIGHT = 3.0
+SKILL_NAME_WEIGHT = 2.0
+TEXT_WEIGHT = 1.0
+
+_WORD = re.compile(r"[a-z0-9]+")
+_STOP_WORDS = frozenset(
+    "a about all an and any are as at be by can could do does for from get give have how i in is it me my of on "
+    "or our please show some that the their them there these this to up us want we what when where which who "
+    "with would you your".split()
+)
+
+
+def _get_terms(text: str) -> list[str]:
+    terms = []
+    for word in _WORD.findall(text.lower()):
+        if word in _STOP_WORDS:
+            continue
+        # Just enough stemming to match plurals ("tickets", "opportunities").
+        if len(word) > 4 and word.endswith("ies"):
+            word = word[:-3] + "y"
+        elif len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        terms.append(word)
+    return terms
+
+
+@dataclasses.dataclass(frozen=True)
+class RouteDecision:
+    """The outcome of routing a request.
+
+    Attributes:
+        agent_name: The subagent to route to, or None to leave it to the LLM.
+        best_agent_name: The best scoring subagent, even if not routed to.
+        confidence: How far the best subagent is ahead, between 0 and 1.
+        scores: The BM25 score of each subagent.
+    """
+
+    agent_name: Optional[str]
+    best_agent_name: Optional[str]
+    confidence: float
+    scores: dict[str, float]
+
+
+class SkillRouter:
+    """Routes requests to the subagent whose skills match them clearly best.
+
+    Args:
+        documents: The weighted texts describing each subagent, by agent
+            name, e.g. from `from_agent_cards`.
+        min_confidence: The confidence a decision needs to route.
+        min_score: The score the best subagent needs to route.
+        log_path: A JSON Lines file to append decisions to.
+    """
+
+    def __init__(
+        self,
+        documents: Mapping[str, list[tuple[str, float]]],
+        min_confidence: float = DEFAULT_MIN_CONFIDENCE,
+        min_score: float = DEFAULT_MIN_SCORE,
+        log_path: Optional[str] = None,
+    ):
+        self._min_confidence = min_confidence
+        self._min_score = min_score
+        self._log_path = log_path
+        self._log_lock = threading.Lock()
+
+        # Term frequencies are weighted by where the term appears.
+        self._term_frequencies: dict[str, Counter[str]] = {}
+        for agent_name, texts in documents.items():
+            frequencies: Counter[str] = Counter()
+            for text, weight in texts:
+                for term in _get_terms(text):
+                    frequencies[term] += weight
+            self._term_frequencies[agent_name] = frequencies
+        self._lengths = {name: sum(tf.values()) for name, tf in self._term_frequencies.items()}
+        self._average_length = sum(self._lengths.values()) / len(self._lengths) if self._lengths else 0.0
+        document_frequencies = Counter(term for tf in self._term_frequencies.values() for term in tf)
+        count = len(self._term_frequencies)
+        self._idf = {
+            term: math.log(1 + (count - frequency + 0.5) / (frequency + 0.5))
+            for term, frequency in document_frequencies.items()
+        }
+
+    @classmethod
+    def from_agent_cards(cls, agent_cards: Mapping[str, AgentCard], **kwargs) -> "SkillRouter":
+        """Builds a router from the subagents' agent cards, by agent name."""
+        documents = {}
+        for agent_name, card in agent_cards.items():
+            texts = [(card.name, SKILL_NAME_WEIGHT), (card.description or "", TEXT_WEIGHT)]
+            for skill in card.skills or []:
+                texts.append((skill.name, SKILL_NAME_WEIGHT))
+                texts.append((skill.description or "", TEXT_WEIGHT))
+                texts.extend((tag, TAG_WEIGHT) for tag in skill.tags or [])
+                texts.extend((example, TEXT_WEIGHT) for example in skill.examples or [])
+            documents[agent_name] = texts
+        return cls(documents, **kwargs)
+
+    def score(self, text: str) -> dict[str, float]:
+        """Returns the BM25 score of the request for each subagent."""
+        query_terms = set(_get_terms(text))
+        scores = {}
+        for agent_name, frequencies in self._term_frequencies.items():
+            length_norm = BM25_K1 * (1 - BM25_B + BM25_B * self._lengths[agent_name] / (self._average_length or 1))
+            score = 0.0
+            for term in query_terms:
+                frequency = frequencies.get(term)
+                if frequency:
+                    score += self._idf[term] * frequency * (BM25_K1 + 1) / (frequency + length_norm)
+            scores[agent_name] = score
+        return scores
+
+    def route(self, text: str) -> RouteDecision:
+        """Decides which subagent to route a request to, and logs the decision."""
+        started = time.perf_counter()
+        scores = self.score(text)
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        best_agent_name, best = ranked[0] if ranked and ranked[0][1] > 0 else (None, 0.0)
+        second = ranked[1][1] if len(ranked) > 1 else 0.0
+        confidence = 1 - second / best if best > 0 else 0.0
+        routed = best >= self._min_score and confidence >= self._min_confidence
+        decision = RouteDecision(
+            agent_name=best_agent_name if routed else None,
+            best_agent_name=best_agent_name,
+            confidence=confidence,
+            scores=scores,
+        )
+        self._log(text, decision, time.perf_counter() - started)
+        return decision
+
+    def _log(self, text: str, decision: RouteDecision, seconds: float) -> None:
+        record = json.dumps(
+            {
+                "timestamp": time.time(),
+                "query": text,
+                "routed_to": decision.agent_name,
+                "best_agent": decision.best_agent_name,
+                "confidence": round(decision.confidence, 4),
+                "scores": {name: round(score, 4) for name, score in decision.scores.items()},
+                "seconds": round(seconds, 6),
+            }
+        )
+        logger.info(f"Skill route decision: {record}")
+        if not self._log_path:
+            return
+        try:
+            with self._log_lock, open(self._log_path, "a") as f:
+                f.write(record + "\n")
+        except OSError as e:
+            logger.warning(f"Failed to log skill route decision to {self._log_path}: {e}")
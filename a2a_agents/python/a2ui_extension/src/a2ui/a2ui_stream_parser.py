@@ -0,0 +1,205 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import logging
+import re
+from typing import Any, Optional
+
+from a2a.types import Part, TextPart
+
+from a2ui.a2ui_extension import A2UI_JSON_DELIMITER, create_a2ui_part
+
+logger = logging.getLogger(__name__)
+
+# Characters that change the nesting state outside of a JSON string.
+_STRUCTURAL_CHARS = re.compile(r'[{}\[\]"]')
+# Characters that matter inside a JSON string.
+_STRING_CHARS = re.compile(r'["\\]')
+
+
+class A2uiStreamParser:
+    """Incrementally parses streamed LLM output into text and A2UI parts.
+
+    The LLM output is expected to be conversational text, followed by
+    `A2UI_JSON_DELIMITER`, followed by a JSON list of A2UI messages (optionally
+    wrapped in a markdown code fence). Chunks are passed to `feed` as they
+    arrive. The text prefix is returned as soon as the delimiter is seen, and
+    each A2UI message is returned as soon as its closing brace arrives, so the
+    caller doesn't have to wait for the full response.
+    """
+
+    def __init__(self, delimiter: str = A2UI_JSON_DELIMITER):
+        self._delimiter = delimiter
+        self._buffer = ""
+        self._pos = 0
+        self._found_delimiter = False
+        self._text: Optional[str] = None
+        self._started = False
+        self._done = False
+        self._depth = 0
+        self._message_depth = 0
+        self._message_start: Optional[int] = None
+        self._in_string = False
+        self._messages: list[dict[str, Any]] = []
+
+    @property
+    def text(self) -> Optional[str]:
+        """The conversational text prefix, once it is complete."""
+        return self._text
+
+    @property
+    def messages(self) -> list[dict[str, Any]]:
+        """The A2UI messages parsed so far."""
+        return self._messages
+
+    @property
+    def found_delimiter(self) -> bool:
+        """Whether the delimiter has been seen."""
+        return self._found_delimiter
+
+    @property
+    def done(self) -> bool:
+        """Whether the JSON list of A2UI messages has been fully parsed."""
+        return self._done
+
+    def feed(self, chunk: str) -> list[Part]:
+        """Consumes a chunk of LLM output.
+
+        Args:
+            chunk: The next piece of LLM text output.
+
+        Returns:
+            The parts completed by this chunk: a TextPart for the text prefix
+            (once) and an A2UI part per completed A2UI message.
+
+        Raises:
+            json.JSONDecodeError: If a completed A2UI message is not valid JSON.
+        """
+        if self._done or not chunk:
+            return []
+
+        self._buffer += chunk
+        parts = []
+        if not self._found_delimiter:
+            # The delimiter may straddle chunks, so search from just before the
+            # end of the previously scanned text.
+            start = max(0, self._pos - len(self._delimiter) + 1)
+            index = self._buffer.find(self._delimiter, start)
+            if index == -1:
+                self._pos = len(self._buffer)
+                return parts
+
+            self._found_delimiter = True
+            self._text = self._buffer[:index].strip()
+            if self._text:
+                parts.append(Part(root=TextPart(text=self._text)))
+            self._buffer = self._buffer[index + len(self._delimiter) :]
+            self._pos = 0
+
+        parts.extend(self._scan())
+        return parts
+
+    def close(self) -> list[Part]:
+        """Signals the end of the LLM output.
+
+        Returns:
+            A TextPart with the whole output if no delimiter was found, otherwise
+            an empty list.
+
+        Raises:
+            ValueError: If the output ended in the middle of the A2UI JSON.
+        """
+        if not self._found_delimiter:
+            self._found_delimiter = True
+            self._text = self._buffer.strip()
+            self._buffer = ""
+            return [Part(root=TextPart(text=self._text))] if self._text else []
+
+        if self._started and not self._done:
+            raise ValueError(
+                f"A2UI JSON ended after {len(self._messages)} complete messages."
+            )
+        return []
+
+    def _scan(self) -> list[Part]:
+        buffer = self._buffer
+        pos = self._pos
+        parts = []
+
+        while not self._done:
+            if self._in_string:
+                match = _STRING_CHARS.search(buffer, pos)
+                if match is None:
+                    pos = len(buffer)
+                    break
+                if match.group() == "\\":
+                    if match.end() >= len(buffer):
+                        # Wait for the escaped character.
+                        pos = match.start()
+                        break
+                    pos = match.end() + 1
+                    continue
+                self._in_string = False
+                pos = match.end()
+                continue
+
+            match = _STRUCTURAL_CHARS.search(buffer, pos)
+            if match is None:
+                pos = len(buffer)
+                break
+            char = match.group()
+            pos = match.end()
+
+            if not self._started:
+                # Skip anything before the JSON, such as a code fence.
+                if char in "[{":
+                    self._started = True
+                    self._depth = 1
+                    if char == "{":
+                        self._message_depth = 1
+                        self._message_start = match.start()
+                    else:
+                        self._message_depth = 2
+                continue
+
+            if char == '"':
+                self._in_string = True
+            elif char in "[{":
+                self._depth += 1
+                if char == "{" and self._depth == self._message_depth:
+                    self._message_start = match.start()
+            else:
+                self._depth -= 1
+                if (
+                    self._message_start is not None
+                    and self._depth == self._message_depth - 1
+                ):
+                    message = json.loads(buffer[self._message_start : pos])
+                    self._message_start = None
+                    if isinstance(message, dict):
+                        self._messages.append(message)
+                        parts.append(create_a2ui_part(message))
+                    else:
+                        logger.warning(f"Skipping non-object A2UI message: {message}")
+                if self._depth == 0:
+                    self._done = True
+
+        # Drop everything that can't be part of a pending message.
+        keep_from = self._message_start if self._message_start is not None else pos
+        self._buffer = buffer[keep_from:]
+        self._pos = pos - keep_from
+        if self._message_start is not None:
+            self._message_start = 0
+        return parts
@@ -0,0 +1,177 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""A TTL cache for the results of read-only tool calls.
+
+Agents often call the same read-only tool (e.g. listing a connector entity)
+with the same arguments several times in a few seconds: across the turns of
+an orchestrated conversation, and when a turn is retried. `ToolResultCache`
+keeps each result for `ttl_seconds`, and concurrent calls with the same key
+share one in-flight call instead of each calling the tool.
+
+Results are cached in groups (e.g. per connector entity) so that a write to
+an entity can invalidate everything read from it. A call that was in flight
+when its group was invalidated returns its result to its callers, but the
+result isn't cached.
+
+The cache is meant to be used from one event loop.
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Hashable
+from typing import Any, Callable, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL_SECONDS = 30.0
+DEFAULT_MAX_ENTRIES = 1000
+
+T = TypeVar("T")
+
+
+class ToolResultCache:
+    """Caches tool results per (group, key) for a while, and coalesces concurrent calls.
+
+    Args:
+        ttl_seconds: How long a result is served from the cache.
+        max_entries: The number of results to keep; the least recently used
+            results are evicted first.
+        clock: Returns the current time in seconds; for tests.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if ttl_seconds < 0 or max_entries < 0:
+            raise ValueError("ttl_seconds and max_entries must not be negative")
+        self._ttl_seconds = ttl_seconds
+        self._max_entries = max_entries
+        self._clock = clock
+        # (group, key) -> (expiry time, result), least recently used first.
+        self._results: OrderedDict[tuple[str, Hashable], tuple[float, Any]] = OrderedDict()
+        self._in_flight: dict[tuple[str, Hashable], asyncio.Future] = {}
+        # Bumped when a group is invalidated, so results of calls started
+        # before aren't cached.
+        self._generations: dict[str, int] = {}
+        self._hits = 0
+        self._misses = 0
+        self._coalesced = 0
+        self._invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    async def get_or_call(
+        self,
+        group: str,
+        key: Hashable,
+        call: Callable[[], Awaitable[T]],
+        cache_if: Optional[Callable[[T], bool]] = None,
+    ) -> T:
+        """Returns the cached result for the key, or calls `call` to get it.
+
+        Args:
+            group: The group the result belongs to, e.g. the entity read.
+            key: Identifies the call within the group, e.g. its arguments
+                and user.
+            call: Makes the call. Only one call per key is in flight at a time.
+            cache_if: If given, only results it accepts are cached, e.g. to
+                skip error responses. Exceptions are never cached.
+
+        Returns:
+            The result, which is shared between callers; they must not modify it.
+        """
+        cache_key = (group, key)
+        cached = self._results.get(cache_key)
+        if cached is not None:
+            expires_at, result = cached
+            if self._clock() < expires_at:
+                self._results.move_to_end(cache_key)
+                self._hits += 1
+                return result
+            del self._results[cache_key]
+
+        in_flight = self._in_flight.get(cache_key)
+        if in_flight is not None:
+            self._coalesced += 1
+        else:
+            self._misses += 1
+            in_flight = asyncio.ensure_future(self._call(cache_key, call, cache_if))
+            self._in_flight[cache_key] = in_flight
+        # Callers that are cancelled don't cancel the call the others wait for.
+        return await asyncio.shield(in_flight)
+
+    def invalidate(self, group: str) -> int:
+        """Drops the group's cached results, e.g. after a write to its entity.
+
+        Returns:
+            The number of results dropped.
+        """
+        self._generations[group] = self._generations.get(group, 0) + 1
+        self._invalidations += 1
+        # Later callers make a new call rather than joining one that may
+        # have read the data before the write.
+        for cache_key in [cache_key for cache_key in self._in_flight if cache_key[0] == group]:
+            del self._in_flight[cache_key]
+        stale = [cache_key for cache_key in self._results if cache_key[0] == group]
+        for cache_key in stale:
+            del self._results[cache_key]
+        return len(stale)
+
+    def clear(self) -> None:
+        """Drops all cached results."""
+        for group in {cache_key[0] for cache_key in [*self._results, *self._in_flight]}:
+            self.invalidate(group)
+
+    def get_stats(self) -> dict[str, Optional[float]]:
+        """Returns counters for the metrics endpoint."""
+        return {
+            "entries": len(self._results),
+            "max_entries": self._max_entries,
+            "hits": self._hits,
+            "misses": self._misses,
+            "coalesced": self._coalesced,
+            "invalidations": self._invalidations,
+        }
+
+    async def _call(
+        self,
+        cache_key: tuple[str, Hashable],
+        call: Callable[[], Awaitable[T]],
+        cache_if: Optional[Callable[[T], bool]],
+    ) -> T:
+        group = cache_key[0]
+        generation = self._generations.get(group, 0)
+        try:
+            result = await call()
+        finally:
+            if self._in_flight.get(cache_key) is asyncio.current_task():
+                del self._in_flight[cache_key]
+        if self._generations.get(group, 0) == generation and (cache_if is None or cache_if(result)):
+            self._put(cache_key, result)
+        return result
+
+    def _put(self, cache_key: tuple[str, Hashable], result: Any) -> None:
+        if self._ttl_seconds == 0 or self._max_entries == 0:
+            return
+        self._results[cache_key] = (self._clock() + self._ttl_seconds, result)
+        self._results.move_to_end(cache_key)
+        while len(self._results) > self._max_entries:
+            self._results.popitem(last=False)
@@ -0,0 +1,425 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Converts A2UI server-to-client messages between spec versions 0.8 and 0.9.
+
+The converters are incremental: `convert` takes one message and returns the
+messages to send for it, and `convert_v08_to_v09` / `convert_v09_to_v08` wrap
+them as generators over message streams. An agent can generate 0.8 once and
+serve 0.9 clients from the same stream, or the other way around.
+
+Component properties are mapped for the standard catalog (see the 0.9
+evolution guide). Components from other catalogs only have their structure
+and bound values converted.
+"""
+
+import json
+import logging
+from collections.abc import Iterable, Iterator
+from typing import Any, Optional
+
+from a2ui.a2ui_extension import (
+    BEGIN_RENDERING_KEY,
+    DATA_MODEL_UPDATE_KEY,
+    DELETE_SURFACE_KEY,
+    STANDARD_CATALOG_ID,
+    SURFACE_UPDATE_KEY,
+)
+
+logger = logging.getLogger(__name__)
+
+CREATE_SURFACE_KEY = "createSurface"
+UPDATE_COMPONENTS_KEY = "updateComponents"
+UPDATE_DATA_MODEL_KEY = "updateDataModel"
+
+V09_STANDARD_CATALOG_ID = "https://a2ui.dev/specification/0.9/standard_catalog_definition.json"
+# 0.9 requires the root component to have this id.
+V09_ROOT_ID = "root"
+
+_LITERAL_KEYS = ("literalString", "literalNumber", "literalBoolean", "literalArray")
+_BOUND_VALUE_KEYS = frozenset(_LITERAL_KEYS + ("path",))
+
+# Standard catalog properties that are bound values in 0.8.
+_V08_BOUND_PROPERTIES = {
+    "Text": ("text",),
+    "Image": ("url",),
+    "Icon": ("name",),
+    "Video": ("url",),
+    "AudioPlayer": ("url", "description"),
+    "CheckBox": ("label", "value"),
+    "TextField": ("label", "text"),
+    "DateTimeInput": ("value",),
+    "MultipleChoice": ("selections",),
+    "Slider": ("value",),
+}
+# Standard catalog properties that were renamed in 0.9, keyed by 0.8 name.
+_V08_TO_V09_PROPERTIES = {
+    "TextField": {"textFieldType": "usageHint"},
+    "MultipleChoice": {"selections": "value"},
+    "Slider": {"minValue": "min", "maxValue": "max"},
+}
+_V09_TO_V08_PROPERTIES = {
+    component: {v09: v08 for v08, v09 in renames.items()}
+    for component, renames in _V08_TO_V09_PROPERTIES.items()
+}
+_V08_TO_V09_COMPONENTS = {"MultipleChoice": "ChoicePicker"}
+_V09_TO_V08_COMPONENTS = {v09: v08 for v08, v09 in _V08_TO_V09_COMPONENTS.items()}
+# 0.9 properties with no 0.8 equivalent.
+_V09_ONLY_PROPERTIES = {
+    "DateTimeInput": ("label",),
+    "ChoicePicker": ("label", "usageHint"),
+    "Slider": ("label",),
+}
+
+
+def _to_json_pointer(path: Optional[str]) -> str:
+    if not path or path == "/":
+        return "/"
+    return path if path.startswith("/") else "/" + path
+
+
+def _v08_bound_to_v09(value: Any) -> Any:
+    if isinstance(value, dict) and value and value.keys() <= _BOUND_VALUE_KEYS:
+        # A path takes precedence, since 0.9 has no literal-initialized paths.
+        if "path" in value:
+            return {"path": value["path"]}
+        for literal_key in _LITERAL_KEYS:
+            if literal_key in value:
+                return value[literal_key]
+    return value
+
+
+def _v09_bound_to_v08(value: Any) -> Any:
+    if isinstance(value, dict):
+        return value
+    if isinstance(value, bool):
+        return {"literalBoolean": value}
+    if isinstance(value, (int, float)):
+        return {"literalNumber": value}
+    if isinstance(value, list):
+        return {"literalArray": value}
+    return {"literalString": value}
+
+
+def _data_contents_to_value(contents: list[dict[str, Any]]) -> Any:
+    # A single "." entry sets a primitive at the update's path.
+    if len(contents) == 1 and contents[0].get("key") == ".":
+        return _data_entry_value(contents[0])
+    return {entry["key"]: _data_entry_value(entry) for entry in contents}
+
+
+def _data_entry_value(entry: dict[str, Any]) -> Any:
+    if "valueMap" in entry:
+        return {child["key"]: _data_entry_value(child) for child in entry["valueMap"]}
+    for value_key in ("valueString", "valueNumber", "valueBoolean"):
+        if value_key in entry:
+            return entry[value_key]
+    return None
+
+
+def _value_to_data_entry(key: str, value: Any) -> Optional[dict[str, Any]]:
+    if isinstance(value, list):
+        # 0.8 has no arrays, so lists become maps keyed by index.
+        value = {str(i): item for i, item in enumerate(value)}
+    if isinstance(value, dict):
+        return {
+            "key": key,
+            "valueMap": [
+                entry
+                for child_key, child_value in value.items()
+                if (entry := _value_to_data_entry(child_key, child_value)) is not None
+            ],
+        }
+    if isinstance(value, str):
+        return {"key": key, "valueString": value}
+    if isinstance(value, bool):
+        return {"key": key, "valueBoolean": value}
+    if isinstance(value, (int, float)):
+        return {"key": key, "valueNumber": value}
+    return None
+
+
+class V08ToV09Converter:
+    """Converts 0.8 messages to 0.9 messages, one message at a time.
+
+    0.9 has no `beginRendering`, so `createSurface` is sent before the first
+    message for each surface. If the 0.8 root component isn't called "root", a
+    "root" Column wrapping it is added, since 0.9 requires that id. Styles have
+    no 0.9 equivalent and are dropped.
+    """
+
+    def __init__(self, catalog_id: Optional[str] = None):
+        """Initializes the converter.
+
+        Args:
+            catalog_id: The 0.9 catalog id for created surfaces. Defaults to the
+                0.9 standard catalog for the 0.8 standard catalog, and to the
+                0.8 `catalogId` otherwise.
+        """
+        self._catalog_id = catalog_id
+        self._surfaces: set[str] = set()
+
+    def convert(self, message: dict[str, Any]) -> list[dict[str, Any]]:
+        """Converts one 0.8 message.
+
+        Args:
+            message: A 0.8 server-to-client message.
+
+        Returns:
+            The 0.9 messages to send for it, in order.
+        """
+        if body := message.get(BEGIN_RENDERING_KEY):
+            return self._convert_begin_rendering(body)
+        if body := message.get(SURFACE_UPDATE_KEY):
+            return self._create_surface(body["surfaceId"]) + [
+                {
+                    UPDATE_COMPONENTS_KEY: {
+                        "surfaceId": body["surfaceId"],
+                        "components": [self._convert_component(c) for c in body.get("components", [])],
+                    }
+                }
+            ]
+        if body := message.get(DATA_MODEL_UPDATE_KEY):
+            return self._create_surface(body["surfaceId"]) + [
+                {
+                    UPDATE_DATA_MODEL_KEY: {
+                        "surfaceId": body["surfaceId"],
+                        "path": _to_json_pointer(body.get("path")),
+                        "op": "replace",
+                        "value": _data_contents_to_value(body.get("contents", [])),
+                    }
+                }
+            ]
+        if body := message.get(DELETE_SURFACE_KEY):
+            self._surfaces.discard(body["surfaceId"])
+            return [{DELETE_SURFACE_KEY: {"surfaceId": body["surfaceId"]}}]
+
+        logger.warning(f"Skipping unknown A2UI v0.8 message with keys: {list(message)}")
+        return []
+
+    def _create_surface(self, surface_id: str, catalog_id: Optional[str] = None) -> list[dict[str, Any]]:
+        if surface_id in self._surfaces:
+            return []
+        self._surfaces.add(surface_id)
+        if self._catalog_id:
+            catalog_id = self._catalog_id
+        elif not catalog_id or catalog_id == STANDARD_CATALOG_ID:
+            catalog_id = V09_STANDARD_CATALOG_ID
+        return [{CREATE_SURFACE_KEY: {"surfaceId": surface_id, "catalogId": catalog_id}}]
+
+    def _convert_begin_rendering(self, body: dict[str, Any]) -> list[dict[str, Any]]:
+        surface_id = body["surfaceId"]
+        messages = self._create_surface(surface_id, body.get("catalogId"))
+        if (root := body.get("root")) and root != V09_ROOT_ID:
+            messages.append(
+                {
+                    UPDATE_COMPONENTS_KEY: {
+                        "surfaceId": surface_id,
+                        "components": [{"id": V09_ROOT_ID, "component": "Column", "children": [root]}],
+                    }
+                }
+            )
+        return messages
+
+    def _convert_component(self, component: dict[str, Any]) -> dict[str, Any]:
+        converted = {"id": component["id"]}
+        if "weight" in component:
+            converted["weight"] = component["weight"]
+        for component_type, properties in component.get("component", {}).items():
+            converted["component"] = _V08_TO_V09_COMPONENTS.get(component_type, component_type)
+            renames = _V08_TO_V09_PROPERTIES.get(component_type, {})
+            for name, value in properties.items():
+                converted[renames.get(name, name)] = self._convert_property(name, value)
+            if component_type == "MultipleChoice":
+                max_selections = converted.pop("maxAllowedSelections", None)
+                converted["usageHint"] = "mutuallyExclusive" if max_selections == 1 else "multipleSelection"
+                converted.setdefault("value", [])
+        return converted
+
+    def _convert_property(self, name: str, value: Any) -> Any:
+        if name == "children" and isinstance(value, dict):
+            if "explicitList" in value:
+                return value["explicitList"]
+            if template := value.get("template"):
+                return {"componentId": template["componentId"], "path": template["dataBinding"]}
+        if name == "action" and isinstance(value, dict):
+            action = {"name": value["name"]}
+            if "context" in value:
+                action["context"] = {
+                    entry["key"]: _v08_bound_to_v09(entry["value"]) for entry in value["context"]
+                }
+            return action
+        if isinstance(value, list):
+            return [self._convert_property(name, item) for item in value]
+        if isinstance(value, dict):
+            bound = _v08_bound_to_v09(value)
+            if bound is not value:
+                return bound
+            return {key: self._convert_property(key, item) for key, item in value.items()}
+        return value
+
+
+class V09ToV08Converter:
+    """Converts 0.9 messages to 0.8 messages, one message at a time.
+
+    `createSurface` becomes a `beginRendering` for the "root" component. 0.9
+    lists in the data model become maps keyed by index, and `remove` data
+    operations, which 0.8 can't express, are dropped.
+    """
+
+    def convert(self, message: dict[str, Any]) -> list[dict[str, Any]]:
+        """Converts one 0.9 message.
+
+        Args:
+            message: A 0.9 server-to-client message.
+
+        Returns:
+            The 0.8 messages to send for it, in order.
+        """
+        if body := message.get(CREATE_SURFACE_KEY):
+            begin_rendering = {"surfaceId": body["surfaceId"], "root": V09_ROOT_ID}
+            catalog_id = body.get("catalogId")
+            if catalog_id and catalog_id != V09_STANDARD_CATALOG_ID:
+                begin_rendering["catalogId"] = catalog_id
+            return [{BEGIN_RENDERING_KEY: begin_rendering}]
+        if body := message.get(UPDATE_COMPONENTS_KEY):
+            return [
+                {
+                    SURFACE_UPDATE_KEY: {
+                        "surfaceId": body["surfaceId"],
+                        "components": [self._convert_component(c) for c in body.get("components", [])],
+                    }
+                }
+            ]
+        if body := message.get(UPDATE_DATA_MODEL_KEY):
+            return self._convert_update_data_model(body)
+        if body := message.get(DELETE_SURFACE_KEY):
+            return [{DELETE_SURFACE_KEY: {"surfaceId": body["surfaceId"]}}]
+
+        logger.warning(f"Skipping unknown A2UI v0.9 message with keys: {list(message)}")
+        return []
+
+    def _convert_update_data_model(self, body: dict[str, Any]) -> list[dict[str, Any]]:
+        if body.get("op") == "remove" or "value" not in body:
+            logger.warning(f"Skipping A2UI v0.9 data model update with no v0.8 equivalent: {body}")
+            return []
+
+        value = body["value"]
+        if isinstance(value, dict):
+            contents = [
+                entry
+                for key, item in value.items()
+                if (entry := _value_to_data_entry(key, item)) is not None
+            ]
+        elif (entry := _value_to_data_entry(".", value)) is not None:
+            contents = [entry]
+        else:
+            contents = []
+
+        data_model_update = {"surfaceId": body["surfaceId"]}
+        if path := body.get("path"):
+            data_model_update["path"] = path
+        data_model_update["contents"] = contents
+        return [{DATA_MODEL_UPDATE_KEY: data_model_update}]
+
+    def _convert_component(self, component: dict[str, Any]) -> dict[str, Any]:
+        component_type = component.get("component")
+        v08_type = _V09_TO_V08_COMPONENTS.get(component_type, component_type)
+        renames = _V09_TO_V08_PROPERTIES.get(v08_type, {})
+        bound_properties = _V08_BOUND_PROPERTIES.get(v08_type, ())
+        skipped = _V09_ONLY_PROPERTIES.get(component_type, ())
+
+        properties = {}
+        for name, value in component.items():
+            if name in ("id", "weight", "component") or name in skipped:
+                continue
+            name = renames.get(name, name)
+            properties[name] = self._convert_property(name, value, name in bound_properties)
+        if component_type == "ChoicePicker" and component.get("usageHint") == "mutuallyExclusive":
+            properties["maxAllowedSelections"] = 1
+
+        converted = {"id": component["id"]}
+        if "weight" in component:
+            converted["weight"] = component["weight"]
+        converted["component"] = {v08_type: properties}
+        return converted
+
+    def _convert_property(self, name: str, value: Any, bound: bool = False) -> Any:
+        if bound:
+            return _v09_bound_to_v08(value)
+        if name == "children":
+            if isinstance(value, list):
+                return {"explicitList": value}
+            if isinstance(value, dict):
+                return {"template": {"componentId": value["componentId"], "dataBinding": value["path"]}}
+        if name == "action" and isinstance(value, dict):
+            action = {"name": value["name"]}
+            if "context" in value:
+                action["context"] = [
+                    {"key": key, "value": _v09_bound_to_v08(item)} for key, item in value["context"].items()
+                ]
+            return action
+        if name == "tabItems" and isinstance(value, list):
+            return [{**item, "title": _v09_bound_to_v08(item["title"])} for item in value]
+        if name == "options" and isinstance(value, list):
+            return [{**item, "label": _v09_bound_to_v08(item["label"])} for item in value]
+        return value
+
+
+def convert_v08_to_v09(
+    messages: Iterable[dict[str, Any]], catalog_id: Optional[str] = None
+) -> Iterator[dict[str, Any]]:
+    """Lazily converts a stream of 0.8 messages to 0.9 messages.
+
+    Args:
+        messages: The 0.8 messages, e.g. from `A2uiStreamParser`.
+        catalog_id: The 0.9 catalog id for created surfaces, if not the default.
+
+    Yields:
+        The 0.9 messages, as each input message is consumed.
+    """
+    converter = V08ToV09Converter(catalog_id)
+    for message in messages:
+        yield from converter.convert(message)
+
+
+def convert_v09_to_v08(messages: Iterable[dict[str, Any]]) -> Iterator[dict[str, Any]]:
+    """Lazily converts a stream of 0.9 messages to 0.8 messages.
+
+    Args:
+        messages: The 0.9 messages, e.g. from `iter_jsonl`.
+
+    Yields:
+        The 0.8 messages, as each input message is consumed.
+    """
+    converter = V09ToV08Converter()
+    for message in messages:
+        yield from converter.convert(message)
+
+
+def iter_jsonl(lines: Iterable[str]) -> Iterator[dict[str, Any]]:
+    """Lazily parses JSONL, the 0.9 wire format, skipping blank lines.
+
+    Raises:
+        json.JSONDecodeError: If a line is not valid JSON.
+    """
+    for line in lines:
+        if line.strip():
+            yield json.loads(line)
+
+
+def to_jsonl(messages: Iterable[dict[str, Any]]) -> Iterator[str]:
+    """Lazily serializes messages as JSONL lines, including the newline."""
+    for message in messages:
+        yield json.dumps(message, separators=(",", ":")) + "\n"
@@ -0,0 +1,241 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Offline micro-benchmarks for the a2ui extension.
+
+Measures part creation, `is_a2ui_part` scanning, JSON parsing and schema
+validation on synthetic surfaces, against the standard and rizzcharts
+catalogs. Results are written as JSON so runs can be compared across versions:
+
+    python tests/benchmark_extension.py --output before.json
+    python tests/benchmark_extension.py --output after.json --quick
+"""
+
+import argparse
+import json
+import platform
+import sys
+import timeit
+from datetime import datetime, timezone
+from importlib import metadata
+from pathlib import Path
+from typing import Any, Callable
+
+from a2a.types import Part, TextPart
+from a2ui import a2ui_extension
+
+_REPO_ROOT = Path(__file__).parents[4]
+_SPEC_ROOT = _REPO_ROOT / "specification" / "0.8" / "json"
+_RIZZCHARTS_CATALOG_PATH = _REPO_ROOT / "samples" / "agent" / "adk" / "rizzcharts" / "rizzcharts_catalog_definition.json"
+
+COMPONENT_COUNTS = (10, 100, 1_000, 10_000)
+DATA_ENTRY_COUNTS = (10, 1_000, 100_000)
+QUICK_COMPONENT_COUNTS = (10, 100)
+QUICK_DATA_ENTRY_COUNTS = (10, 1_000)
+
+RESULTS_FORMAT_VERSION = 1
+
+
+def load_catalog_schemas() -> dict[str, dict[str, Any]]:
+    """Returns the single-message A2UI schema for each benchmarked catalog."""
+    with open(_SPEC_ROOT / "server_to_client_with_standard_catalog.json") as f:
+        standard_schema = json.load(f)
+
+    # Merged the same way as the rizzcharts sample's ComponentCatalogBuilder.
+    with open(_SPEC_ROOT / "server_to_client.json") as f:
+        rizzcharts_schema = json.load(f)
+    with open(_RIZZCHARTS_CATALOG_PATH) as f:
+        rizzcharts_catalog = json.load(f)
+    rizzcharts_schema["properties"]["surfaceUpdate"]["properties"]["components"]["items"]["properties"]["component"]["properties"] = rizzcharts_catalog
+
+    return {"standard": standard_schema, "rizzcharts": rizzcharts_schema}
+
+
+def _component(i: int, catalog: str) -> dict[str, Any]:
+    kind = i % 4
+    if catalog == "rizzcharts" and kind == 3:
+        return {
+            "id": f"chart-{i}",
+            "component": {
+                "Chart": {
+                    "type": "pie",
+                    "title": {"literalString": f"Sales {i}"},
+                    "chartData": {"literalArray": [{"label": "Apparel", "value": 41.5}, {"label": "Home", "value": 58.5}]},
+                }
+            },
+        }
+    if kind == 0:
+        return {"id": f"text-{i}", "component": {"Text": {"usageHint": "body", "text": {"literalString": f"Item {i}"}}}}
+    if kind == 1:
+        return {"id": f"image-{i}", "component": {"Image": {"url": {"path": f"/items/item{i}/imageUrl"}}}}
+    if kind == 2:
+        return {
+            "id": f"button-{i}",
+            "component": {
+                "Button": {
+                    "child": f"text-{i - 2}",
+                    "action": {"name": "select_item", "context": [{"key": "index", "value": {"literalNumber": i}}]},
+                }
+            },
+        }
+    return {"id": f"divider-{i}", "component": {"Divider": {"axis": "horizontal"}}}
+
+
+def make_surface(component_count: int, catalog: str = "standard") -> list[dict[str, Any]]:
+    """Returns beginRendering and surfaceUpdate messages for a synthetic surface."""
+    components = [_component(i, catalog) for i in range(component_count - 1)]
+    root = {
+        "id": "root",
+        "component": {"Column": {"children": {"explicitList": [c["id"] for c in components]}}},
+    }
+    return [
+        {"beginRendering": {"surfaceId": "bench", "root": "root"}},
+        {"surfaceUpdate": {"surfaceId": "bench", "components": [root] + components}},
+    ]
+
+
+def make_data_model(entry_count: int) -> list[dict[str, Any]]:
+    """Returns a dataModelUpdate with `entry_count` leaf entries in maps of 100."""
+    contents = []
+    for start in range(0, entry_count, 100):
+        contents.append(
+            {
+                "key": f"group{start // 100}",
+                "valueMap": [
+                    {"key": f"entry{i}", "valueString": f"value {i}"} if i % 2 else {"key": f"entry{i}", "valueNumber": i}
+                    for i in range(start, min(start + 100, entry_count))
+                ],
+            }
+        )
+    return [{"dataModelUpdate": {"surfaceId": "bench", "path": "/", "contents": contents}}]
+
+
+def measure(fn: Callable[[], Any], min_time: float, repeat: int) -> dict[str, Any]:
+    """Times `fn`, returning the best and mean seconds per call."""
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    # autorange targets 0.2s; scale up to the requested minimum time.
+    number = max(1, int(number * max(1.0, min_time / 0.2)))
+    timings = [t / number for t in timer.repeat(repeat=repeat, number=number)]
+    return {
+        "iterations": number * repeat,
+        "best_s": min(timings),
+        "mean_s": sum(timings) / len(timings),
+    }
+
+
+def run_benchmarks(
+    component_counts: tuple[int, ...],
+    data_entry_counts: tuple[int, ...],
+    min_time: float = 0.2,
+    repeat: int = 3,
+) -> list[dict[str, Any]]:
+    """Runs all benchmarks and returns one result record per measurement."""
+    results = []
+
+    def record(name: str, catalog: str, workload: str, size: int, items: int, payload_bytes: int, fn: Callable[[], Any]):
+        timing = measure(fn, min_time, repeat)
+        results.append(
+            {
+                "benchmark": name,
+                "catalog": catalog,
+                "workload": workload,
+                "size": size,
+                "items_per_call": items,
+                "payload_bytes": payload_bytes,
+                **timing,
+                "items_per_s": items / timing["best_s"],
+            }
+        )
+        print(f"{name:<24} {catalog:<11} {workload:<11} {size:>7} {timing['best_s'] * 1e3:>10.3f} ms", file=sys.stderr)
+
+    schemas = load_catalog_schemas()
+    for catalog, schema in schemas.items():
+        catalog_id = f"benchmark-{catalog}"
+        a2ui_extension.get_a2ui_validator(schema, catalog_id=catalog_id)
+
+        workloads = [("components", n, make_surface(n, catalog)) for n in component_counts]
+        workloads += [("data_model", n, make_data_model(n)) for n in data_entry_counts]
+        for workload, size, messages in workloads:
+            payload = json.dumps(messages)
+            payload_bytes = len(payload.encode("utf-8"))
+            parts = [a2ui_extension.create_a2ui_part(m) for m in messages]
+            # Interleave text parts, as in a real conversation history.
+            history = [p for part in parts for p in (Part(root=TextPart(text="ok")), part)] * 50
+
+            # Catalog-independent benchmarks only need to run once per size.
+            if catalog == "standard" or workload == "components":
+                record(
+                    "create_a2ui_part", catalog, workload, size, len(messages), payload_bytes,
+                    lambda: [a2ui_extension.create_a2ui_part(m) for m in messages],
+                )
+                record(
+                    "json_loads", catalog, workload, size, len(messages), payload_bytes,
+                    lambda: json.loads(payload),
+                )
+            if catalog == "standard" and workload == "components" and size == component_counts[0]:
+                record(
+                    "is_a2ui_part_scan", catalog, "history", len(history), len(history), 0,
+                    lambda: [p for p in history if a2ui_extension.is_a2ui_part(p)],
+                )
+            record(
+                "validate_a2ui_messages", catalog, workload, size, len(messages), payload_bytes,
+                lambda: a2ui_extension.validate_a2ui_messages(messages, schema, catalog_id=catalog_id),
+            )
+
+        cold_registry = a2ui_extension.A2uiValidatorRegistry(max_size=1)
+        record(
+            "compile_validator", catalog, "schema", 1, 1, len(json.dumps(schema)),
+            lambda: (cold_registry.clear(), cold_registry.get_validator(schema, catalog_id=catalog_id)),
+        )
+    return results
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", help="Write JSON results to this file instead of stdout.")
+    parser.add_argument("--quick", action="store_true", help="Only run the smaller workloads.")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Minimum seconds per measurement.")
+    parser.add_argument("--repeat", type=int, default=3, help="Measurements per benchmark; the best is reported.")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(
+        QUICK_COMPONENT_COUNTS if args.quick else COMPONENT_COUNTS,
+        QUICK_DATA_ENTRY_COUNTS if args.quick else DATA_ENTRY_COUNTS,
+        min_time=args.min_time,
+        repeat=args.repeat,
+    )
+    report = {
+        "format_version": RESULTS_FORMAT_VERSION,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "environment": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "a2ui": metadata.version("a2ui"),
+            "a2a-sdk": metadata.version("a2a-sdk"),
+            "jsonschema": metadata.version("jsonschema"),
+        },
+        "results": results,
+    }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
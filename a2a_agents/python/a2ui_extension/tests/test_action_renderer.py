@@ -0,0 +1,117 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+from pathlib import Path
+
+import pytest
+from a2ui import a2ui_extension
+from a2ui.a2ui_action_renderer import A2uiActionRenderer, A2uiActionTemplate, load_a2ui_example
+from a2ui.a2ui_json_repair import A2uiJsonRepairer
+
+_SCHEMA_PATH = Path(__file__).parents[4] / "specification" / "0.8" / "json" / "server_to_client_with_standard_catalog.json"
+
+_EXAMPLES = """
+---BEGIN FORM_EXAMPLE---
+[
+  {{ "beginRendering": {{ "surfaceId": "form", "root": "title" }} }},
+  {{ "surfaceUpdate": {{ "surfaceId": "form", "components": [
+    {{ "id": "title", "component": {{ "Text": {{ "text": {{ "path": "title" }} }} }} }}
+  ] }} }},
+  {{ "dataModelUpdate": {{ "surfaceId": "form", "path": "/", "contents": [
+    {{ "key": "title", "valueString": "Book [Name]" }},
+    {{ "key": "partySize", "valueString": "2" }},
+    {{ "key": "notes", "valueString": "" }}
+  ] }} }}
+]
+---END FORM_EXAMPLE---
+"""
+
+
+@pytest.fixture(scope="module")
+def renderer():
+    with open(_SCHEMA_PATH) as f:
+        schema = json.load(f)
+
+    renderer = A2uiActionRenderer(
+        lambda messages: a2ui_extension.validate_a2ui_messages(messages, schema, catalog_id="renderer-test")
+    )
+    renderer.register(
+        "open_form",
+        A2uiActionTemplate(
+            load_a2ui_example(_EXAMPLES, "FORM_EXAMPLE", unescape_braces=True),
+            data={"title": "Book {name}", "partySize": "{partySize}"},
+            text="Here is the form for {name}.",
+        ),
+    )
+    return renderer
+
+
+def test_binds_context_into_the_data_model(renderer):
+    rendered = renderer.render("open_form", {"name": "Han Dynasty", "partySize": 4})
+
+    assert rendered.text == "Here is the form for Han Dynasty."
+    assert rendered.messages[2]["dataModelUpdate"]["contents"] == [
+        {"key": "title", "valueString": "Book Han Dynasty"},
+        {"key": "partySize", "valueNumber": 4},
+        {"key": "notes", "valueString": ""},
+    ]
+    parsed = A2uiJsonRepairer().repair(rendered.to_response())
+    assert parsed.repairs == []
+    assert parsed.messages == rendered.messages
+
+    # The template itself isn't modified.
+    assert renderer.render("open_form", {"name": "Quick Bites", "partySize": "2"}).messages[2][
+        "dataModelUpdate"
+    ]["contents"][:2] == [
+        {"key": "title", "valueString": "Book Quick Bites"},
+        {"key": "partySize", "valueString": "2"},
+    ]
+
+
+def test_falls_back_for_unregistered_or_unrenderable_actions(renderer):
+    assert renderer.render("view_profile", {"name": "Alex"}) is None
+    assert renderer.render("open_form", {"partySize": 2}) is None
+
+    def reject(messages):
+        raise ValueError("invalid")
+
+    rejecting = A2uiActionRenderer(reject)
+    rejecting.register("open_form", A2uiActionTemplate(load_a2ui_example(_EXAMPLES, "FORM_EXAMPLE", unescape_braces=True)))
+    assert rejecting.render("open_form", {}) is None
+
+
+def test_uses_defaults_for_missing_optional_fields():
+    template = A2uiActionTemplate(
+        load_a2ui_example(_EXAMPLES, "FORM_EXAMPLE", unescape_braces=True),
+        data={"title": "Book {name}", "partySize": "{partySize}"},
+        text="Here is the form for {name}.",
+        defaults={"partySize": 2},
+    )
+
+    rendered = template.render({"name": "Han Dynasty"})
+    assert rendered.messages[2]["dataModelUpdate"]["contents"][1] == {"key": "partySize", "valueNumber": 2}
+    assert template.render({"name": "Han Dynasty", "partySize": 4}).messages[2]["dataModelUpdate"]["contents"][1] == {
+        "key": "partySize",
+        "valueNumber": 4,
+    }
+    with pytest.raises(KeyError):
+        template.render({"partySize": 4})
+
+
+def test_rejects_bindings_for_unknown_data_model_keys():
+    with pytest.raises(ValueError):
+        A2uiActionTemplate(load_a2ui_example(_EXAMPLES, "FORM_EXAMPLE", unescape_braces=True), data={"tilte": "x"})
+    with pytest.raises(ValueError):
+        load_a2ui_example(_EXAMPLES, "MISSING_EXAMPLE")
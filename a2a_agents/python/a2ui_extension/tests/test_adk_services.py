@@ -0,0 +1,96 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("google.adk")
+
+from a2ui.a2ui_adk_services import BoundedMemoryService, BoundedSessionService
+from a2ui.a2ui_bounded_store import BoundedStoreConfig
+from google.adk.events.event import Event
+from google.adk.events.event_actions import EventActions
+from google.genai import types
+
+
+def _event(text: str, state_delta=None) -> Event:
+    return Event(
+        author="user",
+        invocation_id="invocation",
+        content=types.Content(role="user", parts=[types.Part(text=text)]),
+        actions=EventActions(state_delta=state_delta or {}),
+    )
+
+
+def test_evicts_least_recently_used_sessions():
+    async def run():
+        service = BoundedSessionService(BoundedStoreConfig(max_entries=2))
+        for session_id in ("1", "2", "3"):
+            await service.create_session(app_name="app", user_id="user", session_id=session_id)
+
+        assert await service.get_session(app_name="app", user_id="user", session_id="1") is None
+        assert await service.get_session(app_name="app", user_id="user", session_id="3") is not None
+        assert service.get_stats()["entries"] == 2
+        assert service.get_stats()["evictions"] == 1
+
+    asyncio.run(run())
+
+
+def test_reloads_sessions_and_state_from_sqlite(tmp_path):
+    config = BoundedStoreConfig(sqlite_path=str(tmp_path / "sessions.db"))
+
+    async def run():
+        service = BoundedSessionService(config)
+        session = await service.create_session(app_name="app", user_id="user", session_id="1")
+        await service.append_event(session, _event("hello", {"user:name": "Alex", "step": 1}))
+
+        restarted = BoundedSessionService(config)
+        session = await restarted.get_session(app_name="app", user_id="user", session_id="1")
+        assert [event.content.parts[0].text for event in session.events] == ["hello"]
+        assert session.state == {"user:name": "Alex", "step": 1}
+
+    asyncio.run(run())
+
+
+def test_searches_memories_by_keyword():
+    async def run():
+        sessions = BoundedSessionService()
+        memory = BoundedMemoryService()
+        session = await sessions.create_session(app_name="app", user_id="user", session_id="1")
+        await sessions.append_event(session, _event("Book a table at Han Dynasty"))
+        await memory.add_session_to_memory(await sessions.get_session(app_name="app", user_id="user", session_id="1"))
+
+        response = await memory.search_memory(app_name="app", user_id="user", query="han dynasty?")
+        assert [m.content.parts[0].text for m in response.memories] == ["Book a table at Han Dynasty"]
+        assert (await memory.search_memory(app_name="app", user_id="other", query="han")).memories == []
+
+    asyncio.run(run())
+
+
+def test_shared_sessions_see_other_workers_changes(tmp_path):
+    config = BoundedStoreConfig(sqlite_path=str(tmp_path / "sessions.db"), shared=True)
+
+    async def run():
+        worker, other_worker = BoundedSessionService(config), BoundedSessionService(config)
+        session = await worker.create_session(app_name="app", user_id="user", session_id="1")
+        await other_worker.get_session(app_name="app", user_id="user", session_id="1")
+        await worker.append_event(session, _event("hello", {"route": "jira"}))
+
+        session = await other_worker.get_session(app_name="app", user_id="user", session_id="1")
+        assert session.state == {"route": "jira"}
+        await other_worker.delete_session(app_name="app", user_id="user", session_id="1")
+        assert await worker.get_session(app_name="app", user_id="user", session_id="1") is None
+
+    asyncio.run(run())
@@ -0,0 +1,92 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("google.adk")
+
+from a2ui.a2ui_adk_toolsets import CachingConnectorToolset, get_connector_entity_operation
+from google.adk.tools.base_tool import BaseTool
+from google.adk.tools.base_toolset import BaseToolset
+
+
+class _MockConnectorTool(BaseTool):
+    def __init__(self, name: str, calls: list):
+        super().__init__(name=name, description=name)
+        self._calls = calls
+
+    async def run_async(self, *, args, tool_context):
+        self._calls.append((self.name, args, tool_context.user_id))
+        return {"results": [len(self._calls)]}
+
+
+class _MockConnectorToolset(BaseToolset):
+    def __init__(self, calls: list):
+        super().__init__()
+        self._tools = [
+            _MockConnectorTool(name, calls)
+            for name in ("jira_tool_list_issues", "jira_tool_create_issues", "jira_tool_list_users", "search")
+        ]
+
+    async def get_tools(self, readonly_context=None):
+        return self._tools
+
+    async def close(self):
+        pass
+
+
+def test_gets_the_entity_operation():
+    assert get_connector_entity_operation(SimpleNamespace(name="x", _entity="Issues", _operation="LIST_ENTITIES")) == (
+        "Issues",
+        "LIST",
+    )
+    assert get_connector_entity_operation(SimpleNamespace(name="jira_tool_get_users")) == ("users", "GET")
+    assert get_connector_entity_operation(SimpleNamespace(name="search")) is None
+
+
+def test_caches_reads_and_invalidates_them_on_writes():
+    calls = []
+    toolset = CachingConnectorToolset(_MockConnectorToolset(calls))
+    alex = SimpleNamespace(user_id="alex")
+    sam = SimpleNamespace(user_id="sam")
+
+    async def run():
+        tools = {tool.name: tool for tool in await toolset.get_tools()}
+        assert await toolset.get_tools() == list(tools.values())
+        list_issues = tools["jira_tool_list_issues"]
+
+        first = await list_issues.run_async(args={"filter": "open"}, tool_context=alex)
+        assert await list_issues.run_async(args={"filter": "open"}, tool_context=alex) == first
+        await list_issues.run_async(args={"filter": "open"}, tool_context=sam)
+        await tools["jira_tool_list_users"].run_async(args={}, tool_context=alex)
+        await tools["jira_tool_create_issues"].run_async(args={"summary": "Bug"}, tool_context=alex)
+        assert await list_issues.run_async(args={"filter": "open"}, tool_context=alex) != first
+        await tools["jira_tool_list_users"].run_async(args={}, tool_context=alex)
+        await tools["search"].run_async(args={}, tool_context=alex)
+        await tools["search"].run_async(args={}, tool_context=alex)
+
+    asyncio.run(run())
+
+    assert [(name, user) for name, _, user in calls] == [
+        ("jira_tool_list_issues", "alex"),
+        ("jira_tool_list_issues", "sam"),
+        ("jira_tool_list_users", "alex"),
+        ("jira_tool_create_issues", "alex"),
+        ("jira_tool_list_issues", "alex"),
+        ("search", "alex"),
+        ("search", "alex"),
+    ]
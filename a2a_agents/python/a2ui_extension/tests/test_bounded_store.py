@@ -0,0 +1,188 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import fnmatch
+
+import pytest
+from a2a.types import Task, TaskState, TaskStatus
+from a2ui.a2ui_bounded_store import BoundedStore, BoundedStoreConfig, BoundedTaskStore, RedisStore, SqliteStore
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_store(request, tmp_path):
+    def make(config: BoundedStoreConfig, clock: _Clock):
+        if request.param == "sqlite":
+            return SqliteStore(str(tmp_path / "store.db"), "entries", config, clock=clock)
+        return BoundedStore(config, clock=clock)
+
+    return make
+
+
+def test_evicts_least_recently_used_entries(make_store):
+    store = make_store(BoundedStoreConfig(ttl_seconds=None, max_entries=2, max_bytes=None), clock := _Clock())
+
+    store.put("a", "1")
+    clock.now += 1
+    store.put("b", "2")
+    clock.now += 1
+    store.get("a")
+    clock.now += 1
+
+    assert store.put("c", "3") == [("b", "2")]
+    assert store.get("b") is None
+    assert store.get_stats()["entries"] == 2
+    assert store.get_stats()["evictions"] == 1
+
+
+def test_evicts_to_stay_under_max_bytes(make_store):
+    store = make_store(BoundedStoreConfig(ttl_seconds=None, max_entries=None, max_bytes=10), clock := _Clock())
+
+    store.put("a", "x" * 6)
+    clock.now += 1
+    store.put("a", "x" * 4)
+    clock.now += 1
+    store.put("b", "y" * 6)
+    assert store.get_stats()["bytes"] == 10
+
+    clock.now += 1
+    assert store.put("c", "z" * 3) == [("a", "x" * 4)]
+    assert store.get_stats()["bytes"] == 9
+
+
+def test_expires_idle_entries(make_store):
+    store = make_store(BoundedStoreConfig(ttl_seconds=60, max_entries=None, max_bytes=None), clock := _Clock())
+
+    store.put("a", "1")
+    store.put("b", "2")
+    clock.now += 50
+    assert store.get("a") == "1"
+    clock.now += 20
+
+    assert store.get("b") is None
+    assert store.get("a") == "1"
+    assert store.get_stats()["expirations"] == 1
+    assert store.delete("a") == "1"
+    assert len(store) == 0
+
+
+def test_accounts_for_given_sizes():
+    store = BoundedStore(BoundedStoreConfig(ttl_seconds=None, max_entries=None, max_bytes=100))
+
+    store.put("a", "", size=60)
+    assert store.get_size("a") == 60
+    assert store.put("b", "", size=50) == [("a", "")]
+    assert store.get_stats()["bytes"] == 50
+
+
+def test_reads_config_from_env(monkeypatch):
+    monkeypatch.setenv("A2UI_STORE_TTL_SECONDS", "0")
+    monkeypatch.setenv("A2UI_STORE_MAX_ENTRIES", "10")
+    monkeypatch.setenv("A2UI_STORE_SQLITE_PATH", "/tmp/a2ui.db")
+
+    monkeypatch.setenv("A2UI_STORE_SHARED", "true")
+
+    assert BoundedStoreConfig.from_env() == BoundedStoreConfig(
+        ttl_seconds=None, max_entries=10, sqlite_path="/tmp/a2ui.db", shared=True
+    )
+    with pytest.raises(ValueError):
+        BoundedStore(BoundedStoreConfig(max_entries=0))
+    with pytest.raises(ValueError):
+        BoundedStoreConfig(shared=True)
+
+
+def _task(task_id: str) -> Task:
+    return Task(id=task_id, context_id="context", status=TaskStatus(state=TaskState.working))
+
+
+def test_task_store_persists_tasks_in_sqlite(tmp_path):
+    config = BoundedStoreConfig(max_entries=2, sqlite_path=str(tmp_path / "tasks.db"))
+
+    async def run():
+        store = BoundedTaskStore(config)
+        for task_id in ("1", "2", "3"):
+            await store.save(_task(task_id))
+        task = await store.get("3")
+        task.status.state = TaskState.completed
+        assert (await store.get("3")).status.state == TaskState.working
+
+        # A new store, e.g. after a restart, sees the same tasks.
+        restarted = BoundedTaskStore(config)
+        assert await restarted.get("1") is None
+        assert (await restarted.get("2")).id == "2"
+        await restarted.delete("2")
+        assert await store.get("2") is None
+        assert restarted.get_stats()["entries"] == 1
+
+    asyncio.run(run())
+
+
+class _LocalRedis:
+    """Stands in for a Redis-protocol server's client."""
+
+    def __init__(self):
+        self.values = {}
+        self.ttls = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def getex(self, key, px):
+        if key in self.values:
+            self.ttls[key] = px
+        return self.values.get(key)
+
+    def set(self, key, value, px=None):
+        self.values[key] = value
+        self.ttls[key] = px
+
+    def getdel(self, key):
+        self.ttls.pop(key, None)
+        return self.values.pop(key, None)
+
+    def scan_iter(self, match):
+        return [key for key in self.values if fnmatch.fnmatchcase(key, match)]
+
+    def strlen(self, key):
+        return len(self.values[key])
+
+    def info(self, section):
+        return {"evicted_keys": 2, "expired_keys": 3}
+
+
+def test_redis_store_leaves_expiry_to_the_server():
+    client = _LocalRedis()
+    store = RedisStore("redis://unused", "tasks", BoundedStoreConfig(ttl_seconds=1.5), client=client)
+    other_table = RedisStore("redis://unused", "sessions", client=client)
+
+    assert store.put("a", "value") == []
+    other_table.put("a", "other")
+    client.ttls["a2ui:tasks:a"] = 1
+
+    assert store.get("a") == "value"
+    assert client.ttls["a2ui:tasks:a"] == 1500
+    assert store.get_stats()["entries"] == 1
+    assert store.get_stats()["bytes"] == 5
+    assert store.get_stats()["evictions"] == 2
+    assert store.delete("a") == "value"
+    assert store.get("a") is None
+    assert other_table.get("a") == "other"
@@ -0,0 +1,129 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import os
+
+from a2ui import a2ui_data_store
+from a2ui.a2ui_data_store import IndexedDataStore, index_fields, index_words
+
+_PLACEHOLDER = "http://localhost:10002"
+
+_CONTACTS = [
+    {"name": "Alex Jordan", "department": "Marketing", "imageUrl": f"{_PLACEHOLDER}/static/1.png"},
+    {"name": "Casey Smith", "department": "Marketing", "tags": ["New York", "Remote"]},
+    {"name": "Jordan Taylor", "department": "Engineering", "imageUrl": f"{_PLACEHOLDER}/static/3.png"},
+]
+
+_INDEXES = {
+    "name": index_words("name"),
+    "department": index_fields("department"),
+    "tags": index_fields("tags"),
+}
+
+
+def _write(path, records):
+    path.write_text(json.dumps(records))
+
+
+def test_indexes_records(tmp_path):
+    _write(tmp_path / "contacts.json", _CONTACTS)
+    snapshot = IndexedDataStore(str(tmp_path / "contacts.json"), _INDEXES).get_snapshot()
+
+    assert len(snapshot) == 3
+    assert snapshot.lookup("name", "jordan") == [0, 2]
+    assert snapshot.lookup("department", "marketing") == [0, 1]
+    assert snapshot.lookup("tags", "remote") == [1]
+    assert snapshot.find("name", lambda term: "jor" in term) == {0, 2}
+    assert sorted(snapshot.get_terms("department")) == ["engineering", "marketing"]
+    assert [r["name"] for r in snapshot.get_records({2, 0}, limit=1)] == ["Alex Jordan"]
+    assert [r["name"] for r in snapshot.get_records([2, 0], keep_order=True)] == ["Jordan Taylor", "Alex Jordan"]
+
+
+def test_rewrites_the_url_placeholder_per_base_url(tmp_path):
+    _write(tmp_path / "contacts.json", _CONTACTS)
+    store = IndexedDataStore(str(tmp_path / "contacts.json"), _INDEXES, url_placeholder=_PLACEHOLDER)
+    snapshot = store.get_snapshot()
+
+    records = snapshot.get_records([0, 1], base_url="https://agent.example.com")
+    assert records[0]["imageUrl"] == "https://agent.example.com/static/1.png"
+    # Records without the placeholder aren't copied.
+    assert records[1] is snapshot.records[1]
+    assert snapshot.get_records([0], base_url="https://agent.example.com")[0] is records[0]
+    assert snapshot.records[0]["imageUrl"] == f"{_PLACEHOLDER}/static/1.png"
+
+
+def test_reloads_changed_files(tmp_path):
+    path = tmp_path / "contacts.json"
+    _write(path, _CONTACTS)
+    loaded = []
+    store = IndexedDataStore(str(path), _INDEXES, on_load=lambda snapshot: loaded.append(len(snapshot)))
+
+    assert not store.refresh()
+    _write(path, _CONTACTS[:1])
+    os.utime(path, ns=(0, 1))
+    assert store.refresh()
+    assert len(store.get_snapshot()) == 1
+    assert loaded == [3, 1]
+
+    # A file that can't be parsed keeps the last good records.
+    path.write_text("[{")
+    assert not store.refresh()
+    assert len(store.get_snapshot()) == 1
+
+
+def test_checks_files_inline_and_reloads_only_changes_in_background(tmp_path, monkeypatch):
+    path = tmp_path / "contacts.json"
+    _write(path, _CONTACTS)
+    store = IndexedDataStore(str(path), _INDEXES, check_interval_seconds=0)
+    threads = []
+
+    class _Thread:
+        def __init__(self, target, args, daemon):
+            threads.append(self)
+            self._target = target
+            self._args = args
+
+        def start(self):
+            self._target(*self._args)
+
+    monkeypatch.setattr(a2ui_data_store.threading, "Thread", _Thread)
+
+    assert len(store.get_snapshot()) == 3
+    assert threads == []
+    _write(path, _CONTACTS[:1])
+    os.utime(path, ns=(0, 1))
+    assert len(store.get_snapshot()) == 1
+    assert len(threads) == 1
+    # Unchanged files aren't reloaded again.
+    assert len(store.get_snapshot()) == 1
+    assert len(threads) == 1
+
+
+def test_loads_a_directory_in_name_order(tmp_path):
+    _write(tmp_path / "b.json", _CONTACTS[1:])
+    _write(tmp_path / "a.json", _CONTACTS[:1])
+    (tmp_path / "notes.txt").write_text("not records")
+    store = IndexedDataStore(str(tmp_path), _INDEXES)
+
+    assert [r["name"] for r in store.get_snapshot().records] == ["Alex Jordan", "Casey Smith", "Jordan Taylor"]
+    _write(tmp_path / "c.json", [{"name": "Sam Lee", "department": "Sales"}])
+    assert store.refresh()
+    assert store.get_snapshot().lookup("department", "sales") == [3]
+
+
+def test_missing_files_load_no_records(tmp_path):
+    store = IndexedDataStore(str(tmp_path / "missing.json"), _INDEXES)
+
+    assert len(store.get_snapshot()) == 0
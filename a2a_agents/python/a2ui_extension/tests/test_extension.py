@@ -12,10 +12,12 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-
+import jsonschema
+import pytest
 from a2a.server.agent_execution import RequestContext
 from a2a.types import DataPart, TextPart, Part
 from a2ui import a2ui_extension
+from a2ui.a2ui_bounded_store import BoundedStoreConfig
 
 from unittest.mock import MagicMock
 
@@ -88,3 +90,354 @@ def test_try_activate_a2ui_extension_not_requested():
 
     assert not a2ui_extension.try_activate_a2ui_extension(context)
     context.add_activated_extension.assert_not_called()
+
+
+def test_get_a2ui_user_action():
+    context = MagicMock(spec=RequestContext)
+    user_action = {"name": "book_restaurant", "surfaceId": "s", "context": {}}
+    context.message.parts = [
+        Part(root=TextPart(text="hi")),
+        Part(root=DataPart(data={"userAction": user_action})),
+    ]
+
+    assert a2ui_extension.get_a2ui_user_action(context) == user_action
+    context.message.parts = [Part(root=TextPart(text="hi"))]
+    assert a2ui_extension.get_a2ui_user_action(context) is None
+
+
+_DATA_MODEL_UPDATE = {
+    "dataModelUpdate": {
+        "surfaceId": "test-surface",
+        "path": "/",
+        "contents": [
+            {"key": "title", "valueString": "Top restaurants"},
+            {"key": "count", "valueNumber": 2},
+            {"key": "open", "valueBoolean": True},
+            {
+                "key": "items",
+                "valueMap": [{"key": "item1", "valueMap": [{"key": "rating", "valueNumber": 4.5}]}],
+            },
+        ],
+    }
+}
+
+
+@pytest.mark.parametrize(
+    "encoding",
+    [
+        a2ui_extension.A2UI_COMPACT_MIME_TYPE,
+        a2ui_extension.A2UI_DEFLATE_MIME_TYPE,
+    ],
+)
+def test_encoded_a2ui_part_is_decoded_transparently(encoding):
+    part = a2ui_extension.create_a2ui_part(_DATA_MODEL_UPDATE, encoding)
+
+    assert part.root.metadata["mimeType"] == encoding
+    assert "contents" not in str(part.root.data)
+    assert a2ui_extension.is_a2ui_part(part)
+    data_part = a2ui_extension.get_a2ui_datapart(part)
+    assert data_part.data == _DATA_MODEL_UPDATE
+    assert data_part.metadata["mimeType"] == a2ui_extension.A2UI_MIME_TYPE
+
+
+def test_compact_encoding_falls_back_for_mistyped_values():
+    a2ui_data = {
+        "dataModelUpdate": {
+            "surfaceId": "test-surface",
+            "contents": [{"key": "count", "valueString": 2}],
+        }
+    }
+
+    part = a2ui_extension.create_a2ui_part(a2ui_data, a2ui_extension.A2UI_COMPACT_MIME_TYPE)
+
+    assert part.root.metadata["mimeType"] == a2ui_extension.A2UI_MIME_TYPE
+    assert part.root.data == a2ui_data
+
+
+def test_select_a2ui_encoding():
+    assert a2ui_extension.select_a2ui_encoding(None) == a2ui_extension.A2UI_MIME_TYPE
+    assert (
+        a2ui_extension.select_a2ui_encoding({"supportedCatalogIds": []})
+        == a2ui_extension.A2UI_MIME_TYPE
+    )
+    assert (
+        a2ui_extension.select_a2ui_encoding(
+            {
+                "supportedEncodings": [
+                    "application/unknown",
+                    a2ui_extension.A2UI_DEFLATE_MIME_TYPE,
+                    a2ui_extension.A2UI_COMPACT_MIME_TYPE,
+                ]
+            }
+        )
+        == a2ui_extension.A2UI_DEFLATE_MIME_TYPE
+    )
+
+
+def test_encode_a2ui_part():
+    part = a2ui_extension.create_a2ui_part(_DATA_MODEL_UPDATE)
+    text_part = Part(root=TextPart(text="hello"))
+
+    encoded = a2ui_extension.encode_a2ui_part(part, a2ui_extension.A2UI_DEFLATE_MIME_TYPE)
+
+    assert a2ui_extension.encode_a2ui_part(text_part, a2ui_extension.A2UI_DEFLATE_MIME_TYPE) is text_part
+    assert a2ui_extension.encode_a2ui_part(part, a2ui_extension.A2UI_MIME_TYPE) is part
+    assert encoded.root.metadata["mimeType"] == a2ui_extension.A2UI_DEFLATE_MIME_TYPE
+    assert a2ui_extension.get_a2ui_datapart(encoded).data == _DATA_MODEL_UPDATE
+
+
+def test_get_a2ui_dataparts():
+    begin_a = {"beginRendering": {"surfaceId": "a", "root": "root"}}
+    update_a = {"surfaceUpdate": {"surfaceId": "a", "components": []}}
+    parts = [
+        a2ui_extension.create_a2ui_part(begin_a),
+        Part(root=TextPart(text="not A2UI")),
+        a2ui_extension.create_a2ui_part(update_a, a2ui_extension.A2UI_COMPACT_MIME_TYPE),
+    ]
+
+    assert [p.data for p in a2ui_extension.get_a2ui_dataparts(parts)] == [begin_a, update_a]
+
+
+_TEST_A2UI_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "beginRendering": {
+            "type": "object",
+            "properties": {
+                "surfaceId": {"type": "string"},
+                "root": {"type": "string"},
+            },
+            "required": ["surfaceId", "root"],
+        },
+    },
+}
+
+
+def test_validator_registry_reuses_compiled_validator():
+    registry = a2ui_extension.A2uiValidatorRegistry()
+
+    validator = registry.get_validator(_TEST_A2UI_SCHEMA, catalog_id="catalog-a")
+
+    assert registry.get_validator(_TEST_A2UI_SCHEMA, catalog_id="catalog-a") is validator
+    assert len(registry) == 1
+    assert validator.is_valid(
+        [{"beginRendering": {"surfaceId": "test-surface", "root": "root-column"}}]
+    )
+    assert not validator.is_valid([{"beginRendering": {"surfaceId": "test-surface"}}])
+
+
+def test_validator_registry_keys_inline_catalogs_by_hash():
+    registry = a2ui_extension.A2uiValidatorRegistry()
+    other_schema = {"type": "object", "required": ["surfaceUpdate"]}
+
+    validator = registry.get_validator(_TEST_A2UI_SCHEMA)
+
+    assert registry.get_validator(dict(_TEST_A2UI_SCHEMA)) is validator
+    assert registry.get_validator(other_schema) is not validator
+    assert len(registry) == 2
+
+
+def test_validator_registry_evicts_least_recently_used():
+    registry = a2ui_extension.A2uiValidatorRegistry(max_size=2)
+
+    validator_a = registry.get_validator(_TEST_A2UI_SCHEMA, catalog_id="catalog-a")
+    registry.get_validator(_TEST_A2UI_SCHEMA, catalog_id="catalog-b")
+    registry.get_validator(_TEST_A2UI_SCHEMA, catalog_id="catalog-a")
+    registry.get_validator(_TEST_A2UI_SCHEMA, catalog_id="catalog-c")
+
+    assert len(registry) == 2
+    assert registry.get_validator(_TEST_A2UI_SCHEMA, catalog_id="catalog-a") is validator_a
+
+
+def test_validate_a2ui_messages():
+    a2ui_extension.validate_a2ui_messages(
+        [{"beginRendering": {"surfaceId": "test-surface", "root": "root-column"}}],
+        _TEST_A2UI_SCHEMA,
+        catalog_id="test-catalog",
+    )
+
+    with pytest.raises(jsonschema.exceptions.ValidationError):
+        a2ui_extension.validate_a2ui_messages(
+            {"beginRendering": {"surfaceId": "test-surface", "root": "root-column"}},
+            _TEST_A2UI_SCHEMA,
+            catalog_id="test-catalog",
+        )
+
+
+def test_capability_resolver_loads_once_per_capabilities():
+    calls = []
+
+    def load_a2ui_schema(client_capabilities):
+        calls.append(client_capabilities)
+        return _TEST_A2UI_SCHEMA, client_capabilities["supportedCatalogIds"][0]
+
+    resolver = a2ui_extension.A2uiCapabilityResolver(
+        load_a2ui_schema, validator_registry=a2ui_extension.A2uiValidatorRegistry()
+    )
+
+    resolved = resolver.resolve({"supportedCatalogIds": ["catalog-a"]})
+
+    assert resolver.resolve({"supportedCatalogIds": ["catalog-a"]}) is resolved
+    assert resolved.catalog_id == "catalog-a"
+    assert resolved.a2ui_schema is _TEST_A2UI_SCHEMA
+    assert resolved.validator.is_valid([])
+    assert resolved.capabilities_hash == a2ui_extension.get_a2ui_client_capabilities_hash(
+        {"supportedCatalogIds": ["catalog-a"]}
+    )
+    assert resolver.resolve({"supportedCatalogIds": ["catalog-b"]}) is not resolved
+    assert len(calls) == 2
+
+
+def test_capability_resolver_evicts_and_does_not_cache_failures():
+    def load_a2ui_schema(client_capabilities):
+        if client_capabilities is None:
+            raise ValueError("Client UI capabilities not provided")
+        return _TEST_A2UI_SCHEMA, None
+
+    resolver = a2ui_extension.A2uiCapabilityResolver(load_a2ui_schema, max_size=1)
+
+    with pytest.raises(ValueError):
+        resolver.resolve(None)
+    resolved = resolver.resolve({"inlineCatalogs": ["a"]})
+    resolver.resolve({"inlineCatalogs": ["b"]})
+
+    assert len(resolver) == 1
+    assert resolver.resolve({"inlineCatalogs": ["a"]}) is not resolved
+
+
+def _booking_surface(party_size, items=("item1", "item2")):
+    return [
+        {"beginRendering": {"surfaceId": "booking", "root": "root-column"}},
+        {
+            "surfaceUpdate": {
+                "surfaceId": "booking",
+                "components": [
+                    {"id": "root-column", "component": {"Column": {"children": {"explicitList": ["title"]}}}},
+                    {"id": "title", "component": {"Text": {"text": {"path": "title"}}}},
+                ],
+            }
+        },
+        {
+            "dataModelUpdate": {
+                "surfaceId": "booking",
+                "path": "/",
+                "contents": [
+                    {"key": "title", "valueString": "Book a table"},
+                    {"key": "restaurantName", "valueString": "The Fancy Place"},
+                    {"key": "address", "valueString": "123 Main St"},
+                    {"key": "partySize", "valueNumber": party_size},
+                    {
+                        "key": "items",
+                        "valueMap": [
+                            {"key": item, "valueMap": [{"key": "name", "valueString": item}]}
+                            for item in items
+                        ],
+                    },
+                ],
+            }
+        },
+    ]
+
+
+def test_supports_a2ui_surface_deltas_only_if_the_client_opts_in():
+    assert not a2ui_extension.supports_a2ui_surface_deltas(None)
+    assert not a2ui_extension.supports_a2ui_surface_deltas({"supportedCatalogIds": []})
+    assert not a2ui_extension.supports_a2ui_surface_deltas({"surfaceDeltas": "true"})
+    assert a2ui_extension.supports_a2ui_surface_deltas({"surfaceDeltas": True})
+
+
+def test_surface_state_store_sends_full_surface_first():
+    store = a2ui_extension.SurfaceStateStore()
+
+    assert store.diff("session", _booking_surface(2)) == _booking_surface(2)
+
+
+def test_surface_state_store_drops_unchanged_messages():
+    store = a2ui_extension.SurfaceStateStore()
+    store.diff("session", _booking_surface(2))
+
+    assert store.diff("session", _booking_surface(2)) == []
+    assert store.diff("other-session", _booking_surface(2)) == _booking_surface(2)
+
+
+def test_surface_state_store_sends_changed_data_entries():
+    store = a2ui_extension.SurfaceStateStore()
+    store.diff("session", _booking_surface(2))
+
+    assert store.diff("session", _booking_surface(4)) == [
+        {
+            "dataModelUpdate": {
+                "surfaceId": "booking",
+                "path": "/partySize",
+                "contents": [{"key": ".", "valueNumber": 4}],
+            }
+        }
+    ]
+
+
+def test_surface_state_store_replaces_maps_with_removed_entries():
+    store = a2ui_extension.SurfaceStateStore()
+    store.diff("session", _booking_surface(2, items=("item1", "item2")))
+
+    assert store.diff("session", _booking_surface(2, items=("item1",))) == [
+        {
+            "dataModelUpdate": {
+                "surfaceId": "booking",
+                "path": "/items",
+                "contents": [{"key": "item1", "valueMap": [{"key": "name", "valueString": "item1"}]}],
+            }
+        }
+    ]
+
+
+def test_surface_state_store_sends_changed_components():
+    store = a2ui_extension.SurfaceStateStore()
+    store.diff("session", _booking_surface(2))
+    messages = _booking_surface(2)
+    changed_component = {"id": "title", "component": {"Text": {"text": {"literalString": "Hi"}}}}
+    messages[1]["surfaceUpdate"]["components"][1] = changed_component
+
+    assert store.diff("session", messages) == [
+        {"surfaceUpdate": {"surfaceId": "booking", "components": [changed_component]}}
+    ]
+
+
+def test_surface_state_store_without_record_and_delete_surface():
+    store = a2ui_extension.SurfaceStateStore()
+    store.diff("session", _booking_surface(2))
+
+    assert len(store.diff("session", _booking_surface(4), record=False)) == 1
+    assert len(store.diff("session", _booking_surface(4), record=False)) == 1
+
+    delete_message = {"deleteSurface": {"surfaceId": "booking"}}
+    assert store.diff("session", [delete_message]) == [delete_message]
+    assert store.diff("session", _booking_surface(4)) == _booking_surface(4)
+
+
+def test_surface_state_store_shares_sessions_between_workers(tmp_path):
+    config = BoundedStoreConfig(sqlite_path=str(tmp_path / "surfaces.db"), shared=True)
+    worker_a = a2ui_extension.SurfaceStateStore(config=config)
+    worker_b = a2ui_extension.SurfaceStateStore(config=config)
+    worker_a.diff("session", _booking_surface(2, items=("item1", "item2")))
+
+    assert worker_b.diff("session", _booking_surface(4, items=("item1", "item2"))) == [
+        {
+            "dataModelUpdate": {
+                "surfaceId": "booking",
+                "path": "/partySize",
+                "contents": [{"key": ".", "valueNumber": 4}],
+            }
+        }
+    ]
+    assert worker_a.diff("session", _booking_surface(4, items=("item1", "item2"))) == []
+
+    worker_b.clear("session")
+    assert worker_a.diff("session", _booking_surface(4)) == _booking_surface(4)
+
+
+def test_surface_state_store_evicts_least_recently_used_session():
+    store = a2ui_extension.SurfaceStateStore(max_sessions=1)
+    store.diff("session-a", _booking_surface(2))
+    store.diff("session-b", _booking_surface(2))
+
+    assert store.diff("session-a", _booking_surface(2)) == _booking_surface(2)
@@ -0,0 +1,71 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+from a2ui.a2ui_fuzzy_index import PREFIX_SCORE, FuzzyIndex
+
+_CONTACTS = {
+    "1": {"name": "Alex Jordan", "title": "Product Marketing Manager", "team": "Team Macally"},
+    "2": {"name": "Casey Smith", "title": "Digital Marketing Specialist", "team": "Growth Team"},
+    "3": {"name": "Jordan Taylor", "title": "Software Engineer", "team": "Core Platform"},
+    "4": {"name": "John Smith", "title": "Engineering Manager", "team": None},
+}
+
+
+@pytest.fixture
+def index():
+    index = FuzzyIndex({"name": 1.0, "title": 0.8, "team": 0.8})
+    index.sync(_CONTACTS)
+    return index
+
+
+def test_ranks_matches_of_more_query_words_first(index):
+    assert index.search("alex jordan") == [("1", 1.0), ("3", 0.5)]
+    # Ties are ranked by key.
+    assert index.search("jordan") == [("1", 1.0), ("3", 1.0)]
+
+
+def test_matches_typos_nicknames_and_prefixes(index):
+    assert index.search("Jordon Tailor")[0][0] == "3"
+    assert [key for key, _ in index.search("jon")] == ["4"]
+    assert index.search("jo") == [("1", PREFIX_SCORE), ("3", PREFIX_SCORE), ("4", PREFIX_SCORE)]
+    # Single letters only match by trigrams, which score low.
+    assert index.search("j") == []
+
+
+def test_weights_other_fields(index):
+    assert index.search("markting") == [("1", pytest.approx(0.589, abs=1e-3)), ("2", pytest.approx(0.589, abs=1e-3))]
+    assert index.search("marketing", min_score=0.9) == []
+
+
+def test_limits_and_filters_results(index):
+    assert index.search("jordan", limit=1) == [("1", 1.0)]
+    assert index.search("jordan", accept=lambda key: key != "1") == [("3", 1.0)]
+    assert len(index.search("jordan", limit=None, min_score=0.0)) == 3
+    assert index.search("zzz") == []
+    assert index.search("") == []
+
+
+def test_syncs_incrementally(index):
+    changed = dict(_CONTACTS)
+    changed["3"] = {"name": "Jordan Lee", "title": "Software Engineer", "team": "Core Platform"}
+    del changed["4"]
+
+    assert index.sync(changed) == (1, 1)
+    assert len(index) == 3
+    assert "4" not in index
+    assert index.search("taylor") == []
+    assert index.search("john") == []
+    assert index.search("lee") == [("3", 1.0)]
+    assert index.sync(changed) == (0, 0)
@@ -0,0 +1,134 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from a2ui.a2ui_instrumentation import (
+    STAGE_JSON_PARSE,
+    STAGE_LLM_CALL,
+    STAGE_RETRY,
+    STAGE_TOOL_CALL,
+    STAGE_TURN,
+    A2uiLatencyCallbacks,
+    A2uiMetricsApp,
+    LatencyHistograms,
+    a2ui_request_labels,
+    a2ui_span,
+    get_latency_histograms,
+    record_a2ui_stage,
+    set_a2ui_request_action,
+)
+from a2ui.a2ui_json_repair import repair_a2ui_response
+
+
+@pytest.fixture(autouse=True)
+def histograms():
+    histograms = get_latency_histograms()
+    histograms.reset()
+    yield histograms
+    histograms.reset()
+
+
+def test_renders_cumulative_buckets():
+    histograms = LatencyHistograms(buckets=(0.1, 1.0))
+    histograms.observe("agent", "book", "llm_call", 0.05)
+    histograms.observe("agent", "book", "llm_call", 0.5)
+    histograms.observe("agent", "book", "llm_call", 5.0)
+    histograms.add_gauge_source("tasks", lambda: {"entries": 3, "max_bytes": None})
+
+    lines = histograms.render_prometheus().splitlines()
+
+    labels = 'agent="agent",action="book",stage="llm_call"'
+    assert f'a2ui_stage_latency_seconds_bucket{{{labels},le="0.1"}} 1' in lines
+    assert f'a2ui_stage_latency_seconds_bucket{{{labels},le="1.0"}} 2' in lines
+    assert f'a2ui_stage_latency_seconds_bucket{{{labels},le="+Inf"}} 3' in lines
+    assert f"a2ui_stage_latency_seconds_sum{{{labels}}} 5.55" in lines
+    assert f"a2ui_stage_latency_seconds_count{{{labels}}} 3" in lines
+    assert 'a2ui_store_entries{store="tasks"} 3' in lines
+    assert not any(line.startswith("a2ui_store_max_bytes") for line in lines)
+    with pytest.raises(ValueError):
+        LatencyHistograms(buckets=(1.0, 0.1))
+
+
+def test_escapes_label_values():
+    histograms = LatencyHistograms()
+    histograms.observe('say "hi"\n', "", "turn", 0.1)
+
+    assert 'agent="say \\"hi\\"\\n"' in histograms.render_prometheus()
+
+
+def test_spans_use_the_request_labels(histograms):
+    with a2ui_request_labels("restaurant", "book_restaurant"):
+        repair_a2ui_response('Hi\n---a2ui_JSON---\n[{"deleteSurface": {"surfaceId": "s"}}]')
+    with a2ui_span(STAGE_JSON_PARSE):
+        pass
+
+    assert histograms.get_stats("restaurant", "book_restaurant", STAGE_JSON_PARSE)["count"] == 1
+    assert histograms.get_stats("", "", STAGE_JSON_PARSE)["count"] == 1
+
+
+def test_labels_open_spans_with_the_action_once_known(histograms):
+    with a2ui_request_labels("restaurant"):
+        with a2ui_span(STAGE_TURN):
+            set_a2ui_request_action("submit_booking")
+            record_a2ui_stage(STAGE_RETRY, 1.5)
+        with a2ui_span(STAGE_JSON_PARSE):
+            pass
+
+    assert histograms.get_stats("restaurant", "submit_booking", STAGE_TURN)["count"] == 1
+    assert histograms.get_stats("restaurant", "submit_booking", STAGE_RETRY) == {"count": 1, "sum": 1.5}
+    assert histograms.get_stats("restaurant", "submit_booking", STAGE_JSON_PARSE)["count"] == 1
+    assert histograms.get_stats("", "", STAGE_TURN)["count"] == 0
+
+
+def test_records_the_stage_when_it_fails(histograms):
+    with pytest.raises(ValueError):
+        with a2ui_request_labels("agent"):
+            with a2ui_span(STAGE_JSON_PARSE):
+                raise ValueError()
+
+    assert histograms.get_stats("agent", "", STAGE_JSON_PARSE)["count"] == 1
+
+
+def test_callbacks_time_llm_and_tool_calls(histograms):
+    callbacks = A2uiLatencyCallbacks()
+    callback_context = SimpleNamespace(invocation_id="1", agent_name="contact_agent")
+    tool = SimpleNamespace(name="get_contact_info")
+    tool_context = SimpleNamespace(function_call_id="call", agent_name="contact_agent")
+
+    assert callbacks.before_model(callback_context, None) is None
+    callbacks.after_model(callback_context, SimpleNamespace(partial=True))
+    assert histograms.get_stats("contact_agent", "", STAGE_LLM_CALL)["count"] == 0
+    callbacks.after_model(callback_context, SimpleNamespace(partial=False))
+    callbacks.before_tool(tool, {}, tool_context)
+    callbacks.after_tool(tool, {}, tool_context, {})
+    callbacks.after_tool(tool, {}, tool_context, {})
+
+    assert histograms.get_stats("contact_agent", "", STAGE_LLM_CALL)["count"] == 1
+    assert histograms.get_stats("contact_agent", "", STAGE_TOOL_CALL)["count"] == 1
+
+
+def test_metrics_app_serves_the_histograms(histograms):
+    histograms.observe("agent", "", "turn", 0.2)
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(A2uiMetricsApp()({"type": "http"}, None, send))
+
+    assert sent[0]["status"] == 200
+    assert b'stage="turn"' in sent[1]["body"]
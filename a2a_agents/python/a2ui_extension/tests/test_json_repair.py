@@ -0,0 +1,106 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+
+import jsonschema
+import pytest
+from a2ui import a2ui_extension
+from a2ui.a2ui_json_repair import A2uiJsonRepairer
+
+_MESSAGE = {"beginRendering": {"surfaceId": "default", "root": "root, [column]"}}
+_DELIMITER = a2ui_extension.A2UI_JSON_DELIMITER
+
+
+@pytest.mark.parametrize(
+    "json_part",
+    [
+        json.dumps([_MESSAGE]),
+        "```json\n" + json.dumps([_MESSAGE], indent=2) + "\n```",
+        "```JSON\n" + json.dumps([_MESSAGE]) + "\n```",
+        "```\n" + json.dumps([_MESSAGE]),
+    ],
+)
+def test_valid_responses_need_no_repairs(json_part):
+    repairer = A2uiJsonRepairer()
+
+    result = repairer.repair("Here you go." + _DELIMITER + "\n" + json_part)
+
+    assert result.text == "Here you go."
+    assert result.messages == [_MESSAGE]
+    assert result.repairs == []
+    assert repairer.get_counters()["repaired_responses"] == 0
+
+
+def test_removes_trailing_commas_outside_strings():
+    repairer = A2uiJsonRepairer()
+    json_part = '[{"beginRendering": {"surfaceId": "default", "root": "root, [column]",},},]'
+
+    result = repairer.repair("Text" + _DELIMITER + json_part)
+
+    assert result.messages == [_MESSAGE]
+    assert result.repairs == ["remove_trailing_commas"]
+
+
+def test_wraps_single_object():
+    result = A2uiJsonRepairer().repair("Text" + _DELIMITER + json.dumps(_MESSAGE))
+
+    assert result.messages == [_MESSAGE]
+    assert result.repairs == ["wrap_single_object"]
+
+
+def test_inserts_missing_delimiter():
+    response = "Here are the results:\n```json\n" + json.dumps([_MESSAGE])[:-1] + ",]\n```"
+
+    result = A2uiJsonRepairer().repair(response)
+
+    assert result.text == "Here are the results:"
+    assert result.messages == [_MESSAGE]
+    assert result.repairs == ["insert_delimiter", "remove_trailing_commas"]
+    assert A2uiJsonRepairer().repair(result.to_response()).repairs == []
+
+
+def test_unrepairable_responses_raise():
+    repairer = A2uiJsonRepairer()
+
+    with pytest.raises(ValueError):
+        repairer.repair("Just text [not json")
+    with pytest.raises(json.JSONDecodeError):
+        repairer.repair("Text" + _DELIMITER + '[{"beginRendering": }]')
+    with pytest.raises(ValueError):
+        repairer.repair("Text" + _DELIMITER + "```json\n```")
+
+    assert repairer.repair("No results." + _DELIMITER, allow_empty=True).messages == []
+    assert repairer.get_counters()["failed_responses"] == 3
+
+
+def test_counters_only_count_valid_repaired_responses():
+    repairer = A2uiJsonRepairer()
+    schema = {"type": "object", "required": ["beginRendering"]}
+
+    def validate(messages):
+        a2ui_extension.validate_a2ui_messages(messages, schema, catalog_id="repair-test")
+
+    repairer.repair("Text" + _DELIMITER + json.dumps(_MESSAGE), validate=validate)
+    with pytest.raises(jsonschema.exceptions.ValidationError):
+        repairer.repair("Text" + _DELIMITER + '{"surfaceUpdate": {},}', validate=validate)
+
+    assert repairer.get_counters() == {
+        "responses": 2,
+        "repaired_responses": 1,
+        "failed_responses": 1,
+        "insert_delimiter": 0,
+        "remove_trailing_commas": 0,
+        "wrap_single_object": 1,
+    }
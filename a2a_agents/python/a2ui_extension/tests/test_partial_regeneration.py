@@ -0,0 +1,111 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+from pathlib import Path
+
+import jsonschema
+import pytest
+from a2ui import a2ui_extension
+from a2ui.a2ui_partial_regeneration import get_a2ui_partial_regeneration
+
+_SCHEMA_PATH = Path(__file__).parents[4] / "specification" / "0.8" / "json" / "server_to_client_with_standard_catalog.json"
+_DELIMITER = a2ui_extension.A2UI_JSON_DELIMITER
+
+_BEGIN_RENDERING = {"beginRendering": {"surfaceId": "default", "root": "root"}}
+_SURFACE_UPDATE = {
+    "surfaceUpdate": {
+        "surfaceId": "default",
+        "components": [
+            {"id": "root", "component": {"Column": {"children": {"explicitList": ["title"]}}}},
+            {"id": "title", "component": {"Text": {"text": {"literalString": "Hi"}}}},
+        ]
+    }
+}
+_DATA_MODEL_UPDATE = {
+    "dataModelUpdate": {"surfaceId": "default", "contents": [{"key": "name", "valueString": "Alex"}]}
+}
+
+
+@pytest.fixture(scope="module")
+def schema():
+    with open(_SCHEMA_PATH) as f:
+        return json.load(f)
+
+
+@pytest.fixture(scope="module")
+def validate(schema):
+    def validate(messages):
+        a2ui_extension.validate_a2ui_messages(messages, schema, catalog_id="regeneration-test")
+
+    return validate
+
+
+def _invalid_surface_update():
+    message = json.loads(json.dumps(_SURFACE_UPDATE))
+    del message["surfaceUpdate"]["components"][1]["component"]["Text"]["text"]
+    return message
+
+
+def test_regenerates_and_splices_only_the_invalid_message(validate):
+    messages = [_BEGIN_RENDERING, _invalid_surface_update(), _DATA_MODEL_UPDATE]
+    response = "Hello!" + _DELIMITER + json.dumps(messages)
+    with pytest.raises(jsonschema.exceptions.ValidationError) as exc_info:
+        validate(messages)
+
+    regeneration = get_a2ui_partial_regeneration(response, exc_info.value)
+
+    (invalid_message,) = regeneration.invalid_messages
+    assert invalid_message.message_index == 1
+    assert invalid_message.json_pointer.startswith("/surfaceUpdate/components/1")
+    assert "Message 1 " in regeneration.get_prompt()
+
+    result = regeneration.splice("```json\n" + json.dumps(_SURFACE_UPDATE) + "\n```")
+    validate(result.messages)
+    assert result.text == "Hello!"
+    assert result.messages == [_BEGIN_RENDERING, _SURFACE_UPDATE, _DATA_MODEL_UPDATE]
+
+    with pytest.raises(ValueError):
+        regeneration.splice(json.dumps([_SURFACE_UPDATE, _DATA_MODEL_UPDATE]))
+
+
+def test_regenerates_every_invalid_message_in_one_request(schema, validate):
+    invalid_data_model_update = {"dataModelUpdate": {"surfaceId": "default"}}
+    messages = [_BEGIN_RENDERING, _invalid_surface_update(), invalid_data_model_update]
+    response = "Hello!" + _DELIMITER + json.dumps(messages)
+    with pytest.raises(jsonschema.exceptions.ValidationError) as exc_info:
+        validate(messages)
+    validator = a2ui_extension.get_a2ui_validator(schema, catalog_id="regeneration-test")
+
+    regeneration = get_a2ui_partial_regeneration(response, exc_info.value, validator=validator)
+
+    assert [m.message_index for m in regeneration.invalid_messages] == [1, 2]
+    prompt = regeneration.get_prompt()
+    assert "Message 1 " in prompt and "Message 2 " in prompt
+
+    result = regeneration.splice(json.dumps([_SURFACE_UPDATE, _DATA_MODEL_UPDATE]))
+    validate(result.messages)
+    assert result.messages == [_BEGIN_RENDERING, _SURFACE_UPDATE, _DATA_MODEL_UPDATE]
+
+    with pytest.raises(ValueError):
+        regeneration.splice(json.dumps(_SURFACE_UPDATE))
+
+
+def test_whole_response_errors_are_not_partially_regenerated(validate):
+    response = "Hello!" + _DELIMITER + json.dumps(_BEGIN_RENDERING)
+    with pytest.raises(jsonschema.exceptions.ValidationError) as exc_info:
+        validate(_BEGIN_RENDERING)
+
+    assert get_a2ui_partial_regeneration(response, exc_info.value) is None
+    assert get_a2ui_partial_regeneration(response, ValueError("Delimiter not found.")) is None
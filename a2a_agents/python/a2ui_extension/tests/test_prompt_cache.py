@@ -0,0 +1,71 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from a2ui.a2ui_prompt_cache import A2uiPromptCache, build_cacheable_a2ui_prompt
+
+
+class _LocalContextCache:
+    """Stands in for a model backend's context cache."""
+
+    def __init__(self, fail_first: bool = False):
+        self.prefixes = []
+        self._fail_first = fail_first
+
+    def create(self, prefix: str) -> str:
+        if self._fail_first:
+            self._fail_first = False
+            raise RuntimeError("backend unavailable")
+        self.prefixes.append(prefix)
+        return f"cachedContents/{len(self.prefixes)}"
+
+
+def test_static_content_comes_before_the_instruction():
+    prompt = build_cacheable_a2ui_prompt('{"type": "object"}', "EXAMPLES", "Agent for http://a")
+    other = build_cacheable_a2ui_prompt('{"type": "object"}', "EXAMPLES", "Agent for http://b")
+
+    assert prompt.text.index('{"type": "object"}') < prompt.text.index("EXAMPLES") < prompt.text.index("Agent for")
+    assert prompt.static_prefix == other.static_prefix
+    assert prompt.prefix_hash == other.prefix_hash
+    assert "http://" not in prompt.static_prefix
+
+
+def test_registers_each_prefix_once_and_retries_failures():
+    backend = _LocalContextCache(fail_first=True)
+    cache = A2uiPromptCache(backend.create)
+    prompt = build_cacheable_a2ui_prompt("{}", "EXAMPLES", "Instruction")
+
+    assert cache.register(prompt) is None
+    assert cache.register(prompt) == "cachedContents/1"
+    assert cache.register(build_cacheable_a2ui_prompt("{}", "EXAMPLES", "Other")) == "cachedContents/1"
+    assert backend.prefixes == [prompt.static_prefix]
+
+
+def test_reports_hit_rates():
+    cache = A2uiPromptCache()
+    cache.register(build_cacheable_a2ui_prompt("{}", "EXAMPLES", "Instruction"))
+
+    cache.record_usage(10_000, None)
+    cache.record_usage(10_000, 9_000)
+    cache.record_usage(12_000, 9_000)
+    cache.record_usage(10_000, 9_000)
+
+    stats = cache.get_stats()
+    assert stats["requests"] == 4
+    assert stats["cache_hits"] == 3
+    assert stats["hit_rate"] == 0.75
+    assert stats["cached_token_ratio"] == 27_000 / 42_000
+    assert stats["registered_prefixes"] == 1
+
+    cache.reset_stats()
+    assert cache.get_stats()["hit_rate"] == 0.0
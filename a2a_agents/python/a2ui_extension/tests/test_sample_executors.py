@@ -0,0 +1,258 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Runs the samples' agent executors with a scripted agent in place of the LLM agent."""
+
+import asyncio
+import importlib
+import json
+import sys
+import types
+import uuid
+from pathlib import Path
+
+import pytest
+from a2a.server.agent_execution import RequestContext
+from a2a.server.context import ServerCallContext
+from a2a.types import DataPart, Message, MessageSendParams, Part, Role, TaskStatusUpdateEvent, TextPart
+from a2ui import a2ui_extension
+
+_SAMPLES_PATH = Path(__file__).parents[4] / "samples" / "agent" / "adk"
+
+# The sample modules, which have the same names in every sample.
+_SAMPLE_MODULES = ("agent", "agent_executor", "action_templates", "a2ui_examples", "a2ui_schema", "prompt_builder")
+
+_SAMPLES = {
+    "restaurant_finder": ("RestaurantAgent", "RestaurantAgentExecutor"),
+    "contact_lookup": ("ContactAgent", "ContactAgentExecutor"),
+    "adk_jira": ("JiraAgent", "JiraAgentExecutor"),
+    "adk_salesforce": ("SalesforceAgent", "SalesforceAgentExecutor"),
+}
+
+
+class _ScriptedAgent:
+    """Yields the items of the next scripted turn, like a sample agent's `stream`."""
+
+    def __init__(self, base_url: str, use_ui: bool = False):
+        # The sample's own schema, which its action templates are validated against.
+        a2ui_schema = importlib.import_module("prompt_builder").A2UI_SCHEMA
+        self.a2ui_schema_object = json.loads(a2ui_schema)
+        self.a2ui_catalog_id = a2ui_extension.get_a2ui_catalog_hash(a2ui_schema)
+        self.turns: list[list[dict]] = []
+        self.queries: list[str] = []
+
+    async def stream(self, query, session_id):
+        self.queries.append(query)
+        for item in self.turns.pop(0):
+            yield item
+
+
+class _EventRecorder:
+    def __init__(self):
+        self.events = []
+
+    async def enqueue_event(self, event):
+        self.events.append(event)
+
+
+class _SurfaceReplacingClient:
+    """Renders a final status message the way the bundled clients do: all
+    surfaces are cleared, then the message's A2UI messages are applied."""
+
+    def __init__(self):
+        self.surfaces = {}
+
+    def apply(self, message: Message) -> None:
+        self.surfaces = {}
+        for datapart in a2ui_extension.get_a2ui_dataparts(message.parts):
+            (message_type, body), = datapart.data.items()
+            surface = self.surfaces.setdefault(body["surfaceId"], {"root": None, "components": {}, "data": {}})
+            if message_type == "beginRendering":
+                surface["root"] = body["root"]
+            elif message_type == "surfaceUpdate":
+                surface["components"].update((c["id"], c["component"]) for c in body["components"])
+            elif message_type == "dataModelUpdate":
+                surface["data"][body.get("path", "/")] = body["contents"]
+
+    def get_rendered_surfaces(self) -> dict:
+        """Returns the surfaces that have a root component to render."""
+        return {
+            surface_id: surface
+            for surface_id, surface in self.surfaces.items()
+            if surface["root"] in surface["components"]
+        }
+
+
+@pytest.fixture
+def load_executor(monkeypatch):
+    def load(sample: str):
+        agent_class_name, executor_class_name = _SAMPLES[sample]
+        for name in _SAMPLE_MODULES:
+            sys.modules.pop(name, None)
+        monkeypatch.syspath_prepend(str(_SAMPLES_PATH / sample))
+        agent_module = types.ModuleType("agent")
+        setattr(agent_module, agent_class_name, _ScriptedAgent)
+        sys.modules["agent"] = agent_module
+        executor_class = getattr(importlib.import_module("agent_executor"), executor_class_name)
+        return executor_class(base_url="http://localhost")
+
+    yield load
+    for name in _SAMPLE_MODULES:
+        sys.modules.pop(name, None)
+
+
+def _run_turn(executor, parts, context_id="session", capabilities=None) -> list:
+    message = Message(
+        role=Role.user,
+        message_id=str(uuid.uuid4()),
+        context_id=context_id,
+        parts=parts,
+        metadata={a2ui_extension.A2UI_CLIENT_CAPABILITIES_KEY: capabilities} if capabilities else None,
+    )
+    context = RequestContext(
+        request=MessageSendParams(message=message),
+        context_id=context_id,
+        call_context=ServerCallContext(requested_extensions={a2ui_extension.A2UI_EXTENSION_URI}),
+    )
+    recorder = _EventRecorder()
+    asyncio.run(executor.execute(context, recorder))
+    return [event for event in recorder.events if isinstance(event, TaskStatusUpdateEvent)]
+
+
+def _list_surface(items: list[str]) -> list[dict]:
+    return [
+        {"beginRendering": {"surfaceId": "list", "root": "root"}},
+        {
+            "surfaceUpdate": {
+                "surfaceId": "list",
+                "components": [{"id": "root", "component": {"Text": {"text": {"path": "title"}}}}],
+            }
+        },
+        {
+            "dataModelUpdate": {
+                "surfaceId": "list",
+                "path": "/",
+                "contents": [
+                    {"key": "title", "valueString": "Results"},
+                    {"key": "items", "valueMap": [{"key": item, "valueString": item} for item in items]},
+                ],
+            }
+        },
+    ]
+
+
+def _final_response(text: str, messages: list[dict]) -> dict:
+    return {"is_task_complete": True, "content": f"{text}\n---a2ui_JSON---\n{json.dumps(messages)}"}
+
+
+def _text_parts(message: Message) -> list[str]:
+    return [part.root.text for part in message.parts if isinstance(part.root, TextPart)]
+
+
+@pytest.mark.parametrize("sample", sorted(_SAMPLES))
+def test_final_message_carries_the_streamed_ui_and_text_once(load_executor, sample):
+    executor = load_executor(sample)
+    messages = _list_surface(["a", "b"])
+    executor.ui_agent.turns.append(
+        [
+            {
+                "is_task_complete": False,
+                "parts": [Part(root=TextPart(text="Here you go."))]
+                + [a2ui_extension.create_a2ui_part(message) for message in messages[:2]],
+            },
+            _final_response("Here you go.", messages),
+        ]
+    )
+
+    events = _run_turn(executor, [Part(root=TextPart(text="Show the list"))])
+
+    working, final = events[0].status.message, events[-1].status.message
+    assert _text_parts(working) == []
+    assert [p.data for p in a2ui_extension.get_a2ui_dataparts(working.parts)] == messages[:2]
+    # Clients that only read the final message still get the whole UI.
+    assert _text_parts(final) == ["Here you go."]
+    assert [p.data for p in a2ui_extension.get_a2ui_dataparts(final.parts)] == messages
+    client = _SurfaceReplacingClient()
+    client.apply(final)
+    assert list(client.get_rendered_surfaces()) == ["list"]
+
+
+@pytest.mark.parametrize("sample", sorted(_SAMPLES))
+def test_sends_whole_surfaces_to_clients_that_replace_them(load_executor, sample):
+    executor = load_executor(sample)
+    executor.ui_agent.turns += [
+        [_final_response("Here you go.", _list_surface(["a", "b"]))],
+        [_final_response("Here is more.", _list_surface(["a", "b", "c"]))],
+    ]
+    client = _SurfaceReplacingClient()
+
+    client.apply(_run_turn(executor, [Part(root=TextPart(text="Show the list"))])[-1].status.message)
+    assert list(client.get_rendered_surfaces()) == ["list"]
+
+    client.apply(_run_turn(executor, [Part(root=TextPart(text="Show more"))])[-1].status.message)
+    rendered = client.get_rendered_surfaces()
+    assert list(rendered) == ["list"]
+    assert rendered["list"]["data"]["/"] == _list_surface(["a", "b", "c"])[2]["dataModelUpdate"]["contents"]
+
+
+@pytest.mark.parametrize("sample", sorted(_SAMPLES))
+def test_sends_surface_deltas_to_clients_that_opt_in(load_executor, sample):
+    executor = load_executor(sample)
+    executor.ui_agent.turns += [
+        [_final_response("Here you go.", _list_surface(["a", "b"]))],
+        [_final_response("Here is more.", _list_surface(["a", "b", "c"]))],
+    ]
+    capabilities = {a2ui_extension.SURFACE_DELTAS_KEY: True}
+
+    _run_turn(executor, [Part(root=TextPart(text="Show the list"))], capabilities=capabilities)
+    final = _run_turn(executor, [Part(root=TextPart(text="Show more"))], capabilities=capabilities)[-1].status.message
+
+    assert [p.data for p in a2ui_extension.get_a2ui_dataparts(final.parts)] == [
+        {
+            "dataModelUpdate": {
+                "surfaceId": "list",
+                "path": "/items/c",
+                "contents": [{"key": ".", "valueString": "c"}],
+            }
+        }
+    ]
+
+
+def test_renders_a_client_user_action_from_its_template(load_executor):
+    executor = load_executor("restaurant_finder")
+    # The payload the shell client sends when a "Book Now" button is clicked.
+    user_action = {
+        "userAction": {
+            "name": "book_restaurant",
+            "surfaceId": "default",
+            "sourceComponentId": "book-button",
+            "timestamp": "2025-01-01T12:00:00.000Z",
+            "context": {
+                "restaurantName": "Xi'an Famous Foods",
+                "address": "81 St Marks Pl, New York, NY 10003",
+                "imageUrl": "http://localhost/static/shrimpchowmein.jpeg",
+            },
+        }
+    }
+
+    final = _run_turn(executor, [Part(root=DataPart(data=user_action))])[-1].status.message
+
+    assert executor.ui_agent.queries == []
+    assert _text_parts(final) == ["Please fill in the details to book a table at Xi'an Famous Foods."]
+    client = _SurfaceReplacingClient()
+    client.apply(final)
+    booking_form = client.get_rendered_surfaces()["booking-form"]
+    contents = {entry["key"]: entry["valueString"] for entry in booking_form["data"]["/"]}
+    assert contents["title"] == "Book a Table at Xi'an Famous Foods"
+    assert contents["address"] == "81 St Marks Pl, New York, NY 10003"
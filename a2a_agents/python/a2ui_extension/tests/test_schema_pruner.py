@@ -0,0 +1,111 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import copy
+import json
+from pathlib import Path
+
+import jsonschema
+import pytest
+from a2ui import a2ui_extension
+from a2ui.a2ui_schema_pruner import get_a2ui_example_components, prune_a2ui_schema
+
+_SCHEMA_PATH = Path(__file__).parents[4] / "specification" / "0.8" / "json" / "server_to_client_with_standard_catalog.json"
+
+_EXAMPLES = """
+---BEGIN CARD_EXAMPLE---
+[
+  {{ "surfaceUpdate": {{ "surfaceId": "default", "components": [
+    {{ "id": "root", "component": {{ "Card": {{ "child": "name" }} }} }},
+    {{ "id": "name", "component": {{
+      "Text": {{ "text": {{ "path": "name" }} }} }} }}
+  ] }} }}
+]
+---END CARD_EXAMPLE---
+"""
+
+
+@pytest.fixture(scope="module")
+def a2ui_schema():
+    with open(_SCHEMA_PATH) as f:
+        return json.load(f)
+
+
+def _components(schema):
+    return schema["properties"]["surfaceUpdate"]["properties"]["components"]["items"]["properties"]["component"]["properties"]
+
+
+def test_finds_components_in_example_text_and_messages():
+    messages = [{"surfaceUpdate": {"components": [{"id": "a", "component": {"Button": {"child": "b"}}}]}}]
+
+    assert get_a2ui_example_components(_EXAMPLES) == {"Card", "Text"}
+    assert get_a2ui_example_components(messages) == {"Button"}
+
+
+def test_keeps_only_example_and_allowed_components(a2ui_schema):
+    original = copy.deepcopy(a2ui_schema)
+
+    pruned = prune_a2ui_schema(a2ui_schema, components=["Column"], examples=_EXAMPLES)
+
+    assert set(_components(pruned)) == {"Card", "Column", "Text"}
+    assert a2ui_schema == original
+    assert len(json.dumps(pruned)) < len(json.dumps(a2ui_schema)) / 2
+    assert set(_components(prune_a2ui_schema(a2ui_schema, components=["Text", "Carousel"]))) == {"Text"}
+    with pytest.raises(ValueError):
+        prune_a2ui_schema({"type": "object"}, components=["Text"])
+
+
+def test_prunes_whole_catalog_definitions(a2ui_schema):
+    schema = copy.deepcopy(a2ui_schema)
+    catalog_schema = schema["properties"]["surfaceUpdate"]["properties"]["components"]["items"]["properties"]["component"]
+    catalog_schema["properties"] = {"components": catalog_schema["properties"], "styles": {}}
+
+    pruned = prune_a2ui_schema(schema, examples=_EXAMPLES)
+
+    assert set(_components(pruned)["components"]) == {"Card", "Text"}
+    assert _components(pruned)["styles"] == {}
+
+
+def test_strips_descriptions_but_not_properties_named_description(a2ui_schema):
+    schema = copy.deepcopy(a2ui_schema)
+    _components(schema)["Text"]["properties"]["description"] = {"type": "string", "description": "Alt text."}
+
+    pruned = prune_a2ui_schema(schema, components=["Text"], strip_descriptions=True)
+
+    assert '"description": "' not in json.dumps(pruned)
+    assert _components(pruned)["Text"]["properties"]["description"] == {"type": "string"}
+
+
+def test_pruned_schema_still_validates_example_messages(a2ui_schema):
+    messages = [
+        {"beginRendering": {"surfaceId": "default", "root": "root"}},
+        {
+            "surfaceUpdate": {
+                "surfaceId": "default",
+                "components": [
+                    {"id": "root", "component": {"Card": {"child": "name"}}},
+                    {"id": "name", "component": {"Text": {"text": {"path": "name"}}}},
+                ],
+            }
+        },
+    ]
+    pruned = prune_a2ui_schema(a2ui_schema, examples=messages, strip_descriptions=True)
+
+    a2ui_extension.validate_a2ui_messages(messages, pruned, catalog_id="pruner-test")
+    with pytest.raises(jsonschema.exceptions.ValidationError):
+        a2ui_extension.validate_a2ui_messages(
+            [{"surfaceUpdate": {"surfaceId": "default", "components": [{"id": "x", "component": {"Divider": {}}}]}}],
+            pruned,
+            catalog_id="pruner-test",
+        )
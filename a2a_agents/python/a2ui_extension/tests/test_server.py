@@ -0,0 +1,34 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+
+import pytest
+from a2ui.a2ui_server import SHARED_STORE_ENV, run_a2a_server
+
+
+def _build_app():
+    raise AssertionError("No app should be built")
+
+
+def test_several_workers_require_shared_stores(monkeypatch):
+    monkeypatch.delenv("A2UI_STORE_SQLITE_PATH", raising=False)
+    monkeypatch.delenv("A2UI_STORE_REDIS_URL", raising=False)
+    monkeypatch.delenv(SHARED_STORE_ENV, raising=False)
+
+    with pytest.raises(ValueError, match="A2UI_STORE_SQLITE_PATH"):
+        run_a2a_server(_build_app, "localhost", 0, workers=2)
+    assert SHARED_STORE_ENV not in os.environ
+    with pytest.raises(ValueError):
+        run_a2a_server(_build_app, "localhost", 0, workers=0)
@@ -0,0 +1,94 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+
+from a2a.types import AgentCapabilities, AgentCard, AgentSkill
+from a2ui.a2ui_skill_router import SkillRouter
+
+
+def _card(name: str, skill: AgentSkill) -> AgentCard:
+    return AgentCard(
+        name=name,
+        description=f"The {name}.",
+        url="http://localhost",
+        version="1.0.0",
+        capabilities=AgentCapabilities(),
+        default_input_modes=["text"],
+        default_output_modes=["text"],
+        skills=[skill],
+    )
+
+
+_CARDS = {
+    "jira_agent": _card(
+        "Jira Agent",
+        AgentSkill(
+            id="manage_jira",
+            name="Jira Management Tool",
+            description="Helps find and manage Jira issues (e.g., search by project, assign issues).",
+            tags=["jira", "issue", "ticket", "task"],
+            examples=["Show me open tickets in PROJ", "Assign PROJ-123 to me"],
+        ),
+    ),
+    "salesforce_agent": _card(
+        "Salesforce Agent",
+        AgentSkill(
+            id="manage_salesforce",
+            name="Salesforce Management Tool",
+            description="Helps find and manage Salesforce records (Leads, Opportunities, Accounts, etc.).",
+            tags=["salesforce", "crm", "lead", "opportunity", "account"],
+            examples=["Show me my open leads", "Find account Acme"],
+        ),
+    ),
+}
+
+
+def test_routes_clear_requests():
+    router = SkillRouter.from_agent_cards(_CARDS)
+
+    assert router.route("List the open tickets assigned to me").agent_name == "jira_agent"
+    assert router.route("Which opportunities are closing this quarter?").agent_name == "salesforce_agent"
+    decision = router.route("Show me my open leads")
+    assert decision.agent_name == "salesforce_agent"
+    assert decision.scores["salesforce_agent"] > decision.scores["jira_agent"] > 0
+
+
+def test_leaves_unclear_requests_to_the_llm():
+    router = SkillRouter.from_agent_cards(_CARDS)
+
+    decision = router.route("hello there")
+    assert decision.agent_name is None
+    assert decision.best_agent_name is None
+    assert decision.confidence == 0.0
+    # Words both subagents share don't make either a clear match.
+    assert router.route("manage my records").agent_name is None
+    # Nor does a strict threshold.
+    strict = SkillRouter.from_agent_cards(_CARDS, min_confidence=0.99)
+    decision = strict.route("Show me my open leads")
+    assert decision.agent_name is None
+    assert decision.best_agent_name == "salesforce_agent"
+
+
+def test_logs_decisions(tmp_path):
+    log_path = tmp_path / "decisions.jsonl"
+    router = SkillRouter.from_agent_cards(_CARDS, log_path=str(log_path))
+
+    router.route("Create a ticket for the login bug")
+    router.route("hello")
+
+    records = [json.loads(line) for line in log_path.read_text().splitlines()]
+    assert [record["routed_to"] for record in records] == ["jira_agent", None]
+    assert records[0]["query"] == "Create a ticket for the login bug"
+    assert set(records[0]["scores"]) == {"jira_agent", "salesforce_agent"}
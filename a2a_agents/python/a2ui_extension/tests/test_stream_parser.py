@@ -0,0 +1,132 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+
+import pytest
+from a2a.types import TextPart
+from a2ui import a2ui_extension
+from a2ui.a2ui_stream_parser import A2uiStreamParser
+
+_MESSAGES = [
+    {"beginRendering": {"surfaceId": "default", "root": "root-column"}},
+    {
+        "surfaceUpdate": {
+            "surfaceId": "default",
+            "components": [
+                {
+                    "id": "title",
+                    "component": {
+                        "Text": {"text": {"literalString": 'Say "hi" {or} [not] \\ ok'}}
+                    },
+                }
+            ],
+        }
+    },
+    {
+        "dataModelUpdate": {
+            "surfaceId": "default",
+            "contents": [{"key": "title", "valueString": "Hello}]"}],
+        }
+    },
+]
+
+_RESPONSE = (
+    "Here are your results."
+    + a2ui_extension.A2UI_JSON_DELIMITER
+    + "\n```json\n"
+    + json.dumps(_MESSAGES, indent=2)
+    + "\n```"
+)
+
+
+def _feed_in_chunks(parser, text, chunk_size):
+    parts = []
+    for i in range(0, len(text), chunk_size):
+        parts.extend(parser.feed(text[i : i + chunk_size]))
+    parts.extend(parser.close())
+    return parts
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 7, 64, len(_RESPONSE)])
+def test_parses_text_and_messages_across_chunk_boundaries(chunk_size):
+    parser = A2uiStreamParser()
+
+    parts = _feed_in_chunks(parser, _RESPONSE, chunk_size)
+
+    assert isinstance(parts[0].root, TextPart)
+    assert parts[0].root.text == "Here are your results."
+    assert [a2ui_extension.get_a2ui_datapart(p).data for p in parts[1:]] == _MESSAGES
+    assert parser.messages == _MESSAGES
+    assert parser.done
+
+
+def test_emits_each_message_as_soon_as_it_closes():
+    parser = A2uiStreamParser()
+    first_message = json.dumps(_MESSAGES[0])
+
+    assert parser.feed("Hello" + a2ui_extension.A2UI_JSON_DELIMITER)[0].root.text == "Hello"
+    assert parser.feed("[" + first_message[:-1]) == []
+
+    parts = parser.feed(first_message[-1] + ", {")
+
+    assert len(parts) == 1
+    assert a2ui_extension.get_a2ui_datapart(parts[0]).data == _MESSAGES[0]
+    assert not parser.done
+
+
+def test_single_object_response():
+    parser = A2uiStreamParser()
+
+    parts = _feed_in_chunks(
+        parser, "Text" + a2ui_extension.A2UI_JSON_DELIMITER + json.dumps(_MESSAGES[0]), 5
+    )
+
+    assert len(parts) == 2
+    assert parser.messages == [_MESSAGES[0]]
+
+
+def test_empty_list_response():
+    parser = A2uiStreamParser()
+
+    parts = _feed_in_chunks(parser, "No results." + a2ui_extension.A2UI_JSON_DELIMITER + "[]", 4)
+
+    assert [p.root.text for p in parts] == ["No results."]
+    assert parser.messages == []
+    assert parser.done
+
+
+def test_text_only_response_is_flushed_on_close():
+    parser = A2uiStreamParser()
+
+    assert parser.feed("Just some ---a2ui") == []
+    parts = parser.close()
+
+    assert [p.root.text for p in parts] == ["Just some ---a2ui"]
+    assert parser.messages == []
+
+
+def test_truncated_json_raises_on_close():
+    parser = A2uiStreamParser()
+    parser.feed("Text" + a2ui_extension.A2UI_JSON_DELIMITER + json.dumps(_MESSAGES)[:-20])
+
+    with pytest.raises(ValueError):
+        parser.close()
+
+
+def test_invalid_message_raises():
+    parser = A2uiStreamParser()
+
+    with pytest.raises(json.JSONDecodeError):
+        parser.feed("Text" + a2ui_extension.A2UI_JSON_DELIMITER + '[{"beginRendering": oops}]')
@@ -0,0 +1,162 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+
+import pytest
+from a2ui.a2ui_tool_cache import ToolResultCache
+
+
+class _MockConnector:
+    """Counts calls per entity, and can hold calls until released."""
+
+    def __init__(self):
+        self.calls = []
+        self.release = asyncio.Event()
+        self.release.set()
+
+    def list(self, entity, query=""):
+        async def call():
+            self.calls.append((entity, query))
+            result = [f"{entity}:{query}:{len(self.calls)}"]
+            await self.release.wait()
+            return result
+
+        return call
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_caches_results_until_they_expire():
+    clock = _Clock()
+    cache = ToolResultCache(ttl_seconds=10, clock=clock)
+    connector = _MockConnector()
+
+    async def run():
+        first = await cache.get_or_call("Issues", ("open", "alex"), connector.list("Issues", "open"))
+        assert await cache.get_or_call("Issues", ("open", "alex"), connector.list("Issues", "open")) == first
+        # Other users and filters are cached separately.
+        await cache.get_or_call("Issues", ("open", "sam"), connector.list("Issues", "open"))
+        await cache.get_or_call("Issues", ("done", "alex"), connector.list("Issues", "done"))
+        clock.now = 10
+        assert await cache.get_or_call("Issues", ("open", "alex"), connector.list("Issues", "open")) != first
+
+    asyncio.run(run())
+
+    assert len(connector.calls) == 4
+    assert cache.get_stats()["hits"] == 1
+    assert cache.get_stats()["misses"] == 4
+
+
+def test_coalesces_concurrent_calls():
+    cache = ToolResultCache()
+    connector = _MockConnector()
+
+    async def run():
+        connector.release.clear()
+        calls = [
+            asyncio.ensure_future(cache.get_or_call("Issues", "open", connector.list("Issues", "open")))
+            for _ in range(3)
+        ]
+        await asyncio.sleep(0)
+        connector.release.set()
+        return await asyncio.gather(*calls)
+
+    results = asyncio.run(run())
+
+    assert len(connector.calls) == 1
+    assert results[0] == results[1] == results[2]
+    assert cache.get_stats()["coalesced"] == 2
+
+
+def test_invalidates_a_group():
+    cache = ToolResultCache()
+    connector = _MockConnector()
+
+    async def run():
+        await cache.get_or_call("Issues", "open", connector.list("Issues", "open"))
+        await cache.get_or_call("Users", "all", connector.list("Users"))
+        assert cache.invalidate("Issues") == 1
+        await cache.get_or_call("Issues", "open", connector.list("Issues", "open"))
+        await cache.get_or_call("Users", "all", connector.list("Users"))
+
+    asyncio.run(run())
+
+    assert connector.calls == [("Issues", "open"), ("Users", ""), ("Issues", "open")]
+
+
+def test_does_not_cache_reads_that_overlap_an_invalidation():
+    cache = ToolResultCache()
+    connector = _MockConnector()
+
+    async def run():
+        connector.release.clear()
+        stale = asyncio.ensure_future(cache.get_or_call("Issues", "open", connector.list("Issues", "open")))
+        await asyncio.sleep(0)
+        cache.invalidate("Issues")
+        # Doesn't join the read that started before the write.
+        fresh = asyncio.ensure_future(cache.get_or_call("Issues", "open", connector.list("Issues", "open")))
+        await asyncio.sleep(0)
+        connector.release.set()
+        assert await stale != await fresh
+        await cache.get_or_call("Issues", "open", connector.list("Issues", "open"))
+
+    asyncio.run(run())
+
+    assert len(connector.calls) == 2
+    assert len(cache) == 1
+
+
+def test_does_not_cache_failures():
+    cache = ToolResultCache(max_entries=1)
+    calls = []
+
+    async def fail():
+        calls.append("fail")
+        raise ConnectionError()
+
+    async def error():
+        calls.append("error")
+        return {"error": "timeout"}
+
+    async def run():
+        for _ in range(2):
+            with pytest.raises(ConnectionError):
+                await cache.get_or_call("Issues", "fail", fail)
+            await cache.get_or_call("Issues", "error", error, cache_if=lambda result: "error" not in result)
+
+    asyncio.run(run())
+
+    assert calls == ["fail", "error", "fail", "error"]
+    assert len(cache) == 0
+
+
+def test_evicts_least_recently_used_results():
+    cache = ToolResultCache(max_entries=2)
+    connector = _MockConnector()
+
+    async def run():
+        for query in ("a", "b", "a", "c", "a", "b"):
+            await cache.get_or_call("Issues", query, connector.list("Issues", query))
+
+    asyncio.run(run())
+
+    assert [query for _, query in connector.calls] == ["a", "b", "c", "b"]
+    assert len(cache) == 2
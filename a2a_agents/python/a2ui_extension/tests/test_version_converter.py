@@ -0,0 +1,183 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+from pathlib import Path
+
+import jsonschema
+import pytest
+from a2ui import a2ui_extension
+from a2ui.a2ui_version_converter import (
+    V09_STANDARD_CATALOG_ID,
+    convert_v08_to_v09,
+    convert_v09_to_v08,
+    iter_jsonl,
+    to_jsonl,
+)
+
+_SPEC_ROOT = Path(__file__).parents[4] / "specification"
+
+_V08_MESSAGES = [
+    {"beginRendering": {"surfaceId": "booking", "root": "root", "styles": {"primaryColor": "#FF0000"}}},
+    {
+        "surfaceUpdate": {
+            "surfaceId": "booking",
+            "components": [
+                {"id": "root", "component": {"Column": {"children": {"explicitList": ["title", "list", "size", "submit"]}}}},
+                {"id": "title", "component": {"Text": {"usageHint": "h2", "text": {"literalString": "Book a table"}}}},
+                {
+                    "id": "list",
+                    "weight": 1,
+                    "component": {
+                        "List": {"children": {"template": {"componentId": "item", "dataBinding": "/items"}}}
+                    },
+                },
+                {"id": "item", "component": {"Text": {"text": {"path": "name"}}}},
+                {"id": "size", "component": {"Slider": {"value": {"path": "/partySize"}, "minValue": 1, "maxValue": 10}}},
+                {"id": "submit-text", "component": {"Text": {"text": {"literalString": "Submit"}}}},
+                {
+                    "id": "submit",
+                    "component": {
+                        "Button": {
+                            "child": "submit-text",
+                            "primary": True,
+                            "action": {
+                                "name": "submit_booking",
+                                "context": [
+                                    {"key": "partySize", "value": {"path": "/partySize"}},
+                                    {"key": "restaurantName", "value": {"literalString": "The Fancy Place"}},
+                                ],
+                            },
+                        }
+                    },
+                },
+            ],
+        }
+    },
+    {
+        "dataModelUpdate": {
+            "surfaceId": "booking",
+            "path": "/",
+            "contents": [
+                {"key": "partySize", "valueNumber": 2},
+                {"key": "items", "valueMap": [{"key": "item1", "valueMap": [{"key": "name", "valueString": "Pizza"}]}]},
+            ],
+        }
+    },
+    {"deleteSurface": {"surfaceId": "booking"}},
+]
+
+
+@pytest.fixture(scope="module")
+def v09_validator():
+    # Cross-file $refs need the referencing package, which jsonschema 4.18+ depends on.
+    referencing = pytest.importorskip("referencing")
+    schemas = []
+    for name in ("server_to_client.json", "common_types.json", "standard_catalog_definition.json"):
+        with open(_SPEC_ROOT / "0.9/json" / name) as f:
+            schemas.append(json.load(f))
+    registry = referencing.Registry().with_resources(
+        (schema["$id"], referencing.Resource.from_contents(schema)) for schema in schemas
+    )
+    return jsonschema.Draft202012Validator(schemas[0], registry=registry)
+
+
+def test_v08_to_v09_is_valid_v09(v09_validator):
+    for message in convert_v08_to_v09(_V08_MESSAGES):
+        v09_validator.validate(message)
+
+
+def test_v08_to_v09():
+    messages = list(convert_v08_to_v09(_V08_MESSAGES))
+
+    assert messages[0] == {
+        "createSurface": {"surfaceId": "booking", "catalogId": V09_STANDARD_CATALOG_ID}
+    }
+    components = {c["id"]: c for c in messages[1]["updateComponents"]["components"]}
+    assert components["title"] == {"id": "title", "component": "Text", "usageHint": "h2", "text": "Book a table"}
+    assert components["list"]["children"] == {"componentId": "item", "path": "/items"}
+    assert components["list"]["weight"] == 1
+    assert components["size"] == {"id": "size", "component": "Slider", "value": {"path": "/partySize"}, "min": 1, "max": 10}
+    assert components["submit"]["action"] == {
+        "name": "submit_booking",
+        "context": {"partySize": {"path": "/partySize"}, "restaurantName": "The Fancy Place"},
+    }
+    assert messages[2] == {
+        "updateDataModel": {
+            "surfaceId": "booking",
+            "path": "/",
+            "op": "replace",
+            "value": {"partySize": 2, "items": {"item1": {"name": "Pizza"}}},
+        }
+    }
+    assert messages[3] == {"deleteSurface": {"surfaceId": "booking"}}
+
+
+def test_v08_to_v09_wraps_non_root_ids_and_creates_surface_first():
+    messages = list(
+        convert_v08_to_v09(
+            [
+                {"dataModelUpdate": {"surfaceId": "s", "path": "title", "contents": [{"key": ".", "valueString": "Hi"}]}},
+                {"beginRendering": {"surfaceId": "s", "root": "main-column"}},
+            ],
+            catalog_id="custom-catalog",
+        )
+    )
+
+    assert messages == [
+        {"createSurface": {"surfaceId": "s", "catalogId": "custom-catalog"}},
+        {"updateDataModel": {"surfaceId": "s", "path": "/title", "op": "replace", "value": "Hi"}},
+        {
+            "updateComponents": {
+                "surfaceId": "s",
+                "components": [{"id": "root", "component": "Column", "children": ["main-column"]}],
+            }
+        },
+    ]
+
+
+def test_round_trip_v08_to_v09_to_v08():
+    round_tripped = list(convert_v09_to_v08(convert_v08_to_v09(_V08_MESSAGES)))
+
+    assert round_tripped[0] == {"beginRendering": {"surfaceId": "booking", "root": "root"}}
+    assert round_tripped[1:] == _V08_MESSAGES[1:]
+
+
+def test_converts_lazily():
+    def messages():
+        yield _V08_MESSAGES[0]
+        raise AssertionError("Consumed more input than needed")
+
+    assert next(convert_v08_to_v09(messages()))["createSurface"]["surfaceId"] == "booking"
+
+
+def test_v09_example_converts_to_valid_v08():
+    with open(_SPEC_ROOT / "0.9/json/contact_form_example.jsonl") as f:
+        messages = list(convert_v09_to_v08(iter_jsonl(f)))
+    with open(_SPEC_ROOT / "0.8/json/server_to_client_with_standard_catalog.json") as f:
+        v08_schema = json.load(f)
+
+    a2ui_extension.validate_a2ui_messages(messages, v08_schema, catalog_id="v08-standard")
+    assert messages[0] == {"beginRendering": {"surfaceId": "contact_form_1", "root": "root"}}
+    assert messages[2]["dataModelUpdate"]["contents"][0] == {
+        "key": "firstName",
+        "valueString": "John",
+    }
+
+
+def test_jsonl_round_trip():
+    lines = list(to_jsonl(_V08_MESSAGES))
+
+    assert all(line.endswith("\n") for line in lines)
+    assert list(iter_jsonl(lines + ["\n"])) == _V08_MESSAGES
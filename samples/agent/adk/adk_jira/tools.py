@@ -17,9 +17,11 @@ import os
 from typing import Any
 
 logger = logging.getLogger(__name__)
+from a2ui.a2ui_adk_toolsets import CachingConnectorToolset
+from a2ui.a2ui_tool_cache import ToolResultCache
 from google.adk.tools.application_integration_tool.application_integration_toolset import ApplicationIntegrationToolset
 
-connector_tool = ApplicationIntegrationToolset(
+integration_toolset = ApplicationIntegrationToolset(
     project=os.environ.get("GOOGLE_CLOUD_PROJECT"), # Dynamically get project ID
     location="us-central1", #TODO: replace with location of the connection
     connection="jira-conn", #TODO: replace with connection name
@@ -32,6 +34,13 @@ connector_tool = ApplicationIntegrationToolset(
     tool_instructions="A tool for interacting with Jira. You can fetch user data, search and create issues, and view and create comments"
 )
 
+# LIST and GET results are reused per (entity, arguments, user) for a while,
+# and CREATE/UPDATE calls drop the entity's cached results.
+connector_cache = ToolResultCache(
+    ttl_seconds=float(os.environ.get("CONNECTOR_CACHE_TTL_SECONDS", "30")),
+)
+connector_tool = CachingConnectorToolset(integration_toolset, connector_cache)
+
 
 # # Mock data for demonstration
 # MOCK_ISSUES = [
@@ -18,14 +18,17 @@ import os
 import click
 from a2a.server.apps import A2AStarletteApplication
 from a2a.server.request_handlers import DefaultRequestHandler
-from a2a.server.tasks import InMemoryTaskStore
 from a2a.types import AgentCapabilities, AgentCard, AgentSkill
+from a2ui.a2ui_bounded_store import BoundedStoreConfig, BoundedTaskStore
 from a2ui.a2ui_extension import get_a2ui_agent_extension
+from a2ui.a2ui_instrumentation import A2uiMetricsApp, configure_a2ui_tracing, get_latency_histograms
+from a2ui.a2ui_server import run_a2a_server
 from agent import SalesforceAgent
 from agent_executor import SalesforceAgentExecutor
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from starlette.staticfiles import StaticFiles
+from tools import connector_cache
 
 load_dotenv()
 
@@ -40,7 +43,8 @@ class MissingAPIKeyError(Exception):
 @click.command()
 @click.option("--host", default="localhost")
 @click.option("--port", default=10003)
-def main(host, port):
+@click.option("--workers", default=1, type=int, help="Worker processes; requires A2UI_STORE_SQLITE_PATH or A2UI_STORE_REDIS_URL.")
+def main(host, port, workers):
     try:
         if not os.getenv("GOOGLE_GENAI_USE_VERTEXAI") == "TRUE":
             if not os.getenv("GEMINI_API_KEY"):
@@ -77,30 +81,38 @@ def main(host, port):
             skills=[skill],
         )
 
-        agent_executor = SalesforceAgentExecutor(base_url=base_url)
-
-        request_handler = DefaultRequestHandler(
-            agent_executor=agent_executor,
-            task_store=InMemoryTaskStore(),
-        )
-        server = A2AStarletteApplication(
-            agent_card=agent_card, http_handler=request_handler
-        )
-        import uvicorn
-
-        app = server.build()
-
-        app.add_middleware(
-            CORSMiddleware,
-            allow_origin_regex=".*",
-            allow_credentials=True,
-            allow_methods=["*"],
-            allow_headers=["*"],
-        )
-
-        # app.mount("/static", StaticFiles(directory="images"), name="static") # No images yet
-
-        uvicorn.run(app, host=host, port=port)
+        def build_app():
+            # Each worker builds its own app, stores and clients.
+            configure_a2ui_tracing("adk_salesforce")
+            agent_executor = SalesforceAgentExecutor(base_url=base_url)
+
+            task_store = BoundedTaskStore(BoundedStoreConfig.from_env())
+            get_latency_histograms().add_gauge_source("a2a_tasks", task_store.get_stats)
+            get_latency_histograms().add_gauge_source("connector_results", connector_cache.get_stats)
+            request_handler = DefaultRequestHandler(
+                agent_executor=agent_executor,
+                task_store=task_store,
+            )
+            server = A2AStarletteApplication(
+                agent_card=agent_card, http_handler=request_handler
+            )
+
+            app = server.build()
+
+            app.add_middleware(
+                CORSMiddleware,
+                allow_origin_regex=".*",
+                allow_credentials=True,
+                allow_methods=["*"],
+                allow_headers=["*"],
+            )
+
+            # app.mount("/static", StaticFiles(directory="images"), name="static") # No images yet
+            # Per-stage latency histograms of this worker, in the Prometheus format.
+            app.add_route("/metrics", A2uiMetricsApp())
+            return app
+
+        run_a2a_server(build_app, host, port, workers)
     except MissingAPIKeyError as e:
         logger.error(f"Error: {e}")
         exit(1)
@@ -15,19 +15,34 @@
 import json
 import logging
 import os
+import time
 from collections.abc import AsyncIterable
 from typing import Any
 
 import jsonschema
+from a2a.types import Part
+from a2ui.a2ui_adk_services import BoundedArtifactService, BoundedMemoryService, BoundedSessionService
+from a2ui.a2ui_bounded_store import BoundedStoreConfig
+from a2ui.a2ui_extension import (
+    get_a2ui_catalog_hash,
+    get_a2ui_datapart,
+    get_a2ui_validator,
+    validate_a2ui_messages,
+)
+from a2ui.a2ui_instrumentation import STAGE_RETRY, A2uiLatencyCallbacks, record_a2ui_stage
+from a2ui.a2ui_json_repair import get_a2ui_repair_counters, repair_a2ui_response
+from a2ui.a2ui_partial_regeneration import get_a2ui_partial_regeneration
+from a2ui.a2ui_prompt_cache import A2uiPromptCache
+from a2ui.a2ui_stream_parser import A2uiStreamParser
 from a2ui_examples import SALESFORCE_UI_EXAMPLES
 from a2ui_schema import A2UI_SCHEMA
 from google.adk.agents.llm_agent import LlmAgent
-from google.adk.artifacts import InMemoryArtifactService
-from google.adk.memory.in_memory_memory_service import InMemoryMemoryService
+from google.adk.agents.run_config import RunConfig, StreamingMode
+from google.adk.events.event import Event
 from google.adk.runners import Runner
-from google.adk.sessions import InMemorySessionService
 from google.genai import types
 from prompt_builder import (
+    get_cacheable_ui_prompt,
     get_text_prompt,
     get_ui_prompt,
 )
@@ -47,19 +62,31 @@ class SalesforceAgent:
     def __init__(self, base_url: str, use_ui: bool = False):
         self.base_url = base_url
         self.use_ui = use_ui
+        # Reports how much of the prompt the model provider served from its cache.
+        self.prompt_cache = A2uiPromptCache()
+        # Times the LLM and tool calls for the /metrics endpoint.
+        self.latency_callbacks = A2uiLatencyCallbacks()
         self._agent = self._build_agent(use_ui)
+        # The UI agent streams the LLM output so A2UI messages can be forwarded
+        # to the client as soon as each one is complete.
+        self._run_config = RunConfig(
+            streaming_mode=StreamingMode.SSE if use_ui else StreamingMode.NONE
+        )
         self._user_id = "remote_agent"
+        # Evicts idle sessions; set A2UI_STORE_SQLITE_PATH to keep them across restarts.
+        store_config = BoundedStoreConfig.from_env()
         self._runner = Runner(
             app_name=self._agent.name,
             agent=self._agent,
-            artifact_service=InMemoryArtifactService(),
-            session_service=InMemorySessionService(),
-            memory_service=InMemoryMemoryService(),
+            artifact_service=BoundedArtifactService(store_config),
+            session_service=BoundedSessionService(store_config),
+            memory_service=BoundedMemoryService(store_config),
         )
 
         try:
-            single_message_schema = json.loads(A2UI_SCHEMA)
-            self.a2ui_schema_object = {"type": "array", "items": single_message_schema}
+            self.a2ui_schema_object = json.loads(A2UI_SCHEMA)
+            self.a2ui_catalog_id = get_a2ui_catalog_hash(A2UI_SCHEMA)
+            get_a2ui_validator(self.a2ui_schema_object, catalog_id=self.a2ui_catalog_id)
         except json.JSONDecodeError as e:
             logger.error(f"CRITICAL: Failed to parse A2UI_SCHEMA: {e}")
             self.a2ui_schema_object = None
@@ -68,7 +95,12 @@ class SalesforceAgent:
         return "Processing Salesforce request..."
 
     def _build_agent(self, use_ui: bool) -> LlmAgent:
-        if use_ui:
+        if use_ui and os.getenv("A2UI_CACHEABLE_PROMPT", "false").lower() == "true":
+            # Put the static schema and examples first so the provider can cache them.
+            prompt = get_cacheable_ui_prompt(self.base_url, SALESFORCE_UI_EXAMPLES)
+            self.prompt_cache.register(prompt)
+            instruction = prompt.text
+        elif use_ui:
             instruction = get_ui_prompt(self.base_url, SALESFORCE_UI_EXAMPLES)
         else:
             instruction = get_text_prompt()
@@ -78,8 +110,36 @@ class SalesforceAgent:
             name="salesforce_agent",
             description="An agent that manages Salesforce entities.",
             instruction=instruction,
-            tools=[connector_tool]
+            tools=[connector_tool],
+            before_model_callback=self.latency_callbacks.before_model,
+            after_model_callback=self.latency_callbacks.after_model,
+            before_tool_callback=self.latency_callbacks.before_tool,
+            after_tool_callback=self.latency_callbacks.after_tool,
+        )
+
+    def _validate_a2ui_messages(self, messages: list[Any]) -> None:
+        """Validates a list of A2UI messages against the cached schema validator."""
+        validate_a2ui_messages(
+            messages, self.a2ui_schema_object, catalog_id=self.a2ui_catalog_id
+        )
+
+    def _feed_stream_parser(
+        self, stream_parser: A2uiStreamParser, event: Event
+    ) -> list[Part]:
+        """Feeds a partial LLM event to the stream parser.
+
+        Returns:
+            The newly completed text and A2UI parts. Each A2UI message is
+            validated before it is returned.
+        """
+        chunk = "".join(
+            p.text for p in event.content.parts if p.text and not p.thought
         )
+        parts = stream_parser.feed(chunk)
+        for part in parts:
+            if a2ui_datapart := get_a2ui_datapart(part):
+                self._validate_a2ui_messages([a2ui_datapart.data])
+        return parts
 
     async def stream(self, query, session_id) -> AsyncIterable[dict[str, Any]]:
         session_state = {"base_url": self.base_url}
@@ -100,6 +160,8 @@ class SalesforceAgent:
         max_retries = 1
         attempt = 0
         current_query_text = query
+        # Set when only one message of the last A2UI response has to be regenerated.
+        regeneration = None
 
         if self.use_ui and self.a2ui_schema_object is None:
             yield {
@@ -110,17 +172,47 @@ class SalesforceAgent:
 
         while attempt <= max_retries:
             attempt += 1
+            attempt_start = time.perf_counter()
             current_message = types.Content(
                 role="user", parts=[types.Part.from_text(text=current_query_text)]
             )
             final_response_content = None
+            # A single regenerated message has no delimiter to stream from.
+            stream_parser = (
+                A2uiStreamParser() if self.use_ui and regeneration is None else None
+            )
 
             async for event in self._runner.run_async(
                 user_id=self._user_id,
                 session_id=session.id,
                 new_message=current_message,
+                run_config=self._run_config,
             ):
+                if event.partial:
+                    # Forward text and A2UI messages as soon as they are complete so
+                    # the client can start rendering before the LLM has finished.
+                    if stream_parser and event.content and event.content.parts:
+                        try:
+                            streamed_parts = self._feed_stream_parser(stream_parser, event)
+                        except (ValueError, jsonschema.exceptions.ValidationError) as e:
+                            # The full response is still validated (and retried) below.
+                            logger.warning(
+                                f"--- SalesforceAgent.stream: Stopped streaming A2UI messages: {e} ---"
+                            )
+                            stream_parser = None
+                        else:
+                            if streamed_parts:
+                                yield {"is_task_complete": False, "parts": streamed_parts}
+                    continue
+                if event.usage_metadata:
+                    self.prompt_cache.record_usage(
+                        event.usage_metadata.prompt_token_count,
+                        event.usage_metadata.cached_content_token_count,
+                    )
                 if event.is_final_response():
+                    logger.info(
+                        f"--- SalesforceAgent.stream: Prompt cache stats: {self.prompt_cache.get_stats()} ---"
+                    )
                     if event.content and event.content.parts and event.content.parts[0].text:
                         final_response_content = "\n".join([p.text for p in event.content.parts if p.text])
                     break
@@ -132,6 +224,8 @@ class SalesforceAgent:
 
             if final_response_content is None:
                 if attempt <= max_retries:
+                    # Records the time spent on the attempt that is discarded.
+                    record_a2ui_stage(STAGE_RETRY, time.perf_counter() - attempt_start, attempt=attempt)
                     current_query_text = f"No response. Retry: '{query}'"
                     continue
                 else:
@@ -142,21 +236,38 @@ class SalesforceAgent:
 
             if self.use_ui:
                 try:
-                    if "---a2ui_JSON---" not in final_response_content:
-                        raise ValueError("Delimiter not found.")
-
-                    _, json_string = final_response_content.split("---a2ui_JSON---", 1)
-                    json_string_cleaned = json_string.strip().lstrip("```json").rstrip("```").strip()
-                    
-                    if not json_string.strip() or json_string_cleaned == "[]":
-                        is_valid = True
+                    if regeneration is not None:
+                        # Splice the regenerated messages into the kept ones.
+                        repair_result = regeneration.splice(final_response_content)
+                        self._validate_a2ui_messages(repair_result.messages)
+                        final_response_content = repair_result.to_response()
                     else:
-                        parsed_json_data = json.loads(json_string_cleaned)
-                        jsonschema.validate(instance=parsed_json_data, schema=self.a2ui_schema_object)
-                        is_valid = True
+                        repair_result = repair_a2ui_response(
+                            final_response_content,
+                            validate=self._validate_a2ui_messages,
+                            allow_empty=True,
+                        )
+                        if repair_result.repairs:
+                            # Send the repaired response so the executor can parse it.
+                            final_response_content = repair_result.to_response()
+                            logger.info(f"A2UI repair counters: {get_a2ui_repair_counters()}")
+                    is_valid = True
 
                 except (ValueError, json.JSONDecodeError, jsonschema.exceptions.ValidationError) as e:
                     error_message = f"Validation failed: {e}."
+                    # Keep the valid messages and regenerate all the invalid ones in
+                    # one request, unless that is what just failed.
+                    regeneration = (
+                        get_a2ui_partial_regeneration(
+                            final_response_content,
+                            e,
+                            validator=get_a2ui_validator(
+                                self.a2ui_schema_object, catalog_id=self.a2ui_catalog_id
+                            ),
+                        )
+                        if regeneration is None
+                        else None
+                    )
 
             else:
                 is_valid = True
@@ -169,11 +280,16 @@ class SalesforceAgent:
                 return
 
             if attempt <= max_retries:
-                current_query_text = (
-                    f"Invalid response. {error_message} "
-                    "Generate valid A2UI JSON list split by '---a2ui_JSON---'. "
-                    f"Retry: '{query}'"
-                )
+                # Records the time spent on the attempt that is discarded.
+                record_a2ui_stage(STAGE_RETRY, time.perf_counter() - attempt_start, attempt=attempt)
+                if regeneration is not None:
+                    current_query_text = regeneration.get_prompt()
+                else:
+                    current_query_text = (
+                        f"Invalid response. {error_message} "
+                        "Generate valid A2UI JSON list split by '---a2ui_JSON---'. "
+                        f"Retry: '{query}'"
+                    )
 
         yield {
             "is_task_complete": True,
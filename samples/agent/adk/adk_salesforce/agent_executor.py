@@ -33,7 +33,27 @@ from a2a.utils import (
 )
 from a2a.utils.errors import ServerError
 from agent import SalesforceAgent
-from a2ui.a2ui_extension import create_a2ui_part, try_activate_a2ui_extension
+from a2ui.a2ui_bounded_store import BoundedStoreConfig
+from a2ui.a2ui_extension import (
+    SurfaceStateStore,
+    create_a2ui_part,
+    encode_a2ui_part,
+    get_a2ui_client_capabilities,
+    is_a2ui_part,
+    select_a2ui_encoding,
+    supports_a2ui_surface_deltas,
+    try_activate_a2ui_extension,
+)
+from a2ui.a2ui_instrumentation import (
+    STAGE_DELIMITER_SPLIT,
+    STAGE_EVENT_ENQUEUE,
+    STAGE_JSON_PARSE,
+    STAGE_PART_CREATION,
+    STAGE_TURN,
+    a2ui_request_labels,
+    a2ui_span,
+    set_a2ui_request_action,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -44,17 +64,34 @@ class SalesforceAgentExecutor(AgentExecutor):
     def __init__(self, base_url: str):
         self.ui_agent = SalesforceAgent(base_url=base_url, use_ui=True)
         self.text_agent = SalesforceAgent(base_url=base_url, use_ui=False)
+        # Tracks what each session's client has rendered, so later turns only
+        # send the components and data that changed, to clients that opt in.
+        # Kept in the store configured in the environment, so all workers share it.
+        self.surface_state_store = SurfaceStateStore(config=BoundedStoreConfig.from_env())
 
     async def execute(
         self,
         context: RequestContext,
         event_queue: EventQueue,
+    ) -> None:
+        with a2ui_request_labels("salesforce_agent"), a2ui_span(STAGE_TURN):
+            await self._execute(context, event_queue)
+
+    async def _execute(
+        self,
+        context: RequestContext,
+        event_queue: EventQueue,
     ) -> None:
         query = ""
         ui_event_part = None
         action = None
 
         use_ui = try_activate_a2ui_extension(context)
+        # Use the most compact encoding the client supports for A2UI parts.
+        client_capabilities = get_a2ui_client_capabilities(context)
+        a2ui_encoding = select_a2ui_encoding(client_capabilities)
+        # Only clients that keep their surfaces between responses get deltas.
+        send_surface_deltas = supports_a2ui_surface_deltas(client_capabilities)
 
         if use_ui:
             agent = self.ui_agent
@@ -69,6 +106,7 @@ class SalesforceAgentExecutor(AgentExecutor):
 
         if ui_event_part:
             action = ui_event_part.get("name")
+            set_a2ui_request_action(action)
             ctx = ui_event_part.get("context", {})
 
             if action == "view_record":
@@ -95,10 +133,27 @@ class SalesforceAgentExecutor(AgentExecutor):
         async for item in agent.stream(query, task.context_id):
             is_task_complete = item["is_task_complete"]
             if not is_task_complete:
-                await updater.update_status(
-                    TaskState.working,
-                    new_agent_text_message(item["updates"], task.context_id, task.id),
-                )
+                if "parts" in item:
+                    # A2UI messages streamed before the LLM finished, so the
+                    # client can start rendering. The final message still
+                    # carries the whole UI, for clients that only read it, and
+                    # the text, which is therefore not streamed.
+                    streamed_parts = [
+                        encode_a2ui_part(p, a2ui_encoding)
+                        for p in item["parts"]
+                        if is_a2ui_part(p)
+                    ]
+                    if not streamed_parts:
+                        continue
+                    working_message = new_agent_parts_message(
+                        streamed_parts, task.context_id, task.id
+                    )
+                else:
+                    working_message = new_agent_text_message(
+                        item["updates"], task.context_id, task.id
+                    )
+                with a2ui_span(STAGE_EVENT_ENQUEUE):
+                    await updater.update_status(TaskState.working, working_message)
                 continue
 
             final_state = TaskState.input_required
@@ -106,7 +161,8 @@ class SalesforceAgentExecutor(AgentExecutor):
             content = item["content"]
             final_parts = []
             if "---a2ui_JSON---" in content:
-                text_content, json_string = content.split("---a2ui_JSON---", 1)
+                with a2ui_span(STAGE_DELIMITER_SPLIT):
+                    text_content, json_string = content.split("---a2ui_JSON---", 1)
 
                 if text_content.strip():
                     final_parts.append(Part(root=TextPart(text=text_content.strip())))
@@ -120,12 +176,15 @@ class SalesforceAgentExecutor(AgentExecutor):
                         if not json_string_cleaned or json_string_cleaned == "[]":
                             pass
                         else:
-                            json_data = json.loads(json_string_cleaned)
-                            if isinstance(json_data, list):
-                                for message in json_data:
-                                    final_parts.append(create_a2ui_part(message))
-                            else:
-                                final_parts.append(create_a2ui_part(json_data))
+                            with a2ui_span(STAGE_JSON_PARSE):
+                                json_data = json.loads(json_string_cleaned)
+                            messages = json_data if isinstance(json_data, list) else [json_data]
+                            if send_surface_deltas:
+                                # Only send what changed since the client last rendered each surface.
+                                messages = self.surface_state_store.diff(task.context_id, messages)
+                            with a2ui_span(STAGE_PART_CREATION):
+                                for message in messages:
+                                    final_parts.append(create_a2ui_part(message, a2ui_encoding))
  
                     except json.JSONDecodeError as e:
                         logger.error(f"Failed to parse UI JSON: {e}")
@@ -136,11 +195,12 @@ class SalesforceAgentExecutor(AgentExecutor):
             if not final_parts or all(isinstance(p.root, TextPart) and not p.root.text for p in final_parts):
                  final_parts = [Part(root=TextPart(text="OK."))]
 
-            await updater.update_status(
-                final_state,
-                new_agent_parts_message(final_parts, task.context_id, task.id),
-                final=(final_state == TaskState.completed),
-            )
+            with a2ui_span(STAGE_EVENT_ENQUEUE):
+                await updater.update_status(
+                    final_state,
+                    new_agent_parts_message(final_parts, task.context_id, task.id),
+                    final=(final_state == TaskState.completed),
+                )
             break
 
     async def cancel(
@@ -12,18 +12,31 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import json
+
+from a2ui.a2ui_prompt_cache import CacheablePrompt, build_cacheable_a2ui_prompt
+from a2ui.a2ui_schema_pruner import prune_a2ui_schema
 from a2ui_examples import SALESFORCE_UI_EXAMPLES
 from a2ui_schema import A2UI_SCHEMA
 
-def get_ui_prompt(base_url: str, examples: str) -> str:
-    return f"""
-    You are a helpful Salesforce assistant. Your final output MUST be a a2ui UI JSON response.
+def get_prompt_a2ui_schema(examples: str) -> str:
+    """
+    Returns the A2UI schema for the prompt, with only the components the examples use.
+
+    Responses are still validated against the full `A2UI_SCHEMA`.
+    """
+    return json.dumps(prune_a2ui_schema(json.loads(A2UI_SCHEMA), examples=examples))
+
+
+def _get_ui_rules(schema_location: str = "below") -> str:
+    """Returns the UI response rules, which don't depend on the deployment."""
+    return f"""    You are a helpful Salesforce assistant. Your final output MUST be a a2ui UI JSON response.
 
     To generate the response, you MUST follow these rules:
     1.  Your response MUST be in two parts, separated by the delimiter: `---a2ui_JSON---`.
     2.  The first part is your conversational text response.
     3.  The second part is a single, raw JSON object which is a list of A2UI messages.
-    4.  The JSON part MUST validate against the A2UI JSON SCHEMA provided below.
+    4.  The JSON part MUST validate against the A2UI JSON SCHEMA provided {schema_location}.
 
     --- UI TEMPLATE RULES ---
     
@@ -52,15 +65,44 @@ def get_ui_prompt(base_url: str, examples: str) -> str:
         d.  Populate other fields (e.g. `name`, `amount`) if the user provided them.
 
     5.  **For other actions (Edit, Delete):**
-        a.  Respond with a confirmation message (text) and potentially a success card using a similar structure to `GENERIC_DETAIL_EXAMPLE` but with a success message.
+        a.  Respond with a confirmation message (text) and potentially a success card using a similar structure to `GENERIC_DETAIL_EXAMPLE` but with a success message."""
+
+
+def get_ui_prompt(base_url: str, examples: str) -> str:
+    return f"""
+{_get_ui_rules()}
 
     {examples}
 
     ---BEGIN A2UI JSON SCHEMA---
-    {A2UI_SCHEMA}
+    {get_prompt_a2ui_schema(examples)}
     ---END A2UI JSON SCHEMA---
     """
 
+def get_cacheable_ui_prompt(
+    base_url: str, examples: str, instruction: str = ""
+) -> CacheablePrompt:
+    """
+    Constructs the UI prompt ordered for provider-side context caching.
+
+    The schema and examples come first, as a prefix that is the same for every
+    deployment, followed by the instruction and rules.
+
+    Args:
+        base_url: The base URL for resolving static assets like logos.
+        examples: A string containing the specific UI examples for the agent's task.
+        instruction: The agent's instruction, placed ahead of the UI rules.
+
+    Returns:
+        The prompt, split into its static prefix and dynamic suffix.
+    """
+    return build_cacheable_a2ui_prompt(
+        get_prompt_a2ui_schema(examples),
+        examples,
+        instruction + _get_ui_rules(schema_location="above"),
+    )
+
+
 def get_text_prompt() -> str:
     return """
     You are a helpful Salesforce assistant.
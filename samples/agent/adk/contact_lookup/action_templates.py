@@ -0,0 +1,61 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from typing import Any, Callable
+
+from a2ui.a2ui_action_renderer import (
+    A2uiActionRenderer,
+    A2uiActionTemplate,
+    load_a2ui_example,
+)
+from a2ui_examples import CONTACT_UI_EXAMPLES
+
+
+def build_action_renderer(validate: Callable[[list[Any]], None]) -> A2uiActionRenderer:
+    """
+    Builds the renderer for the userActions whose UI doesn't need the LLM.
+
+    Confirmations only show values the client sends in the action context, so
+    they are filled in directly from the examples. Profile views still need the
+    LLM to look the contact up, and FOLLOW_SUCCESS_EXAMPLE uses an icon that
+    isn't in the standard catalog.
+    """
+    action_confirmation = load_a2ui_example(CONTACT_UI_EXAMPLES, "ACTION_CONFIRMATION_EXAMPLE")
+
+    renderer = A2uiActionRenderer(validate)
+    renderer.register(
+        "send_email",
+        A2uiActionTemplate(
+            action_confirmation,
+            data={
+                "actionTitle": "Email Drafted",
+                "actionMessage": "Drafting an email to {contactName} at {email}.",
+            },
+            text="Drafting an email to {contactName}.",
+            defaults={"contactName": "Unknown", "email": "Unknown"},
+        ),
+    )
+    renderer.register(
+        "send_message",
+        A2uiActionTemplate(
+            action_confirmation,
+            data={
+                "actionTitle": "Message Started",
+                "actionMessage": "Starting a message to {contactName}.",
+            },
+            text="Starting a message to {contactName}.",
+            defaults={"contactName": "Unknown"},
+        ),
+    )
+    return renderer
@@ -14,6 +14,8 @@
 
 import json
 import logging
+from collections.abc import AsyncIterable
+from typing import Any
 
 from a2a.server.agent_execution import AgentExecutor, RequestContext
 from a2a.server.events import EventQueue
@@ -33,11 +35,42 @@ from a2a.utils import (
 )
 from a2a.utils.errors import ServerError
 from agent import ContactAgent
-from a2ui.a2ui_extension import create_a2ui_part, try_activate_a2ui_extension
+from a2ui.a2ui_action_renderer import A2uiRenderedAction
+from a2ui.a2ui_bounded_store import BoundedStoreConfig
+from a2ui.a2ui_extension import (
+    MIME_TYPE_KEY,
+    SurfaceStateStore,
+    create_a2ui_part,
+    encode_a2ui_part,
+    get_a2ui_client_capabilities,
+    is_a2ui_part,
+    select_a2ui_encoding,
+    supports_a2ui_surface_deltas,
+    try_activate_a2ui_extension,
+    validate_a2ui_messages,
+)
+from a2ui.a2ui_instrumentation import (
+    STAGE_DELIMITER_SPLIT,
+    STAGE_EVENT_ENQUEUE,
+    STAGE_JSON_PARSE,
+    STAGE_PART_CREATION,
+    STAGE_TURN,
+    a2ui_request_labels,
+    a2ui_span,
+    set_a2ui_request_action,
+)
+from action_templates import build_action_renderer
 
 logger = logging.getLogger(__name__)
 
 
+async def _stream_rendered_action(
+    rendered: A2uiRenderedAction,
+) -> AsyncIterable[dict[str, Any]]:
+    """Yields a rendered userAction the same way the agent yields its final response."""
+    yield {"is_task_complete": True, "content": rendered.to_response()}
+
+
 class ContactAgentExecutor(AgentExecutor):
     """Contact AgentExecutor Example."""
 
@@ -46,20 +79,46 @@ class ContactAgentExecutor(AgentExecutor):
         # The appropriate one will be chosen at execution time.
         self.ui_agent = ContactAgent(base_url=base_url, use_ui=True)
         self.text_agent = ContactAgent(base_url=base_url, use_ui=False)
+        # Tracks what each session's client has rendered, so later turns only
+        # send the components and data that changed, to clients that opt in.
+        # Kept in the store configured in the environment, so all workers share it.
+        self.surface_state_store = SurfaceStateStore(config=BoundedStoreConfig.from_env())
+        # Renders the UI for deterministic userActions without calling the LLM.
+        self.action_renderer = build_action_renderer(
+            lambda messages: validate_a2ui_messages(
+                messages,
+                self.ui_agent.a2ui_schema_object,
+                catalog_id=self.ui_agent.a2ui_catalog_id,
+            )
+        )
 
     async def execute(
         self,
         context: RequestContext,
         event_queue: EventQueue,
+    ) -> None:
+        with a2ui_request_labels("contact_agent"), a2ui_span(STAGE_TURN):
+            await self._execute(context, event_queue)
+
+    async def _execute(
+        self,
+        context: RequestContext,
+        event_queue: EventQueue,
     ) -> None:
         query = ""
         ui_event_part = None
         action = None
+        rendered = None
 
         logger.info(
             f"--- Client requested extensions: {context.requested_extensions} ---"
         )
         use_ui = try_activate_a2ui_extension(context)
+        # Use the most compact encoding the client supports for A2UI parts.
+        client_capabilities = get_a2ui_client_capabilities(context)
+        a2ui_encoding = select_a2ui_encoding(client_capabilities)
+        # Only clients that keep their surfaces between responses get deltas.
+        send_surface_deltas = supports_a2ui_surface_deltas(client_capabilities)
 
         # Determine which agent to use based on whether the a2ui extension is active.
         if use_ui:
@@ -92,7 +151,8 @@ class ContactAgentExecutor(AgentExecutor):
         if ui_event_part:
             logger.info(f"Received a2ui ClientEvent: {ui_event_part}")
             # Fix: Check both 'actionName' and 'name'
-            action = ui_event_part.get("name")
+            action = ui_event_part.get("name") or ui_event_part.get("actionName")
+            set_a2ui_request_action(action)
             ctx = ui_event_part.get("context", {})
 
             if action == "view_profile":
@@ -118,6 +178,9 @@ class ContactAgentExecutor(AgentExecutor):
 
             else:
                 query = f"User submitted an event: {action} with data: {ctx}"
+
+            if use_ui:
+                rendered = self.action_renderer.render(action, ctx)
         else:
             logger.info("No a2ui UI event part found. Falling back to text input.")
             query = context.get_user_input()
@@ -131,13 +194,35 @@ class ContactAgentExecutor(AgentExecutor):
             await event_queue.enqueue_event(task)
         updater = TaskUpdater(event_queue, task.id, task.context_id)
 
-        async for item in agent.stream(query, task.context_id):
+        if rendered is not None:
+            logger.info(f"--- AGENT_EXECUTOR: Rendered '{action}' from its template without the LLM. ---")
+            stream = _stream_rendered_action(rendered)
+        else:
+            stream = agent.stream(query, task.context_id)
+        async for item in stream:
             is_task_complete = item["is_task_complete"]
             if not is_task_complete:
-                await updater.update_status(
-                    TaskState.working,
-                    new_agent_text_message(item["updates"], task.context_id, task.id),
-                )
+                if "parts" in item:
+                    # A2UI messages streamed before the LLM finished, so the
+                    # client can start rendering. The final message still
+                    # carries the whole UI, for clients that only read it, and
+                    # the text, which is therefore not streamed.
+                    streamed_parts = [
+                        encode_a2ui_part(p, a2ui_encoding)
+                        for p in item["parts"]
+                        if is_a2ui_part(p)
+                    ]
+                    if not streamed_parts:
+                        continue
+                    working_message = new_agent_parts_message(
+                        streamed_parts, task.context_id, task.id
+                    )
+                else:
+                    working_message = new_agent_text_message(
+                        item["updates"], task.context_id, task.id
+                    )
+                with a2ui_span(STAGE_EVENT_ENQUEUE):
+                    await updater.update_status(TaskState.working, working_message)
                 continue
 
             final_state = TaskState.input_required # Default
@@ -148,7 +233,8 @@ class ContactAgentExecutor(AgentExecutor):
             final_parts = []
             if "---a2ui_JSON---" in content:
                 logger.info("Splitting final response into text and UI parts.")
-                text_content, json_string = content.split("---a2ui_JSON---", 1)
+                with a2ui_span(STAGE_DELIMITER_SPLIT):
+                    text_content, json_string = content.split("---a2ui_JSON---", 1)
 
                 if text_content.strip():
                     final_parts.append(Part(root=TextPart(text=text_content.strip())))
@@ -163,20 +249,18 @@ class ContactAgentExecutor(AgentExecutor):
                         if not json_string_cleaned or json_string_cleaned == "[]":
                             logger.info("Received empty/no JSON part. Skipping DataPart.")
                         else:
-                            json_data = json.loads(json_string_cleaned)
-                            if isinstance(json_data, list):
-                                logger.info(
-                                    f"Found {len(json_data)} messages. Creating individual DataParts."
-                                )
-                                for message in json_data:
-                                    final_parts.append(create_a2ui_part(message))
-
-                            else:
-                                # Handle the case where a single JSON object is returned
-                                logger.info(
-                                    "Received a single JSON object. Creating a DataPart."
-                                )
-                                final_parts.append(create_a2ui_part(json_data))
+                            with a2ui_span(STAGE_JSON_PARSE):
+                                json_data = json.loads(json_string_cleaned)
+                            messages = json_data if isinstance(json_data, list) else [json_data]
+                            if send_surface_deltas:
+                                # Only send what changed since the client last rendered each surface.
+                                messages = self.surface_state_store.diff(task.context_id, messages)
+                            logger.info(
+                                f"Found {len(messages)} messages to send. Creating individual DataParts."
+                            )
+                            with a2ui_span(STAGE_PART_CREATION):
+                                for message in messages:
+                                    final_parts.append(create_a2ui_part(message, a2ui_encoding))
  
                     except json.JSONDecodeError as e:
                         logger.error(f"Failed to parse UI JSON: {e}")
@@ -195,14 +279,19 @@ class ContactAgentExecutor(AgentExecutor):
                 if isinstance(part.root, TextPart):
                     logger.info(f"    - Text: {part.root.text[:200]}...")
                 elif isinstance(part.root, DataPart):
-                    logger.info(f"    - Data: {str(part.root.data)[:200]}...")
+                    # Log the message type rather than stringifying the whole
+                    # payload, which can be large.
+                    logger.info(
+                        f"    - Data: {', '.join(part.root.data)} ({part.root.metadata[MIME_TYPE_KEY]})"
+                    )
             logger.info("-----------------------------")
 
-            await updater.update_status(
-                final_state,
-                new_agent_parts_message(final_parts, task.context_id, task.id),
-                final=(final_state == TaskState.completed),
-            )
+            with a2ui_span(STAGE_EVENT_ENQUEUE):
+                await updater.update_status(
+                    final_state,
+                    new_agent_parts_message(final_parts, task.context_id, task.id),
+                    final=(final_state == TaskState.completed),
+                )
             break
 
     async def cancel(
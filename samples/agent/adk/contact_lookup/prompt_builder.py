@@ -12,6 +12,10 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import json
+
+from a2ui.a2ui_prompt_cache import CacheablePrompt, build_cacheable_a2ui_prompt
+from a2ui.a2ui_schema_pruner import prune_a2ui_schema
 from a2ui_examples import CONTACT_UI_EXAMPLES
 from a2ui_schema import A2UI_SCHEMA
 
@@ -38,31 +42,24 @@ AGENT_INSTRUCTION = """
 """
 
 
-def get_ui_prompt(base_url: str, examples: str) -> str:
+def get_prompt_a2ui_schema(examples: str) -> str:
     """
-    Constructs the full prompt with UI instructions, rules, examples, and schema.
-
-    Args:
-        base_url: The base URL for resolving static assets like logos.
-        examples: A string containing the specific UI examples for the agent's task.
+    Returns the A2UI schema for the prompt, with only the components the examples use.
 
-    Returns:
-        A formatted string to be used as the system prompt for the LLM.
+    Responses are still validated against the full `A2UI_SCHEMA`.
     """
+    return json.dumps(prune_a2ui_schema(json.loads(A2UI_SCHEMA), examples=examples))
 
-    # --- THIS IS THE FIX ---
-    # We no longer call .format() on the examples, as it breaks the JSON.
-    formatted_examples = examples
-    # --- END FIX ---
 
-    return f"""
-    You are a helpful contact lookup assistant. Your final output MUST be a a2ui UI JSON response.
+def _get_ui_rules(schema_location: str = "below") -> str:
+    """Returns the UI response rules, which don't depend on the deployment."""
+    return f"""    You are a helpful contact lookup assistant. Your final output MUST be a a2ui UI JSON response.
 
     To generate the response, you MUST follow these rules:
     1.  Your response MUST be in two parts, separated by the delimiter: `---a2ui_JSON---`.
     2.  The first part is your conversational text response (e.g., "Here is the contact you requested...").
     3.  The second part is a single, raw JSON object which is a list of A2UI messages.
-    4.  The JSON part MUST validate against the A2UI JSON SCHEMA provided below.
+    4.  The JSON part MUST validate against the A2UI JSON SCHEMA provided {schema_location}.
     5.  Buttons that represent the main action on a card or view (e.g., 'Follow', 'Email', 'Search') SHOULD include the `"primary": true` attribute.
 
     --- UI TEMPLATE RULES ---
@@ -79,16 +76,61 @@ def get_ui_prompt(base_url: str, examples: str) -> str:
     -   **For handling actions (e.g., "follow_contact"):**
         a.  You MUST use the `FOLLOW_SUCCESS_EXAMPLE` template.
         b.  This will render a new card with a "Successfully Followed" message.
-        c.  Respond with a text confirmation like "You are now following this contact." along with the JSON.
+        c.  Respond with a text confirmation like "You are now following this contact." along with the JSON."""
+
+
+def get_ui_prompt(base_url: str, examples: str) -> str:
+    """
+    Constructs the full prompt with UI instructions, rules, examples, and schema.
+
+    Args:
+        base_url: The base URL for resolving static assets like logos.
+        examples: A string containing the specific UI examples for the agent's task.
+
+    Returns:
+        A formatted string to be used as the system prompt for the LLM.
+    """
+
+    # --- THIS IS THE FIX ---
+    # We no longer call .format() on the examples, as it breaks the JSON.
+    formatted_examples = examples
+    # --- END FIX ---
+
+    return f"""
+{_get_ui_rules()}
 
     {formatted_examples}
 
     ---BEGIN A2UI JSON SCHEMA---
-    {A2UI_SCHEMA}
+    {get_prompt_a2ui_schema(examples)}
     ---END A2UI JSON SCHEMA---
     """
 
 
+def get_cacheable_ui_prompt(
+    base_url: str, examples: str, instruction: str = ""
+) -> CacheablePrompt:
+    """
+    Constructs the UI prompt ordered for provider-side context caching.
+
+    The schema and examples come first, as a prefix that is the same for every
+    deployment, followed by the instruction and rules.
+
+    Args:
+        base_url: The base URL for resolving static assets like logos.
+        examples: A string containing the specific UI examples for the agent's task.
+        instruction: The agent's instruction, placed ahead of the UI rules.
+
+    Returns:
+        The prompt, split into its static prefix and dynamic suffix.
+    """
+    return build_cacheable_a2ui_prompt(
+        get_prompt_a2ui_schema(examples),
+        examples,
+        instruction + _get_ui_rules(schema_location="above"),
+    )
+
+
 def get_text_prompt() -> str:
     """
     Constructs the prompt for a text-only agent.
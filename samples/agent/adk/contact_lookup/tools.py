@@ -15,54 +15,101 @@
 import json
 import logging
 import os
+from typing import Any, Optional
 
+from a2ui.a2ui_data_store import DataSnapshot, IndexedDataStore, index_fields
+from a2ui.a2ui_fuzzy_index import DEFAULT_MIN_SCORE, FuzzyIndex
 from google.adk.tools.tool_context import ToolContext
 
 logger = logging.getLogger(__name__)
 
+# The URL the images in the data are served from; replaced by the agent's base URL.
+DATA_BASE_URL = "http://localhost:10002"
 
-def get_contact_info(name: str, tool_context: ToolContext, department: str = "") -> str:
+# Ranks contacts by how well their name, title or team matches, tolerating
+# typos and nicknames. CONTACT_MATCH_MIN_SCORE (0 to 1) sets how close a match must be.
+contact_name_index = FuzzyIndex(
+    {"name": 1.0, "title": 0.8, "team": 0.8},
+    min_score=float(os.getenv("CONTACT_MATCH_MIN_SCORE", DEFAULT_MIN_SCORE)),
+)
+
+
+def _get_contact_key(contact: dict[str, Any]) -> Optional[str]:
+    return str(contact["id"]) if "id" in contact else None
+
+
+def _index_contacts(snapshot: DataSnapshot) -> None:
+    # Only the contacts that were added, changed or removed are reindexed.
+    contacts = {}
+    for contact in snapshot.records:
+        if (key := _get_contact_key(contact)) is not None:
+            contacts[key] = contact
+    changed, removed = contact_name_index.sync(contacts)
+    logger.info(f"Reindexed {changed} contacts and removed {removed}")
+
+
+# Loaded once and reloaded when the data changes. CONTACT_DATA_PATH can point
+# to another file, or a directory of files.
+contact_store = IndexedDataStore(
+    os.getenv(
+        "CONTACT_DATA_PATH", os.path.join(os.path.dirname(__file__), "contact_data.json")
+    ),
+    indexes={
+        "id": lambda contact: filter(None, [_get_contact_key(contact)]),
+        "department": index_fields("department"),
+        "team": index_fields("team"),
+    },
+    url_placeholder=DATA_BASE_URL,
+    on_load=_index_contacts,
+)
+
+
+def get_contact_info(
+    name: str,
+    tool_context: ToolContext,
+    department: str = "",
+    team: str = "",
+    count: int = 5,
+) -> str:
     """Call this tool to get a list of contacts based on a name and optional department.
     'name' is the person's name to search for.
     'department' is the optional department to filter by.
+    'team' is the optional team to filter by.
+    'count' is the maximum number of contacts to return, best matches first.
     """
     logger.info("--- TOOL CALLED: get_contact_info ---")
     logger.info(f"  - Name: {name}")
     logger.info(f"  - Department: {department}")
+    logger.info(f"  - Team: {team}")
+
+    snapshot = contact_store.get_snapshot()
+
+    # If department or team are provided, filter results further
+    allowed_ids = None
+    if dept_lower := department.lower():
+        allowed_ids = snapshot.find("department", lambda term: dept_lower in term)
+    if team_lower := team.lower():
+        team_ids = snapshot.find("team", lambda term: team_lower in term)
+        allowed_ids = team_ids if allowed_ids is None else allowed_ids & team_ids
 
-    results = []
-    try:
-        script_dir = os.path.dirname(__file__)
-        file_path = os.path.join(script_dir, "contact_data.json")
-        with open(file_path) as f:
-            contact_data_str = f.read()
-            if base_url := tool_context.state.get("base_url"):                
-                contact_data_str = contact_data_str.replace("http://localhost:10002", base_url)
-                logger.info(f'Updated base URL from tool context: {base_url}')
-            all_contacts = json.loads(contact_data_str)        
-
-        name_lower = name.lower()
-
-        dept_lower = department.lower() if department else ""
-
-        # Filter by name
-        results = [
-            contact for contact in all_contacts if name_lower in contact["name"].lower()
-        ]
-
-        # If department is provided, filter results further
-        if dept_lower:
-            results = [
-                contact
-                for contact in results
-                if dept_lower in contact["department"].lower()
-            ]
-
-        logger.info(f"  - Success: Found {len(results)} matching contacts.")
-
-    except FileNotFoundError:
-        logger.error(f"  - Error: contact_data.json not found at {file_path}")
-    except json.JSONDecodeError:
-        logger.error(f"  - Error: Failed to decode JSON from {file_path}")
+    if name.strip():
+        matches = contact_name_index.search(
+            name,
+            limit=count,
+            accept=None
+            if allowed_ids is None
+            else lambda key: any(i in allowed_ids for i in snapshot.lookup("id", key)),
+        )
+        record_ids = [i for key, _ in matches for i in snapshot.lookup("id", key)]
+        results = snapshot.get_records(
+            record_ids, base_url=tool_context.state.get("base_url"), limit=count, keep_order=True
+        )
+    else:
+        results = snapshot.get_records(
+            range(len(snapshot)) if allowed_ids is None else allowed_ids,
+            base_url=tool_context.state.get("base_url"),
+            limit=count,
+        )
 
+    logger.info(f"  - Success: Found {len(results)} matching contacts.")
     return json.dumps(results)
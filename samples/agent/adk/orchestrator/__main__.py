@@ -19,9 +19,13 @@ import asyncio
 import click
 from a2a.server.apps import A2AStarletteApplication
 from a2a.server.request_handlers import DefaultRequestHandler
-from a2a.server.tasks import InMemoryTaskStore
+from a2ui.a2ui_bounded_store import BoundedStoreConfig, BoundedTaskStore
+from a2ui.a2ui_instrumentation import A2uiMetricsApp, configure_a2ui_tracing, get_latency_histograms
+from a2ui.a2ui_server import run_a2a_server
 from agent import OrchestratorAgent
+from agent_card_cache import DEFAULT_CARD_TIMEOUT_SECONDS, AgentCardCache
 from agent_executor import OrchestratorAgentExecutor
+from subagent_http_client import SubagentHttpClients
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 
@@ -44,7 +48,14 @@ class MissingAPIKeyError(Exception):
     type=str,
     default=None,
 )
-def main(host, port, subagent_urls):
+@click.option("--workers", default=1, type=int, help="Worker processes; requires A2UI_STORE_SQLITE_PATH or A2UI_STORE_REDIS_URL.")
+@click.option(
+    "--streaming/--no-streaming",
+    default=True,
+    envvar="SUBAGENT_STREAMING",
+    help="Relay subagent status updates and A2UI parts while the subagent is still working.",
+)
+def main(host, port, subagent_urls, workers, streaming):
     try:
         # Check for API key only if Vertex AI is not configured
         if not os.getenv("GOOGLE_GENAI_USE_VERTEXAI") == "TRUE":
@@ -70,30 +81,54 @@ def main(host, port, subagent_urls):
         else:
             base_url = f"http://{host}:{port}"
         
-        orchestrator_agent = asyncio.run(OrchestratorAgent.build_agent(subagent_urls=subagent_urls))
-        agent_executor = OrchestratorAgentExecutor(base_url=base_url, agent=orchestrator_agent)
+        def build_app():
+            # Each worker builds its own app, stores and clients.
+            configure_a2ui_tracing("orchestrator")
+            # Set AGENT_CARD_CACHE_PATH to start from the cards of the last run while subagents start up.
+            card_cache = AgentCardCache(
+                path=os.getenv("AGENT_CARD_CACHE_PATH"),
+                timeout_seconds=float(os.getenv("AGENT_CARD_TIMEOUT_SECONDS", DEFAULT_CARD_TIMEOUT_SECONDS)),
+            )
+            # One connection pool per subagent host, shared by all calls to it.
+            http_clients = SubagentHttpClients.from_env()
+            orchestrator_agent = asyncio.run(
+                OrchestratorAgent.build_agent(
+                    subagent_urls=subagent_urls,
+                    streaming=streaming,
+                    card_cache=card_cache,
+                    http_clients=http_clients,
+                )
+            )
+            agent_executor = OrchestratorAgentExecutor(base_url=base_url, agent=orchestrator_agent)
 
-        request_handler = DefaultRequestHandler(
-            agent_executor=agent_executor,
-            task_store=InMemoryTaskStore(),
-        )
-        server = A2AStarletteApplication(
-            agent_card=agent_executor.get_agent_card(), http_handler=request_handler
-        )
-        import uvicorn
+            task_store = BoundedTaskStore(BoundedStoreConfig.from_env())
+            get_latency_histograms().add_gauge_source("a2a_tasks", task_store.get_stats)
+            get_latency_histograms().add_gauge_source("subagent_http", http_clients.get_stats)
+            request_handler = DefaultRequestHandler(
+                agent_executor=agent_executor,
+                task_store=task_store,
+            )
+            server = A2AStarletteApplication(
+                agent_card=agent_executor.get_agent_card(), http_handler=request_handler
+            )
 
-        app = server.build()
+            app = server.build()
+            app.add_event_handler("shutdown", http_clients.aclose)
 
-        app.add_middleware(
-            CORSMiddleware,
-            allow_origin_regex=".*",
-            allow_credentials=True,
-            allow_methods=["*"],
-            allow_headers=["*"],
-        )
+            app.add_middleware(
+                CORSMiddleware,
+                allow_origin_regex=".*",
+                allow_credentials=True,
+                allow_methods=["*"],
+                allow_headers=["*"],
+            )
+
+            logger.info("Starting server with permissive CORS (regex='.*')...")
+            # Per-stage latency histograms of this worker, in the Prometheus format.
+            app.add_route("/metrics", A2uiMetricsApp())
+            return app
 
-        logger.info("Starting server with permissive CORS (regex='.*')...")
-        uvicorn.run(app, host=host, port=port)
+        run_a2a_server(build_app, host, port, workers)
     except MissingAPIKeyError as e:
         logger.error(f"Error: {e} {traceback.format_exc()}")
         exit(1)
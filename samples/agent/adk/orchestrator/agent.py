@@ -15,22 +15,25 @@
 import json
 import logging
 import os
-from typing import List, Any
-from a2a.client import A2ACardResolver, Client, ClientCallContext, Consumer
+from typing import List, Any, Optional
+from a2a.client import Client, ClientCallContext, Consumer
 from a2a.extensions.common import HTTP_EXTENSION_HEADER
 from google.adk.models.lite_llm import LiteLlm
 from google.adk.agents.llm_agent import LlmAgent
-from google.adk.agents.remote_a2a_agent import RemoteA2aAgent, DEFAULT_TIMEOUT
+from google.adk.agents.remote_a2a_agent import RemoteA2aAgent
 from google.adk.planners.built_in_planner import BuiltInPlanner
 from google.genai import types as genai_types
-import httpx
 import re
 import part_converters
 from google.adk.agents.callback_context import  CallbackContext
 from google.adk.models.llm_request import LlmRequest
 from google.adk.models.llm_response import LlmResponse
 from subagent_route_manager import SubagentRouteManager
-from a2ui.a2ui_extension import is_a2ui_part, A2UI_EXTENSION_URI
+from agent_card_cache import AgentCardCache
+from subagent_http_client import SubagentHttpClients
+from a2ui.a2ui_extension import get_a2ui_datapart, A2UI_EXTENSION_URI
+from a2ui.a2ui_instrumentation import A2uiLatencyCallbacks
+from a2ui.a2ui_skill_router import DEFAULT_MIN_CONFIDENCE, SkillRouter
 from typing import override
 from a2a.types import TransportProtocol as A2ATransport, AgentCard
 
@@ -50,13 +53,8 @@ from a2a.types import (
 from a2a.client import Client
 from a2a.client.middleware import ClientCallContext 
 
-# from phoenix.otel import register
-# tracer_provider = register(
-    
-#     project_name="default",
-#     endpoint= "http://0.0.0.0:6006/v1/traces",# "https://app.phoenix.arize.com/s/tonyruiz",
-#     auto_instrument=True
-# )
+# Spans are exported over OTLP by configure_a2ui_tracing in __main__.py, e.g. to a
+# local Phoenix with OTEL_EXPORTER_OTLP_TRACES_ENDPOINT=http://0.0.0.0:6006/v1/traces.
 
 class A2UIMetadataInterceptor(ClientCallInterceptor):
     @override
@@ -100,6 +98,10 @@ class OrchestratorAgent:
     """An agent that runs an ecommerce dashboard"""
 
     SUPPORTED_CONTENT_TYPES = ["text", "text/plain"]
+    # Times the LLM and tool calls for the /metrics endpoint.
+    latency_callbacks = A2uiLatencyCallbacks()
+    # Built from the subagents' agent cards by build_agent.
+    skill_router: Optional[SkillRouter] = None
     
     @classmethod
     async def programmtically_route_user_action_to_subagent(
@@ -111,83 +113,137 @@ class OrchestratorAgent:
             llm_request.contents
             and (last_content := llm_request.contents[-1]).parts
             and (a2a_part := part_converters.convert_genai_part_to_a2a_part(last_content.parts[-1]))
-            and is_a2ui_part(a2a_part)
-            and (user_action := a2a_part.root.data.get("userAction"))
+            and (a2ui_datapart := get_a2ui_datapart(a2a_part))
+            and (user_action := a2ui_datapart.data.get("userAction"))
             and (surface_id := user_action.get("surfaceId"))
-            and (target_agent := await SubagentRouteManager.get_route_to_subagent_name(surface_id, callback_context.state))
+            and (target_agent := await SubagentRouteManager.get_route_to_subagent_name(surface_id, callback_context.session.id, callback_context.state))
         ):
             logger.info(f"Programmatically routing userAction for surfaceId '{surface_id}' to subagent '{target_agent}'")
-            return LlmResponse(
-                content=genai_types.Content(
-                    parts=[
-                        genai_types.Part(
-                            function_call=genai_types.FunctionCall(
-                                name="transfer_to_agent",
-                                args={"agent_name": target_agent},
-                            )
-                        )
-                    ]
-                )
-            )
+            return cls._transfer_to_agent(target_agent)
                      
         return None
 
     @classmethod
-    async def build_agent(cls, subagent_urls: List[str]) -> LlmAgent:
-        """Builds the LLM agent for the orchestrator_agent agent."""
+    async def route_request_to_subagent_by_skills(
+        cls,
+        callback_context: CallbackContext,
+        llm_request: LlmRequest,
+    ) -> Optional[LlmResponse]:
+        """Routes text requests that clearly match one subagent's skills without calling the LLM."""
+        if (
+            cls.skill_router is None
+            or not llm_request.contents
+            or (last_content := llm_request.contents[-1]).role != "user"
+            or not last_content.parts
+        ):
+            return None
 
-        subagents = []
-        for subagent_url in subagent_urls:
-            async with httpx.AsyncClient() as httpx_client:
-                resolver = A2ACardResolver(
-                    httpx_client=httpx_client,
-                    base_url=subagent_url,
-                )
-                
-                subagent_card =  await resolver.get_agent_card()
-                logger.info('Successfully fetched public agent card:' + subagent_card.model_dump_json(indent=2, exclude_none=True))
-                
-                # clean name for adk
-                clean_name = re.sub(r'[^0-9a-zA-Z_]+', '_', subagent_card.name)                
-                if clean_name == "":
-                    clean_name = "_"
-                if clean_name[0].isdigit():
-                    clean_name = f"_{clean_name}"
-                
-                # make remote agent
-                description = json.dumps({
-                    "id": clean_name,
-                    "name": subagent_card.name,
-                    "description": subagent_card.description,
-                    "skills": [
-                        {
-                            "name": skill.name, 
-                            "description": skill.description, 
-                            "examples": skill.examples, 
-                            "tags": skill.tags
-                        } for skill in subagent_card.skills
-                    ]
-                }, indent=2)
-                remote_a2a_agent = RemoteA2aAgent(
-                    clean_name, 
-                    subagent_card, 
-                    description=description, # This will be appended to system instructions
-                    a2a_part_converter=part_converters.convert_a2a_part_to_genai_part,
-                    genai_part_converter=part_converters.convert_genai_part_to_a2a_part,                      
-                    a2a_client_factory=A2AClientFactoryWithA2UIMetadata(
-                        config=A2AClientConfig(
-                            httpx_client=httpx.AsyncClient(
-                                timeout=httpx.Timeout(timeout=DEFAULT_TIMEOUT),
-                            ),
-                            streaming=False,
-                            polling=False,
-                            supported_transports=[A2ATransport.jsonrpc],
+        # Serialized A2UI parts (e.g. userActions for unknown surfaces) are left to the LLM.
+        text = " ".join(
+            part.text
+            for part in last_content.parts
+            if part.text and not part.thought and not part.text.lstrip().startswith("{")
+        )
+        if not text:
+            return None
+
+        decision = cls.skill_router.route(text)
+        if decision.agent_name is None:
+            return None
+        logger.info(f"Routing request to subagent '{decision.agent_name}' by its skills (confidence {decision.confidence:.2f})")
+        return cls._transfer_to_agent(decision.agent_name)
+
+    @staticmethod
+    def _transfer_to_agent(agent_name: str) -> LlmResponse:
+        return LlmResponse(
+            content=genai_types.Content(
+                parts=[
+                    genai_types.Part(
+                        function_call=genai_types.FunctionCall(
+                            name="transfer_to_agent",
+                            args={"agent_name": agent_name},
                         )
                     )
+                ]
+            )
+        )
+
+    @classmethod
+    async def build_agent(
+        cls,
+        subagent_urls: List[str],
+        streaming: bool = True,
+        card_cache: Optional[AgentCardCache] = None,
+        http_clients: Optional[SubagentHttpClients] = None,
+    ) -> LlmAgent:
+        """Builds the LLM agent for the orchestrator_agent agent.
+
+        With `streaming`, subagents are called over SSE and their status
+        updates and A2UI parts are relayed to the client as they arrive,
+        instead of once the subagent's task has completed. Subagents whose
+        cards can't be resolved, from them or from `card_cache`, are left out.
+        Subagents are called with the pooled clients of `http_clients`, which
+        the caller closes on shutdown.
+        """
+
+        # Cards are fetched concurrently, and cached cards are used for subagents that are slow to start.
+        card_cache = card_cache or AgentCardCache()
+        subagent_cards = await card_cache.resolve(subagent_urls)
+        http_clients = http_clients or SubagentHttpClients()
+
+        subagents = []
+        subagent_cards_by_name = {}
+        for subagent_card in subagent_cards.values():
+            # clean name for adk
+            clean_name = re.sub(r'[^0-9a-zA-Z_]+', '_', subagent_card.name)                
+            if clean_name == "":
+                clean_name = "_"
+            if clean_name[0].isdigit():
+                clean_name = f"_{clean_name}"
+            
+            # make remote agent
+            description = json.dumps({
+                "id": clean_name,
+                "name": subagent_card.name,
+                "description": subagent_card.description,
+                "skills": [
+                    {
+                        "name": skill.name, 
+                        "description": skill.description, 
+                        "examples": skill.examples, 
+                        "tags": skill.tags
+                    } for skill in subagent_card.skills
+                ]
+            }, indent=2)
+            remote_a2a_agent = RemoteA2aAgent(
+                clean_name, 
+                subagent_card, 
+                description=description, # This will be appended to system instructions
+                a2a_part_converter=part_converters.convert_a2a_part_to_genai_part,
+                genai_part_converter=part_converters.convert_genai_part_to_a2a_part,                      
+                a2a_client_factory=A2AClientFactoryWithA2UIMetadata(
+                    config=A2AClientConfig(
+                        # Shared with the other subagents on the same host.
+                        httpx_client=http_clients.get_client(subagent_card.url),
+                        # Subagents that don't support streaming are still called with message/send.
+                        streaming=streaming,
+                        polling=False,
+                        supported_transports=[A2ATransport.jsonrpc],
+                    )
                 )
-                subagents.append(remote_a2a_agent)
-                
-                logger.info(f'Created remote agent with description: {description}')
+            )
+            subagents.append(remote_a2a_agent)
+            subagent_cards_by_name[clean_name] = subagent_card
+            
+            logger.info(f'Created remote agent with description: {description}')
+
+        # Requests that clearly match one subagent's skills skip the orchestrator LLM.
+        # Set SKILL_ROUTER_MIN_CONFIDENCE above 1 to always ask the LLM.
+        cls.skill_router = SkillRouter.from_agent_cards(
+            subagent_cards_by_name,
+            min_confidence=float(os.getenv("SKILL_ROUTER_MIN_CONFIDENCE", DEFAULT_MIN_CONFIDENCE)),
+            log_path=os.getenv("SKILL_ROUTER_LOG_PATH"),
+        )
 
         LITELLM_MODEL = os.getenv("LITELLM_MODEL", "gemini/gemini-2.5-flash")
         return LlmAgent(
@@ -202,5 +258,13 @@ class OrchestratorAgent:
                 )
             ),
             sub_agents=subagents,
-            before_model_callback=cls.programmtically_route_user_action_to_subagent,
+            # Routed userActions and requests skip the LLM, so they aren't timed as LLM calls.
+            before_model_callback=[
+                cls.programmtically_route_user_action_to_subagent,
+                cls.route_request_to_subagent_by_skills,
+                cls.latency_callbacks.before_model,
+            ],
+            after_model_callback=cls.latency_callbacks.after_model,
+            before_tool_callback=cls.latency_callbacks.before_tool,
+            after_tool_callback=cls.latency_callbacks.after_tool,
         )
@@ -0,0 +1,156 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import json
+import logging
+import os
+import tempfile
+import threading
+from typing import Any, List, Optional
+
+import httpx
+from a2a.types import AgentCard
+from a2a.utils.constants import AGENT_CARD_WELL_KNOWN_PATH
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CARD_TIMEOUT_SECONDS = 10.0
+
+
+class AgentCardCache:
+    """Resolves subagent agent cards concurrently, with a card cache kept on disk.
+
+    Cards are cached by subagent URL together with their ETag and
+    Last-Modified headers, so refetching a card that didn't change is a
+    conditional request. With `prefer_cached`, cached cards are returned
+    without waiting for the subagents, and are revalidated in the
+    background; a changed card is written to the cache and used from the
+    next start.
+
+    Args:
+        path: The JSON file to keep the cards in, or None to not persist them.
+        timeout_seconds: How long to wait for each subagent's card.
+        prefer_cached: Whether to start from cached cards instead of
+            fetching them first.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        timeout_seconds: float = DEFAULT_CARD_TIMEOUT_SECONDS,
+        prefer_cached: bool = True,
+    ):
+        self._path = path
+        self._timeout_seconds = timeout_seconds
+        self._prefer_cached = prefer_cached
+        self._lock = threading.Lock()
+        self._entries: dict[str, dict[str, Any]] = self._load()
+
+    async def resolve(self, subagent_urls: List[str]) -> dict[str, AgentCard]:
+        """Returns the cards of the subagents that could be resolved, by URL.
+
+        A subagent whose card can't be fetched in time is served from the
+        cache, or else left out.
+        """
+        cached_urls = [url for url in subagent_urls if url in self._entries] if self._prefer_cached else []
+        fetch_urls = [url for url in subagent_urls if url not in cached_urls]
+
+        cards: dict[str, AgentCard] = {}
+        if fetch_urls:
+            async with httpx.AsyncClient(timeout=httpx.Timeout(self._timeout_seconds)) as httpx_client:
+                fetched = await asyncio.gather(*(self._fetch(url, httpx_client) for url in fetch_urls))
+            cards.update((url, card) for url, card in zip(fetch_urls, fetched) if card is not None)
+        for url in cached_urls:
+            logger.info(f"Using cached agent card for {url}")
+            cards[url] = AgentCard.model_validate(self._entries[url]["card"])
+        if cached_urls:
+            # build_agent runs in its own event loop, which is closed once the
+            # agent is built, so revalidate in a thread with a loop of its own.
+            threading.Thread(target=asyncio.run, args=(self.revalidate(cached_urls),), daemon=True).start()
+
+        for url in subagent_urls:
+            if url not in cards:
+                logger.error(f"No agent card for {url}; starting without this subagent")
+        return {url: cards[url] for url in subagent_urls if url in cards}
+
+    async def revalidate(self, subagent_urls: List[str]) -> None:
+        """Refetches the cards, updating the cache with those that changed."""
+        async with httpx.AsyncClient(timeout=httpx.Timeout(self._timeout_seconds)) as httpx_client:
+            await asyncio.gather(*(self._fetch(url, httpx_client) for url in subagent_urls))
+
+    async def _fetch(self, url: str, httpx_client: httpx.AsyncClient) -> Optional[AgentCard]:
+        entry = self._entries.get(url)
+        headers = {}
+        if entry and entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry and entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+        card_url = url.rstrip("/") + AGENT_CARD_WELL_KNOWN_PATH
+        try:
+            response = await asyncio.wait_for(
+                httpx_client.get(card_url, headers=headers), timeout=self._timeout_seconds
+            )
+            if response.status_code == 304 and entry:
+                logger.info(f"Agent card for {url} is unchanged")
+                return AgentCard.model_validate(entry["card"])
+            response.raise_for_status()
+            card = AgentCard.model_validate(response.json())
+        except Exception as e:
+            if entry:
+                logger.warning(f"Failed to fetch agent card from {card_url}, using the cached card: {e!r}")
+                return AgentCard.model_validate(entry["card"])
+            logger.error(f"Failed to fetch agent card from {card_url}: {e!r}")
+            return None
+
+        logger.info("Successfully fetched public agent card:" + card.model_dump_json(indent=2, exclude_none=True))
+        card_data = card.model_dump(mode="json", by_alias=True, exclude_none=True)
+        if entry and entry["card"] != card_data:
+            logger.info(f"Agent card for {url} changed")
+        self._store(
+            url,
+            {
+                "card": card_data,
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+            },
+        )
+        return card
+
+    def _load(self) -> dict[str, dict[str, Any]]:
+        if not self._path or not os.path.exists(self._path):
+            return {}
+        try:
+            with open(self._path) as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring agent card cache {self._path}: {e}")
+            return {}
+
+    def _store(self, url: str, entry: dict[str, Any]) -> None:
+        with self._lock:
+            if self._entries.get(url) == entry:
+                return
+            self._entries = {**self._entries, url: entry}
+            if not self._path:
+                return
+            # Written to a temporary file and renamed, so other workers never read a partial file.
+            try:
+                directory = os.path.dirname(os.path.abspath(self._path))
+                with tempfile.NamedTemporaryFile("w", dir=directory, delete=False, suffix=".tmp") as f:
+                    json.dump(self._entries, f, indent=2)
+                os.replace(f.name, self._path)
+            except OSError as e:
+                logger.warning(f"Failed to write agent card cache {self._path}: {e}")
@@ -12,7 +12,6 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import asyncio
 import logging
 import json
 from typing import List, Optional, override
@@ -22,17 +21,17 @@ from google.adk.a2a.converters.request_converter import AgentRunRequest
 
 from a2a.server.agent_execution import RequestContext
 from google.adk.agents.llm_agent import LlmAgent
-from google.adk.artifacts import InMemoryArtifactService
 from a2a.server.events.event_queue import EventQueue
-from google.adk.memory.in_memory_memory_service import InMemoryMemoryService
 from google.adk.runners import Runner
-from google.adk.sessions import InMemorySessionService
 from google.adk.a2a.executor.a2a_agent_executor import (
     A2aAgentExecutorConfig,
     A2aAgentExecutor,
 )
 from a2a.types import AgentCapabilities, AgentCard, AgentExtension
-from a2ui.a2ui_extension import is_a2ui_part, try_activate_a2ui_extension, A2UI_EXTENSION_URI, STANDARD_CATALOG_ID, SUPPORTED_CATALOG_IDS_KEY, get_a2ui_agent_extension, A2UI_CLIENT_CAPABILITIES_KEY
+from a2ui.a2ui_adk_services import BoundedArtifactService, BoundedMemoryService, BoundedSessionService
+from a2ui.a2ui_bounded_store import BoundedStoreConfig
+from a2ui.a2ui_extension import BEGIN_RENDERING_KEY, DELETE_SURFACE_KEY, get_a2ui_dataparts, try_activate_a2ui_extension, A2UI_EXTENSION_URI, STANDARD_CATALOG_ID, SUPPORTED_CATALOG_IDS_KEY, get_a2ui_agent_extension, get_a2ui_client_capabilities, get_a2ui_client_capabilities_hash, get_a2ui_user_action
+from a2ui.a2ui_instrumentation import STAGE_TURN, a2ui_request_labels, a2ui_span
 from google.adk.a2a.converters import event_converter
 from a2a.server.events import Event as A2AEvent
 from google.adk.events.event import Event
@@ -58,14 +57,18 @@ class OrchestratorAgentExecutor(A2aAgentExecutor):
             event_converter=self.convert_event_to_a2a_events_and_save_surface_id_to_subagent_name,
         )
 
+        # Evicts idle sessions; set A2UI_STORE_SQLITE_PATH to keep them across restarts.
+        store_config = BoundedStoreConfig.from_env()
         runner = Runner(
             app_name=agent.name,
             agent=agent,
-            artifact_service=InMemoryArtifactService(),
-            session_service=InMemorySessionService(),
-            memory_service=InMemoryMemoryService(),
+            artifact_service=BoundedArtifactService(store_config),
+            session_service=BoundedSessionService(store_config),
+            memory_service=BoundedMemoryService(store_config),
         )
 
+        self._session_service = runner.session_service
+
         super().__init__(runner=runner, config=config)
 
     @classmethod
@@ -108,20 +111,18 @@ class OrchestratorAgentExecutor(A2aAgentExecutor):
                     a2a_event.metadata = {}
                 a2a_event.metadata["a2a_subagent"] = subagent_card
                         
-            for a2a_part in a2a_event.status.message.parts:
-                if is_a2ui_part(a2a_part):
-                    logger.info("Detected A2UI part in A2A event")
-                    if (begin_rendering := a2a_part.root.data.get("beginRendering")) and (surface_id := begin_rendering.get("surfaceId")):
-                        logger.info(f"Found beginRendering for surfaceId: {surface_id}")                    
-                        asyncio.run_coroutine_threadsafe(
-                            SubagentRouteManager.set_route_to_subagent_name(
-                                surface_id,
-                                event.author,
-                                invocation_context.session_service,
-                                invocation_context.session,
-                            ),
-                            asyncio.get_event_loop(),
-                        )
+            if not (a2a_event.status and a2a_event.status.message):
+                continue
+            a2ui_dataparts = get_a2ui_dataparts(a2a_event.status.message.parts)
+            if a2ui_dataparts:
+                logger.info(f"Detected {len(a2ui_dataparts)} A2UI parts in A2A event")
+            # Routes are updated in memory here, and written to the session once the turn ends.
+            # In message order, so a surface that is deleted and rendered again keeps its route.
+            for datapart in a2ui_dataparts:
+                for message_type, subagent_name in ((BEGIN_RENDERING_KEY, event.author), (DELETE_SURFACE_KEY, None)):
+                    if (surface_id := (datapart.data.get(message_type) or {}).get("surfaceId")):
+                        logger.info(f"Found {message_type} for surfaceId: {surface_id}")
+                        SubagentRouteManager.set_route_to_subagent_name(surface_id, subagent_name, invocation_context.session)
 
         return a2a_events
 
@@ -140,6 +141,16 @@ class OrchestratorAgentExecutor(A2aAgentExecutor):
             skills=[],
         )
 
+    @override
+    async def execute(self, context: RequestContext, event_queue: EventQueue) -> None:
+        user_action = get_a2ui_user_action(context)
+        with a2ui_request_labels("orchestrator_agent", user_action and user_action.get("name")), a2ui_span(STAGE_TURN):
+            try:
+                await super().execute(context, event_queue)
+            finally:
+                # One state delta per turn for the surfaces the turn rendered or deleted.
+                await SubagentRouteManager.flush_routes(self._session_service, context.context_id)
+
     @override
     async def _prepare_session(
         self,
@@ -151,22 +162,27 @@ class OrchestratorAgentExecutor(A2aAgentExecutor):
         
         if try_activate_a2ui_extension(context):
             logger.info("A2UI extension activated for session")
-            client_capabilities = context.message.metadata.get(A2UI_CLIENT_CAPABILITIES_KEY) if context.message and context.message.metadata else None
-            
-            await runner.session_service.append_event(
-                    session,
-                    Event(
-                        invocation_id=new_invocation_context_id(),
-                        author="system",
-                        actions=EventActions(
-                            state_delta={ 
-                                # These values are used to configure A2UI messages to remote agent calls         
-                                "use_ui": True,
-                                "client_capabilities": client_capabilities 
-                            }
+            client_capabilities = get_a2ui_client_capabilities(context)
+            capabilities_hash = get_a2ui_client_capabilities_hash(client_capabilities)
+
+            # The client resends its capabilities with every message, so only
+            # write them to the session when they change.
+            if session.state.get("client_capabilities_hash") != capabilities_hash:
+                await runner.session_service.append_event(
+                        session,
+                        Event(
+                            invocation_id=new_invocation_context_id(),
+                            author="system",
+                            actions=EventActions(
+                                state_delta={ 
+                                    # These values are used to configure A2UI messages to remote agent calls         
+                                    "use_ui": True,
+                                    "client_capabilities": client_capabilities,
+                                    "client_capabilities_hash": capabilities_hash,
+                                }
+                            ),
                         ),
-                    ),
-                )
+                    )
         else:
             logger.info("A2UI extension NOT activated")
             
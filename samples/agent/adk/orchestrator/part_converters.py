@@ -30,7 +30,8 @@ def convert_a2a_part_to_genai_part(
 ) -> Optional[genai_types.Part]:           
     if is_a2ui_part(a2a_part):                
         genai_part = genai_types.Part(text=a2a_part.model_dump_json())
-        logger.info(f'Converted A2UI part from A2A: {a2a_part.model_dump_json(exclude_none=True)} to GenAI: {genai_part.model_dump_json(exclude_none=True)}')    
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(f'Converted A2UI part from A2A: {a2a_part.model_dump_json(exclude_none=True)} to GenAI: {genai_part.model_dump_json(exclude_none=True)}')
         return genai_part
         
     return part_converter.convert_a2a_part_to_genai_part(a2a_part)
@@ -38,11 +39,13 @@ def convert_a2a_part_to_genai_part(
 def convert_genai_part_to_a2a_part(    
     part: genai_types.Part,
 ) -> Optional[a2a_types.Part]:
-    if part.text:
+    # Serialized A2A parts are JSON objects, so skip parsing plain text.
+    if part.text and part.text.lstrip().startswith("{"):
         try:
             a2a_part = a2a_types.Part.model_validate_json(part.text)
             if is_a2ui_part(a2a_part):           
-                logger.info(f'Converted A2UI part from GenAI: {part.model_dump_json(exclude_none=True)} to A2A: {a2a_part.model_dump_json(exclude_none=True)}')    
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info(f'Converted A2UI part from GenAI: {part.model_dump_json(exclude_none=True)} to A2A: {a2a_part.model_dump_json(exclude_none=True)}')
                 return a2a_part        
         except pydantic.ValidationError:
             # Expected for normal text input
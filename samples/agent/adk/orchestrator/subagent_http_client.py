@@ -0,0 +1,195 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import importlib.util
+import logging
+import os
+from typing import Any, AsyncIterator, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONNECTIONS_PER_HOST = 20
+DEFAULT_MAX_KEEPALIVE_CONNECTIONS_PER_HOST = 10
+DEFAULT_KEEPALIVE_EXPIRY_SECONDS = 60.0
+DEFAULT_TIMEOUT_SECONDS = 600.0
+
+
+class _HostStats:
+    def __init__(self, max_connections: int):
+        self.max_connections = max_connections
+        self.requests = 0
+        self.connections_opened = 0
+        self.in_flight = 0
+
+
+class _CountedStream(httpx.AsyncByteStream):
+    """A response body that releases its request's slot once it is closed."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, stats: _HostStats):
+        self._stream = stream
+        self._stats = stats
+        self._released = False
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            if not self._released:
+                self._released = True
+                self._stats.in_flight -= 1
+
+
+class _CountingTransport(httpx.AsyncBaseTransport):
+    """Counts the requests, in-flight requests and new connections of a host's pool."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, stats: _HostStats):
+        self._transport = transport
+        self._stats = stats
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        parent_trace = request.extensions.get("trace")
+
+        async def trace(event_name: str, info: dict[str, Any]) -> None:
+            # Only requests that can't reuse a pooled connection open one.
+            if event_name == "connection.connect_tcp.complete":
+                self._stats.connections_opened += 1
+            if parent_trace is not None:
+                result = parent_trace(event_name, info)
+                if result is not None:
+                    await result
+
+        request.extensions["trace"] = trace
+        self._stats.requests += 1
+        self._stats.in_flight += 1
+        try:
+            response = await self._transport.handle_async_request(request)
+        except BaseException:
+            self._stats.in_flight -= 1
+            raise
+        # SSE responses hold their connection until the stream is closed.
+        response.stream = _CountedStream(response.stream, self._stats)
+        return response
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+class SubagentHttpClients:
+    """Pooled, shared HTTP clients for the orchestrator's calls to its subagents.
+
+    Each subagent host gets one `httpx.AsyncClient`, shared by every remote
+    agent and call to that host, so its connection pool bounds the
+    connections to the host. Connections are kept alive between calls, and
+    HTTPS hosts are called over HTTP/2 if the `h2` package is installed, so
+    concurrent calls share a connection.
+
+    Args:
+        max_connections_per_host: The most connections to open to a host;
+            further requests wait for a free connection.
+        max_keepalive_connections_per_host: The idle connections to keep
+            open to a host.
+        keepalive_expiry_seconds: How long an idle connection is kept open.
+        timeout_seconds: The timeout of subagent calls, which stream until
+            the subagent's task completes.
+        http2: Whether to use HTTP/2; by default, if `h2` is installed.
+    """
+
+    def __init__(
+        self,
+        max_connections_per_host: int = DEFAULT_MAX_CONNECTIONS_PER_HOST,
+        max_keepalive_connections_per_host: int = DEFAULT_MAX_KEEPALIVE_CONNECTIONS_PER_HOST,
+        keepalive_expiry_seconds: float = DEFAULT_KEEPALIVE_EXPIRY_SECONDS,
+        timeout_seconds: float = DEFAULT_TIMEOUT_SECONDS,
+        http2: Optional[bool] = None,
+    ):
+        if http2 is None:
+            http2 = importlib.util.find_spec("h2") is not None
+        self._limits = httpx.Limits(
+            max_connections=max_connections_per_host,
+            max_keepalive_connections=max_keepalive_connections_per_host,
+            keepalive_expiry=keepalive_expiry_seconds,
+        )
+        self._timeout = httpx.Timeout(timeout_seconds)
+        self._http2 = http2
+        self._clients: dict[str, httpx.AsyncClient] = {}
+        self._stats: dict[str, _HostStats] = {}
+
+    @classmethod
+    def from_env(cls, prefix: str = "SUBAGENT_HTTP_") -> "SubagentHttpClients":
+        """Reads the limits from e.g. `SUBAGENT_HTTP_MAX_CONNECTIONS_PER_HOST`."""
+
+        def get(name: str, default, parse):
+            value = os.getenv(prefix + name)
+            return default if value is None or value == "" else parse(value)
+
+        http2 = get("HTTP2", None, lambda value: value.lower() in ("1", "true", "yes"))
+        return cls(
+            max_connections_per_host=get("MAX_CONNECTIONS_PER_HOST", DEFAULT_MAX_CONNECTIONS_PER_HOST, int),
+            max_keepalive_connections_per_host=get(
+                "MAX_KEEPALIVE_CONNECTIONS_PER_HOST", DEFAULT_MAX_KEEPALIVE_CONNECTIONS_PER_HOST, int
+            ),
+            keepalive_expiry_seconds=get("KEEPALIVE_EXPIRY_SECONDS", DEFAULT_KEEPALIVE_EXPIRY_SECONDS, float),
+            timeout_seconds=get("TIMEOUT_SECONDS", DEFAULT_TIMEOUT_SECONDS, float),
+            http2=http2,
+        )
+
+    def get_client(self, url: str) -> httpx.AsyncClient:
+        """Returns the shared client for the host of `url`."""
+        parts = urlsplit(url)
+        origin = f"{parts.scheme}://{parts.netloc}"
+        client = self._clients.get(origin)
+        if client is None:
+            stats = self._stats[origin] = _HostStats(self._limits.max_connections)
+            transport = httpx.AsyncHTTPTransport(limits=self._limits, http2=self._http2)
+            client = self._clients[origin] = httpx.AsyncClient(
+                transport=_CountingTransport(transport, stats),
+                timeout=self._timeout,
+            )
+            logger.info(f"Created HTTP client for {origin} (http2={self._http2})")
+        return client
+
+    async def aclose(self) -> None:
+        """Closes the clients and their connections, e.g. on server shutdown."""
+        clients, self._clients = self._clients, {}
+        for origin, client in clients.items():
+            try:
+                await client.aclose()
+            except Exception:
+                logger.exception(f"Failed to close HTTP client for {origin}")
+
+    def get_stats(self) -> dict[str, Optional[float]]:
+        """Returns pool counters for the metrics endpoint, summed over the hosts.
+
+        `waiting` counts requests beyond the hosts' connection limits, which
+        wait for a connection; with HTTP/2, those share connections instead.
+        """
+        hosts = list(self._stats.values())
+        requests = sum(stats.requests for stats in hosts)
+        connections_opened = sum(stats.connections_opened for stats in hosts)
+        return {
+            "hosts": len(hosts),
+            "requests": requests,
+            "connections_opened": connections_opened,
+            "connection_reuse_ratio": 1 - connections_opened / requests if requests else None,
+            "in_flight": sum(stats.in_flight for stats in hosts),
+            "waiting": sum(max(0, stats.in_flight - stats.max_connections) for stats in hosts),
+            "saturated_hosts": sum(stats.in_flight >= stats.max_connections for stats in hosts),
+        }
@@ -13,52 +13,88 @@
 # limitations under the License.
 
 import logging
-from typing import Optional
+from typing import Any, Mapping, Optional
 from google.adk.agents.invocation_context import new_invocation_context_id
 from google.adk.events.event import Event
 from google.adk.events.event_actions import EventActions
 from google.adk.sessions.base_session_service import BaseSessionService
 from google.adk.sessions.session import Session
-from google.adk.sessions.state import State
 
 
 class SubagentRouteManager:
-  """Manages routing of tasks to sub-agents."""
+  """Manages routing of tasks to sub-agents.
+
+  Routes are kept in the session state, so they are shared along with the
+  sessions. Route changes made during a turn are held in memory and written
+  to the session state in one event per turn by `flush_routes`; until then,
+  lookups see them from memory.
+  """
 
   ROUTING_KEY_PREFIX = "route_to_subagent_name_for_surface_id_"
 
+  # session id -> (app name, user id, state delta) not yet written.
+  _pending: dict[str, tuple[str, str, dict[str, Optional[str]]]] = {}
+
   @classmethod
   def _get_routing_key(cls, surface_id: str) -> str:
     return cls.ROUTING_KEY_PREFIX + surface_id
 
+  @classmethod
+  def _get_route(cls, key: str, session_id: str, state: Mapping[str, Any]) -> Optional[str]:
+    pending = cls._pending.get(session_id)
+    if pending is not None and key in pending[2]:
+      return pending[2][key]
+    # Not cached, since another worker may have changed the route since.
+    return state.get(key, None)
+
   @classmethod
   async def get_route_to_subagent_name(
-      cls, surface_id: str, state: State
+      cls, surface_id: str, session_id: str, state: Mapping[str, Any]
   ) -> Optional[str]:
-    """Gets the subagent route for the given tool call id."""
-    subagent_name = state.get(cls._get_routing_key(surface_id), None)
-    logging.info("Got subagent route for surface_id %s to subagent_name %s", surface_id, subagent_name)    
+    """Gets the subagent that rendered the given surface."""
+    subagent_name = cls._get_route(cls._get_routing_key(surface_id), session_id, state)
+    logging.info("Got subagent route for surface_id %s to subagent_name %s", surface_id, subagent_name)
     return subagent_name
 
   @classmethod
-  async def set_route_to_subagent_name(
+  def set_route_to_subagent_name(
       cls,
       surface_id: str,
-      subagent_name: str,
-      session_service: BaseSessionService,
+      subagent_name: Optional[str],
       session: Session,
-  ):
-    """Sets the subagent route for the given tool call id."""
-    key = cls._get_routing_key(surface_id)    
+  ) -> None:
+    """Sets the subagent route for the given surface, or removes it if `subagent_name` is None.
+
+    The change is written to the session by the next `flush_routes`.
+    """
+    key = cls._get_routing_key(surface_id)
+    if cls._get_route(key, session.id, session.state) == subagent_name:
+      return
 
-    if session.state.get(key) != subagent_name:
-      await session_service.append_event(
-          session,
-          Event(
-              invocation_id=new_invocation_context_id(),
-              author="system",
-              actions=EventActions(state_delta={key: subagent_name}),
-          ),
-      )
+    _, _, state_delta = cls._pending.setdefault(session.id, (session.app_name, session.user_id, {}))
+    # Session state can't drop keys, so removed routes are set to None.
+    state_delta[key] = subagent_name
+    if subagent_name is None:
+      logging.info("Removed subagent route for surface_id %s", surface_id)
+    else:
+      logging.info("Set subagent route for surface_id %s to subagent_name %s", surface_id, subagent_name)
 
-      logging.info("Set subagent route for surface_id %s to subagent_name %s", surface_id, subagent_name)
\ No newline at end of file
+  @classmethod
+  async def flush_routes(cls, session_service: BaseSessionService, session_id: str) -> None:
+    """Writes the session's route changes to its state in a single event."""
+    pending = cls._pending.pop(session_id, None)
+    if pending is None:
+      return
+    app_name, user_id, state_delta = pending
+    session = await session_service.get_session(app_name=app_name, user_id=user_id, session_id=session_id)
+    if session is None:
+      logging.warning("Dropped %d subagent route changes for missing session %s", len(state_delta), session_id)
+      return
+    await session_service.append_event(
+        session,
+        Event(
+            invocation_id=new_invocation_context_id(),
+            author="system",
+            actions=EventActions(state_delta=state_delta),
+        ),
+    )
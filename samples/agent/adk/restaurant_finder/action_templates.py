@@ -0,0 +1,59 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from typing import Any, Callable
+
+from a2ui.a2ui_action_renderer import (
+    A2uiActionRenderer,
+    A2uiActionTemplate,
+    load_a2ui_example,
+)
+from a2ui_examples import RESTAURANT_UI_EXAMPLES
+
+
+def build_action_renderer(validate: Callable[[list[Any]], None]) -> A2uiActionRenderer:
+    """
+    Builds the renderer for the userActions whose UI doesn't need the LLM.
+
+    The booking form and its confirmation only show values the client sends in
+    the action context, so they are filled in directly from the examples.
+    """
+    renderer = A2uiActionRenderer(validate)
+    renderer.register(
+        "book_restaurant",
+        A2uiActionTemplate(
+            load_a2ui_example(RESTAURANT_UI_EXAMPLES, "BOOKING_FORM_EXAMPLE", unescape_braces=True),
+            data={
+                "title": "Book a Table at {restaurantName}",
+                "address": "{address}",
+                "restaurantName": "{restaurantName}",
+                "imageUrl": "{imageUrl}",
+            },
+            text="Please fill in the details to book a table at {restaurantName}.",
+        ),
+    )
+    renderer.register(
+        "submit_booking",
+        A2uiActionTemplate(
+            load_a2ui_example(RESTAURANT_UI_EXAMPLES, "CONFIRMATION_EXAMPLE", unescape_braces=True),
+            data={
+                "title": "Booking at {restaurantName}",
+                "bookingDetails": "{partySize} people at {reservationTime}",
+                "dietaryRequirements": "Dietary Requirements: {dietary}",
+                "imageUrl": "{imageUrl}",
+            },
+            text="Your table at {restaurantName} is booked!",
+        ),
+    )
+    return renderer
@@ -12,6 +12,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import json
+
 # The A2UI schema remains constant for all A2UI responses.
 A2UI_SCHEMA = r'''
 {
@@ -789,47 +791,87 @@ A2UI_SCHEMA = r'''
 }
 '''
 
+from a2ui.a2ui_prompt_cache import CacheablePrompt, build_cacheable_a2ui_prompt
+from a2ui.a2ui_schema_pruner import prune_a2ui_schema
 from a2ui_examples import RESTAURANT_UI_EXAMPLES
 
 
-def get_ui_prompt(base_url: str, examples: str) -> str:
+def get_prompt_a2ui_schema(examples: str) -> str:
     """
-    Constructs the full prompt with UI instructions, rules, examples, and schema.
+    Returns the A2UI schema for the prompt, with only the components the examples use.
 
-    Args:
-        base_url: The base URL for resolving static assets like logos.
-        examples: A string containing the specific UI examples for the agent's task.
-
-    Returns:
-        A formatted string to be used as the system prompt for the LLM.
+    Responses are still validated against the full `A2UI_SCHEMA`.
     """
-    # The f-string substitution for base_url happens here, at runtime.
-    formatted_examples = examples.format(base_url=base_url)
+    return json.dumps(prune_a2ui_schema(json.loads(A2UI_SCHEMA), examples=examples))
 
-    return f"""
-    You are a helpful restaurant finding assistant. Your final output MUST be a a2ui UI JSON response.
+
+def _get_ui_rules(schema_location: str = "below") -> str:
+    """Returns the UI response rules, which don't depend on the deployment."""
+    return f"""    You are a helpful restaurant finding assistant. Your final output MUST be a a2ui UI JSON response.
 
     To generate the response, you MUST follow these rules:
     1.  Your response MUST be in two parts, separated by the delimiter: `---a2ui_JSON---`.
     2.  The first part is your conversational text response.
     3.  The second part is a single, raw JSON object which is a list of A2UI messages.
-    4.  The JSON part MUST validate against the A2UI JSON SCHEMA provided below.
+    4.  The JSON part MUST validate against the A2UI JSON SCHEMA provided {schema_location}.
 
     --- UI TEMPLATE RULES ---
     -   If the query is for a list of restaurants, use the restaurant data you have already received from the `get_restaurants` tool to populate the `dataModelUpdate.contents` array (e.g., as a `valueMap` for the "items" key).
     -   If the number of restaurants is 5 or fewer, you MUST use the `SINGLE_COLUMN_LIST_EXAMPLE` template.
     -   If the number of restaurants is more than 5, you MUST use the `TWO_COLUMN_LIST_EXAMPLE` template.
     -   If the query is to book a restaurant (e.g., "USER_WANTS_TO_BOOK..."), you MUST use the `BOOKING_FORM_EXAMPLE` template.
-    -   If the query is a booking submission (e.g., "User submitted a booking..."), you MUST use the `CONFIRMATION_EXAMPLE` template.
+    -   If the query is a booking submission (e.g., "User submitted a booking..."), you MUST use the `CONFIRMATION_EXAMPLE` template."""
+
+
+def get_ui_prompt(base_url: str, examples: str) -> str:
+    """
+    Constructs the full prompt with UI instructions, rules, examples, and schema.
+
+    Args:
+        base_url: The base URL for resolving static assets like logos.
+        examples: A string containing the specific UI examples for the agent's task.
+
+    Returns:
+        A formatted string to be used as the system prompt for the LLM.
+    """
+    # The f-string substitution for base_url happens here, at runtime.
+    formatted_examples = examples.format(base_url=base_url)
+
+    return f"""
+{_get_ui_rules()}
 
     {formatted_examples}
 
     ---BEGIN A2UI JSON SCHEMA---
-    {A2UI_SCHEMA}
+    {get_prompt_a2ui_schema(examples)}
     ---END A2UI JSON SCHEMA---
     """
 
 
+def get_cacheable_ui_prompt(
+    base_url: str, examples: str, instruction: str = ""
+) -> CacheablePrompt:
+    """
+    Constructs the UI prompt ordered for provider-side context caching.
+
+    The schema and examples come first, as a prefix that is the same for every
+    deployment, followed by the instruction and rules.
+
+    Args:
+        base_url: The base URL for resolving static assets like logos.
+        examples: A string containing the specific UI examples for the agent's task.
+        instruction: The agent's instruction, placed ahead of the UI rules.
+
+    Returns:
+        The prompt, split into its static prefix and dynamic suffix.
+    """
+    return build_cacheable_a2ui_prompt(
+        get_prompt_a2ui_schema(examples),
+        examples.format(base_url=base_url),
+        instruction + _get_ui_rules(schema_location="above"),
+    )
+
+
 def get_text_prompt() -> str:
     """
     Constructs the prompt for a text-only agent.
@@ -15,11 +15,37 @@
 import json
 import logging
 import os
+from typing import Any, Iterable
 
+from a2ui.a2ui_data_store import IndexedDataStore, index_fields
 from google.adk.tools.tool_context import ToolContext
 
 logger = logging.getLogger(__name__)
 
+# The URL the images in the data are served from; replaced by the agent's base URL.
+DATA_BASE_URL = "http://localhost:10002"
+
+
+def _get_location_terms(restaurant: dict[str, Any]) -> Iterable[str]:
+    # E.g. "81 St Marks Pl, New York, NY 10003" -> "new york", "ny".
+    address_parts = [part.strip() for part in restaurant.get("address", "").lower().split(",")]
+    if len(address_parts) >= 3:
+        yield address_parts[-2]
+        if state := address_parts[-1].split():
+            yield state[0]
+
+
+# Loaded once and reloaded when the data changes. RESTAURANT_DATA_PATH can
+# point to another file, or a directory of files.
+restaurant_store = IndexedDataStore(
+    os.getenv(
+        "RESTAURANT_DATA_PATH",
+        os.path.join(os.path.dirname(__file__), "restaurant_data.json"),
+    ),
+    indexes={"cuisine": index_fields("cuisine"), "location": _get_location_terms},
+    url_placeholder=DATA_BASE_URL,
+)
+
 
 def get_restaurants(cuisine: str, location: str,  tool_context: ToolContext, count: int = 5) -> str:
     """Call this tool to get a list of restaurants based on a cuisine and location.
@@ -29,27 +55,20 @@ def get_restaurants(cuisine: str, location: str,  tool_context: ToolContext, cou
     logger.info(f"  - Cuisine: {cuisine}")
     logger.info(f"  - Location: {location}")
 
-    items = []
-    if "new york" in location.lower() or "ny" in location.lower():
-        try:
-            script_dir = os.path.dirname(__file__)
-            file_path = os.path.join(script_dir, "restaurant_data.json")
-            with open(file_path) as f:
-                restaurant_data_str = f.read()
-                if base_url := tool_context.state.get("base_url"):                    
-                    restaurant_data_str = restaurant_data_str.replace("http://localhost:10002", base_url)
-                    logger.info(f'Updated base URL from tool context: {base_url}')
-                all_items = json.loads(restaurant_data_str)        
-
-            # Slice the list to return only the requested number of items
-            items = all_items[:count]
-            logger.info(
-                f"  - Success: Found {len(all_items)} restaurants, returning {len(items)}."
-            )
-
-        except FileNotFoundError:
-            logger.error(f"  - Error: restaurant_data.json not found at {file_path}")
-        except json.JSONDecodeError:
-            logger.error(f"  - Error: Failed to decode JSON from {file_path}")
+    snapshot = restaurant_store.get_snapshot()
+    # Matches the cities and states in the data that the location mentions,
+    # e.g. "new york" and "ny" for "NYC".
+    location_lower = location.lower()
+    matches = snapshot.find("location", lambda term: term in location_lower)
+    if cuisine_lower := cuisine.lower().strip():
+        matches &= snapshot.find(
+            "cuisine", lambda term: term in cuisine_lower or cuisine_lower in term
+        )
 
+    items = snapshot.get_records(
+        matches, base_url=tool_context.state.get("base_url"), limit=count
+    )
+    logger.info(
+        f"  - Success: Found {len(matches)} restaurants, returning {len(items)}."
+    )
     return json.dumps(items)
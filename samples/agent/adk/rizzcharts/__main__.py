@@ -19,7 +19,9 @@ import traceback
 import click
 from a2a.server.apps import A2AStarletteApplication
 from a2a.server.request_handlers import DefaultRequestHandler
-from a2a.server.tasks import InMemoryTaskStore
+from a2ui.a2ui_bounded_store import BoundedStoreConfig, BoundedTaskStore
+from a2ui.a2ui_instrumentation import A2uiMetricsApp, configure_a2ui_tracing, get_latency_histograms
+from a2ui.a2ui_server import run_a2a_server
 from agent_executor import RizzchartsAgentExecutor
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
@@ -37,7 +39,8 @@ class MissingAPIKeyError(Exception):
 @click.command()
 @click.option("--host", default="localhost")
 @click.option("--port", default=10002)
-def main(host, port):
+@click.option("--workers", default=1, type=int, help="Worker processes; requires A2UI_STORE_SQLITE_PATH or A2UI_STORE_REDIS_URL.")
+def main(host, port, workers):
     try:
         # Check for API key only if Vertex AI is not configured
         if not os.getenv("GOOGLE_GENAI_USE_VERTEXAI") == "TRUE":
@@ -47,28 +50,35 @@ def main(host, port):
                 )
 
         base_url = f"http://{host}:{port}"
-        agent_executor = RizzchartsAgentExecutor(base_url=base_url)
+        def build_app():
+            # Each worker builds its own app, stores and clients.
+            configure_a2ui_tracing("rizzcharts")
+            agent_executor = RizzchartsAgentExecutor(base_url=base_url)
 
-        request_handler = DefaultRequestHandler(
-            agent_executor=agent_executor,
-            task_store=InMemoryTaskStore(),
-        )
-        server = A2AStarletteApplication(
-            agent_card=agent_executor.get_agent_card(), http_handler=request_handler
-        )
-        import uvicorn
+            task_store = BoundedTaskStore(BoundedStoreConfig.from_env())
+            get_latency_histograms().add_gauge_source("a2a_tasks", task_store.get_stats)
+            request_handler = DefaultRequestHandler(
+                agent_executor=agent_executor,
+                task_store=task_store,
+            )
+            server = A2AStarletteApplication(
+                agent_card=agent_executor.get_agent_card(), http_handler=request_handler
+            )
 
-        app = server.build()
+            app = server.build()
 
-        app.add_middleware(
-            CORSMiddleware,
-            allow_origins=["http://localhost:5173"],
-            allow_credentials=True,
-            allow_methods=["*"],
-            allow_headers=["*"],
-        )
+            app.add_middleware(
+                CORSMiddleware,
+                allow_origins=["http://localhost:5173"],
+                allow_credentials=True,
+                allow_methods=["*"],
+                allow_headers=["*"],
+            )
+            # Per-stage latency histograms of this worker, in the Prometheus format.
+            app.add_route("/metrics", A2uiMetricsApp())
+            return app
 
-        uvicorn.run(app, host=host, port=port)
+        run_a2a_server(build_app, host, port, workers)
     except MissingAPIKeyError as e:
         logger.error(f"Error: {e} {traceback.format_exc()}")
         exit(1)
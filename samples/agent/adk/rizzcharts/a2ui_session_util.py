@@ -12,6 +12,36 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from collections import OrderedDict
+from collections.abc import Mapping
+from typing import Any
+
+from a2ui.a2ui_extension import DEFAULT_CAPABILITY_CACHE_SIZE
+
 A2UI_ENABLED_STATE_KEY = "user:a2ui_enabled"
 A2UI_CATALOG_URI_STATE_KEY = "user:a2ui_catalog_uri"
-A2UI_SCHEMA_STATE_KEY = "user:a2ui_schema"
\ No newline at end of file
+A2UI_CAPABILITIES_HASH_STATE_KEY = "user:a2ui_capabilities_hash"
+
+# Merged schemas are large and shared by every session with the same client
+# capabilities, so sessions only store the capabilities hash and the schemas
+# are kept here, most recently used last.
+_a2ui_schemas: OrderedDict[str, dict[str, Any]] = OrderedDict()
+
+
+def set_a2ui_schema(capabilities_hash: str, a2ui_schema: dict[str, Any]) -> None:
+    """Makes the schema available to sessions with these capabilities.
+
+    Must be called before every run, since old schemas are evicted.
+    """
+    _a2ui_schemas[capabilities_hash] = a2ui_schema
+    _a2ui_schemas.move_to_end(capabilities_hash)
+    while len(_a2ui_schemas) > DEFAULT_CAPABILITY_CACHE_SIZE:
+        _a2ui_schemas.popitem(last=False)
+
+
+def get_a2ui_schema(state: Mapping[str, Any]) -> dict[str, Any]:
+    """Returns the A2UI schema for a session's client capabilities."""
+    a2ui_schema = _a2ui_schemas.get(state.get(A2UI_CAPABILITIES_HASH_STATE_KEY))
+    if not a2ui_schema:
+        raise ValueError("A2UI schema is empty")
+    return a2ui_schema
\ No newline at end of file
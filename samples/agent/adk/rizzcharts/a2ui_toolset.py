@@ -13,9 +13,8 @@
 # limitations under the License.
 
 import json
-import jsonschema
 import logging
-from typing import Any, List, Optional
+from typing import Any, Callable, List, Optional
 
 from google.genai import types as genai_types
 
@@ -24,7 +23,8 @@ from google.adk.tools.base_tool import BaseTool
 from google.adk.tools import base_toolset
 from google.adk.tools.tool_context import ToolContext
 from google.adk.agents.readonly_context import ReadonlyContext
-from a2ui_session_util import A2UI_ENABLED_STATE_KEY, A2UI_SCHEMA_STATE_KEY
+from a2ui_session_util import A2UI_ENABLED_STATE_KEY, A2UI_CATALOG_URI_STATE_KEY, get_a2ui_schema
+from a2ui.a2ui_extension import validate_a2ui_messages
 
 logger = logging.getLogger(__name__)
 
@@ -32,9 +32,12 @@ logger = logging.getLogger(__name__)
 class A2uiToolset(base_toolset.BaseToolset):
     """A toolset that provides A2UI Tools and can be enabled/disabled."""
 
-    def __init__(self):
+    def __init__(
+        self,
+        get_prompt_a2ui_schema: Optional[Callable[[dict[str, Any], Optional[str]], dict[str, Any]]] = None,
+    ):
         super().__init__()
-        self._ui_tools = [SendA2uiJsonToClientTool()]
+        self._ui_tools = [SendA2uiJsonToClientTool(get_prompt_a2ui_schema)]
 
     async def get_tools(
         self,
@@ -53,7 +56,13 @@ class SendA2uiJsonToClientTool(BaseTool):
     TOOL_NAME = "send_a2ui_json_to_client"
     A2UI_JSON_ARG_NAME = "a2ui_json"
 
-    def __init__(self):
+    def __init__(
+        self,
+        get_prompt_a2ui_schema: Optional[Callable[[dict[str, Any], Optional[str]], dict[str, Any]]] = None,
+    ):
+        # Maps the full schema and catalog uri to the (smaller) schema put in the prompt.
+        self._get_prompt_a2ui_schema = get_prompt_a2ui_schema
+        self._prompt_a2ui_schemas: dict[Optional[str], dict[str, Any]] = {}
         super().__init__(
             name=self.TOOL_NAME,
             description="Sends A2UI JSON to the client to render rich UI for the user. This tool can be called multiple times in the same call to render multiple UI surfaces."
@@ -78,12 +87,21 @@ class SendA2uiJsonToClientTool(BaseTool):
         )
 
     def get_a2ui_schema(self, tool_context: ToolContext) -> dict[str, Any]:
-        a2ui_schema = tool_context.state.get(A2UI_SCHEMA_STATE_KEY)
-        if not a2ui_schema:
-            raise ValueError("A2UI schema is empty")
+        a2ui_schema = get_a2ui_schema(tool_context.state)
         a2ui_schema_object = {"type": "array", "items": a2ui_schema} # Make a list since we support multiple parts in this tool call
         return a2ui_schema_object 
 
+    def get_prompt_a2ui_schema(self, tool_context: ToolContext) -> dict[str, Any]:
+        """Returns the list schema for the prompt; arguments are validated against the full schema."""
+        if self._get_prompt_a2ui_schema is None:
+            return self.get_a2ui_schema(tool_context)
+
+        catalog_uri = tool_context.state.get(A2UI_CATALOG_URI_STATE_KEY)
+        if catalog_uri not in self._prompt_a2ui_schemas:
+            a2ui_schema = get_a2ui_schema(tool_context.state)
+            self._prompt_a2ui_schemas[catalog_uri] = self._get_prompt_a2ui_schema(a2ui_schema, catalog_uri)
+        return {"type": "array", "items": self._prompt_a2ui_schemas[catalog_uri]}
+
     async def process_llm_request(
         self, *, tool_context: ToolContext, llm_request: LlmRequest
     ) -> None:
@@ -91,7 +109,7 @@ class SendA2uiJsonToClientTool(BaseTool):
             tool_context=tool_context, llm_request=llm_request
         )
 
-        a2ui_schema = self.get_a2ui_schema(tool_context)
+        a2ui_schema = self.get_prompt_a2ui_schema(tool_context)
 
         llm_request.append_instructions(
             [
@@ -116,9 +134,11 @@ class SendA2uiJsonToClientTool(BaseTool):
                 )
 
             a2ui_json_payload = json.loads(a2ui_json)
-            a2ui_schema = self.get_a2ui_schema(tool_context)
-            jsonschema.validate(
-                instance=a2ui_json_payload, schema=a2ui_schema
+            a2ui_schema = get_a2ui_schema(tool_context.state)
+            validate_a2ui_messages(
+                a2ui_json_payload,
+                a2ui_schema,
+                catalog_id=tool_context.state.get(A2UI_CATALOG_URI_STATE_KEY),
             )
 
             logger.info(
@@ -16,8 +16,7 @@ import json
 import logging
 import os
 from pathlib import Path
-from typing import Any
-import jsonschema
+from typing import Any, Optional
 
 from google.adk.models.lite_llm import LiteLlm
 from google.adk.agents.llm_agent import LlmAgent
@@ -26,8 +25,10 @@ from google.genai import types
 from google.adk.agents.readonly_context import ReadonlyContext
 from tools import get_store_sales, get_sales_data
 from a2ui_toolset import A2uiToolset
-from a2ui_session_util import A2UI_ENABLED_STATE_KEY, A2UI_CATALOG_URI_STATE_KEY, A2UI_SCHEMA_STATE_KEY
-from a2ui.a2ui_extension import STANDARD_CATALOG_ID
+from a2ui_session_util import A2UI_ENABLED_STATE_KEY, A2UI_CATALOG_URI_STATE_KEY, get_a2ui_schema
+from a2ui.a2ui_extension import STANDARD_CATALOG_ID, validate_a2ui_messages
+from a2ui.a2ui_instrumentation import A2uiLatencyCallbacks
+from a2ui.a2ui_schema_pruner import prune_a2ui_schema
 
 logger = logging.getLogger(__name__)
 
@@ -37,40 +38,51 @@ class rizzchartsAgent:
     """An agent that runs an ecommerce dashboard"""
 
     SUPPORTED_CONTENT_TYPES = ["text", "text/plain"]
+    # Times the LLM and tool calls for the /metrics endpoint.
+    latency_callbacks = A2uiLatencyCallbacks()
     
     @classmethod
     def get_a2ui_schema(cls, readonly_context: ReadonlyContext) -> dict[str, Any]:
-        a2ui_schema = readonly_context.state.get(A2UI_SCHEMA_STATE_KEY)
-        if not a2ui_schema:
-            raise ValueError("A2UI schema is empty")
+        a2ui_schema = get_a2ui_schema(readonly_context.state)
         a2ui_schema_object = {"type": "array", "items": a2ui_schema} # Make a list since we support multiple parts in this tool call
         return a2ui_schema_object 
 
     @classmethod
-    def load_example(cls, path: str, a2ui_schema: dict[str, Any]) -> dict[str, Any]:
+    def load_example(cls, path: str, a2ui_schema: dict[str, Any], catalog_uri: Optional[str]) -> dict[str, Any]:
         example_str = Path(path).read_text()
         example_json = json.loads(example_str)
-        jsonschema.validate(
-            instance=example_json, schema=a2ui_schema
+        validate_a2ui_messages(
+            example_json, a2ui_schema, catalog_id=catalog_uri
         )
         return example_json
 
+    @classmethod
+    def get_example_dir(cls, catalog_uri: Optional[str]) -> str:
+        if catalog_uri == RIZZCHARTS_CATALOG_URI:
+            return "examples/rizzcharts_catalog"
+        elif catalog_uri == STANDARD_CATALOG_ID:
+            return "examples/standard_catalog"
+        else:
+            raise ValueError(f"Unsupported catalog uri: {catalog_uri if catalog_uri else 'None'}")
+
+    @classmethod
+    def get_prompt_a2ui_schema(cls, a2ui_schema: dict[str, Any], catalog_uri: Optional[str]) -> dict[str, Any]:
+        """Prunes the schema to the components used by the catalog's examples, for the prompt."""
+        example_dir = cls.get_example_dir(catalog_uri)
+        examples = [Path(f"{example_dir}/{name}.json").read_text() for name in ("chart", "map")]
+        return prune_a2ui_schema(a2ui_schema, examples=examples)
+
     @classmethod
     def get_instructions(cls, readonly_context: ReadonlyContext) -> str:
         use_ui = readonly_context.state.get(A2UI_ENABLED_STATE_KEY)
         if not use_ui:
             raise ValueError("A2UI must be enabled to run rizzcharts agent")
 
-        a2ui_schema = cls.get_a2ui_schema(readonly_context)
+        a2ui_schema = get_a2ui_schema(readonly_context.state)
         catalog_uri = readonly_context.state.get(A2UI_CATALOG_URI_STATE_KEY)
-        if catalog_uri == RIZZCHARTS_CATALOG_URI:
-            map_example = cls.load_example("examples/rizzcharts_catalog/map.json", a2ui_schema)
-            chart_example = cls.load_example("examples/rizzcharts_catalog/chart.json", a2ui_schema)
-        elif catalog_uri == STANDARD_CATALOG_ID:
-            map_example = cls.load_example("examples/standard_catalog/map.json", a2ui_schema)
-            chart_example = cls.load_example("examples/standard_catalog/chart.json", a2ui_schema)
-        else:
-            raise ValueError(f"Unsupported catalog uri: {catalog_uri if catalog_uri else 'None'}")
+        example_dir = cls.get_example_dir(catalog_uri)
+        map_example = cls.load_example(f"{example_dir}/map.json", a2ui_schema, catalog_uri)
+        chart_example = cls.load_example(f"{example_dir}/chart.json", a2ui_schema, catalog_uri)
 
         final_prompt = f"""
 ### System Instructions
@@ -141,12 +153,15 @@ Your task is to analyze the user's request, fetch the necessary data, select the
             name="rizzcharts_agent",
             description="An agent that lets sales managers request sales data.",
             instruction=cls.get_instructions,
-            tools=[get_store_sales, get_sales_data, A2uiToolset()],
+            tools=[get_store_sales, get_sales_data, A2uiToolset(cls.get_prompt_a2ui_schema)],
             planner=BuiltInPlanner(
                 thinking_config=types.ThinkingConfig(
                     include_thoughts=True,
                 )
             ),
             disallow_transfer_to_peers=True,
-
+            before_model_callback=cls.latency_callbacks.before_model,
+            after_model_callback=cls.latency_callbacks.after_model,
+            before_tool_callback=cls.latency_callbacks.before_tool,
+            after_tool_callback=cls.latency_callbacks.after_tool,
         )
@@ -16,24 +16,25 @@ import logging
 from typing import override
 
 from a2a.server.agent_execution import RequestContext
+from a2a.server.events.event_queue import EventQueue
 
 from google.adk.agents.invocation_context import new_invocation_context_id
-from google.adk.artifacts import InMemoryArtifactService
 from google.adk.events.event import Event
 from google.adk.events.event_actions import EventActions
-from google.adk.memory.in_memory_memory_service import InMemoryMemoryService
 from google.adk.runners import Runner
-from google.adk.sessions import InMemorySessionService
 from google.adk.a2a.converters.request_converter import AgentRunRequest
 from google.adk.a2a.executor.a2a_agent_executor import (
     A2aAgentExecutorConfig,
     A2aAgentExecutor,
 )
-from a2ui.a2ui_extension import A2UI_EXTENSION_URI, get_a2ui_agent_extension, try_activate_a2ui_extension, A2UI_CLIENT_CAPABILITIES_KEY
+from a2ui.a2ui_adk_services import BoundedArtifactService, BoundedMemoryService, BoundedSessionService
+from a2ui.a2ui_bounded_store import BoundedStoreConfig
+from a2ui.a2ui_extension import A2UI_EXTENSION_URI, A2uiCapabilityResolver, get_a2ui_agent_extension, get_a2ui_client_capabilities, get_a2ui_user_action, try_activate_a2ui_extension
+from a2ui.a2ui_instrumentation import STAGE_TURN, a2ui_request_labels, a2ui_span
 from component_catalog_builder import ComponentCatalogBuilder
 from a2a.types import AgentCapabilities, AgentCard, AgentSkill
 from a2a.types import AgentExtension
-from a2ui_session_util import A2UI_ENABLED_STATE_KEY, A2UI_CATALOG_URI_STATE_KEY, A2UI_SCHEMA_STATE_KEY
+from a2ui_session_util import A2UI_ENABLED_STATE_KEY, A2UI_CATALOG_URI_STATE_KEY, A2UI_CAPABILITIES_HASH_STATE_KEY, set_a2ui_schema
 from agent import RIZZCHARTS_CATALOG_URI
 from a2ui.a2ui_extension import STANDARD_CATALOG_ID
 
@@ -60,13 +61,17 @@ class RizzchartsAgentExecutor(A2aAgentExecutor):
             },
             default_catalog_uri=STANDARD_CATALOG_ID
         )
+        # Catalog selection and schema merging only run for new client capabilities.
+        self._capability_resolver = A2uiCapabilityResolver(self._component_catalog_builder.load_a2ui_schema)
         agent = rizzchartsAgent.build_agent()
+        # Evicts idle sessions; set A2UI_STORE_SQLITE_PATH to keep them across restarts.
+        store_config = BoundedStoreConfig.from_env()
         runner = Runner(
             app_name=agent.name,
             agent=agent,
-            artifact_service=InMemoryArtifactService(),
-            session_service=InMemorySessionService(),
-            memory_service=InMemoryMemoryService(),
+            artifact_service=BoundedArtifactService(store_config),
+            session_service=BoundedSessionService(store_config),
+            memory_service=BoundedMemoryService(store_config),
         )
         self._part_converter = part_converter.A2uiPartConverter()
         config = A2aAgentExecutorConfig(
@@ -110,6 +115,12 @@ class RizzchartsAgentExecutor(A2aAgentExecutor):
             ],
         )
 
+    @override
+    async def execute(self, context: RequestContext, event_queue: EventQueue) -> None:
+        user_action = get_a2ui_user_action(context)
+        with a2ui_request_labels("rizzcharts_agent", user_action and user_action.get("name")), a2ui_span(STAGE_TURN):
+            await super().execute(context, event_queue)
+
     @override
     async def _prepare_session(
         self,
@@ -126,23 +137,28 @@ class RizzchartsAgentExecutor(A2aAgentExecutor):
                 
         use_ui = try_activate_a2ui_extension(context)
         if use_ui:
-            a2ui_schema, catalog_uri = self._component_catalog_builder.load_a2ui_schema(client_ui_capabilities=context.message.metadata.get(A2UI_CLIENT_CAPABILITIES_KEY) if context.message and context.message.metadata else None)
+            resolved = self._capability_resolver.resolve(get_a2ui_client_capabilities(context))
 
-            self._part_converter.set_a2ui_schema(a2ui_schema)
-        
-            await runner.session_service.append_event(
-                session,
-                Event(
-                    invocation_id=new_invocation_context_id(),
-                    author="system",
-                    actions=EventActions(
-                        state_delta={
-                            A2UI_ENABLED_STATE_KEY: use_ui,
-                            A2UI_SCHEMA_STATE_KEY: a2ui_schema,
-                            A2UI_CATALOG_URI_STATE_KEY: catalog_uri,
-                        }
+            self._part_converter.set_a2ui_schema(resolved.a2ui_schema, resolved.catalog_id)
+            # The schema is kept out of the session, which only stores the hash.
+            set_a2ui_schema(resolved.capabilities_hash, resolved.a2ui_schema)
+
+            # The client resends its capabilities with every message, so only
+            # write them to the session when they change.
+            if session.state.get(A2UI_CAPABILITIES_HASH_STATE_KEY) != resolved.capabilities_hash:
+                await runner.session_service.append_event(
+                    session,
+                    Event(
+                        invocation_id=new_invocation_context_id(),
+                        author="system",
+                        actions=EventActions(
+                            state_delta={
+                                A2UI_ENABLED_STATE_KEY: use_ui,
+                                A2UI_CATALOG_URI_STATE_KEY: resolved.catalog_id,
+                                A2UI_CAPABILITIES_HASH_STATE_KEY: resolved.capabilities_hash,
+                            }
+                        ),
                     ),
-                ),
-            )
+                )
 
         return session